@@ -18,23 +18,108 @@
 """
 Geocoding using a priority list of providers.
 
-This is an error tolerant geocoder that falls back on a another provider
-if the first one tried does not work.
+This is an error tolerant geocoder that queries all providers at once
+and returns the first good results, merged with results of the other
+providers arriving shortly after.
 """
 
+# IMPLEMENTATION COMMENTS
+#
+# Each provider is queried in a daemon thread of its own, continuing the
+# request of the calling thread, see poor.http.token, so that cancelling
+# the search cancels all of them. Once the first non-empty results arrive,
+# other providers are waited for MERGE_WAIT seconds more, but at most
+# until DEADLINE after the start. Results arriving later are not waited
+# for, but end up in the providers' caches, so that they are merged in if
+# the query is repeated. Places found by several providers are merged
+# into one, keeping that of the provider higher in the list, see
+# poor.ranking.deduplicate.
+#
+# The list of providers is ordered by expected time to good results,
+# i.e. average latency divided by success rate, both tracked as
+# exponential moving averages across queries.
+
 import poor
+import queue
+import threading
+import time
 
 providers = ["photon", "opencage"]
 
+# Seconds to wait for the first good results
+# and for results of other providers after those.
+DEADLINE = 15
+MERGE_WAIT = 0.5
+
+# Weight of the latest query in provider statistics.
+SMOOTHING = 0.3
+
+_lock = threading.Lock()
+_stats = {}
+
 def geocode(query, x, y, zoom, params):
     """Return a list of dictionaries of places matching `query`."""
-    for i, provider in enumerate(providers):
+    answers = queue.Queue()
+    started = []
+    with _lock:
+        order = list(providers)
+    for provider in order:
         geocoder = poor.Geocoder(provider)
+        if not all(map(poor.http.is_available, geocoder.urls)):
+            # Skip providers whose hosts are known to be down,
+            # requests to those would fail immediately anyway.
+            continue
+        threading.Thread(target=query_provider,
+                         args=(answers,
+                               geocoder,
+                               poor.http.get_token(),
+                               poor.http.get_priority(),
+                               query, x, y, zoom, params),
+                         daemon=True).start()
+        started.append(provider)
+    found = {}
+    deadline = time.time() + DEADLINE
+    for i in range(len(started)):
+        try:
+            provider, results = answers.get(timeout=max(0, deadline - time.time()))
+        except queue.Empty:
+            break
         # 'geocode' returns an empty list or a dict(error=True)
         # in case of no results or an error.
-        results = geocoder.geocode(query, x, y, zoom, params)
-        if results and isinstance(results, list):
-            if i > 0: providers.insert(0, providers.pop(i))
-            return results
-    # All providers failed.
-    return []
+        if not results or not isinstance(results, list): continue
+        found[provider] = results
+        deadline = min(deadline, time.time() + MERGE_WAIT)
+    return poor.ranking.deduplicate([result
+                                     for provider in started if provider in found
+                                     for result in found[provider]])
+
+def query_provider(answers, geocoder, token, priority, query, x, y, zoom, params):
+    """Put results of `geocoder` for `query` to `answers`."""
+    start = time.time()
+    with poor.http.token(token), poor.http.priority(priority):
+        results = geocoder.geocode(query,
+                                   center_x=x,
+                                   center_y=y,
+                                   zoom=zoom,
+                                   params=params)
+    # Cancelled queries return an empty list, which
+    # says nothing about the quality of the provider.
+    if token is None or not token.cancelled:
+        update_stats(geocoder.id,
+                     time.time() - start,
+                     bool(results) and isinstance(results, list))
+    answers.put((geocoder.id, results))
+
+def update_stats(provider, latency, success):
+    """Update statistics of `provider` and reorder providers."""
+    with _lock:
+        stats = _stats.setdefault(provider, dict(latency=latency, success=1.0))
+        stats["latency"] += SMOOTHING * (latency - stats["latency"])
+        stats["success"] += SMOOTHING * (float(success) - stats["success"])
+        # Order by expected time to good results, providers not yet used
+        # first. Assign at once, sorting in place would leave the list
+        # empty while sorting for any readers not holding the lock.
+        def expected(id):
+            if id not in _stats: return 0
+            return _stats[id]["latency"] / max(0.01, _stats[id]["success"])
+        providers[:] = sorted(providers, key=expected)
@@ -21,7 +21,6 @@ Geocoding in Finland using Digitransit.
 https://digitransit.fi/en/developers/services-and-apis/2-geocoding-api/address-search/
 """
 
-import copy
 import poor
 import urllib.parse
 
@@ -29,7 +28,10 @@ AUTOCOMPLETE_URL = "http://api.digitransit.fi/geocoding/v1/autocomplete?text={qu
 SEARCH_URL = "http://api.digitransit.fi/geocoding/v1/search?text={query}&size={limit}&lang={lang}"
 REVERSE_URL = "http://api.digitransit.fi/geocoding/v1/reverse?point.lat={lat}&point.lon={lon}&boundary.circle.radius={radius}&size={limit}&lang={lang}"
 
-cache = {}
+cache = poor.cache.Cache("geocoder.digitransit")
+
+# Maximum amount of autocomplete results, the API's default size.
+AUTOCOMPLETE_LIMIT = 10
 
 def autocomplete(query, x=0, y=0, zoom=16, params={}):
     """Return a list of autocomplete dictionaries matching `query`."""
@@ -40,7 +42,7 @@ def autocomplete(query, x=0, y=0, zoom=16, params={}):
         url += "&focus.point.lon={:.3f}".format(x)
         url += "&focus.point.lat={:.3f}".format(y)
     with poor.util.silent(KeyError):
-        return copy.deepcopy(cache[key])
+        return cache[key]
     results = poor.http.get_json(url)["features"]
     results = list(map(poor.AttrDict, results))
     results = [dict(
@@ -49,7 +51,7 @@ def autocomplete(query, x=0, y=0, zoom=16, params={}):
         x=float(result.geometry.coordinates[0]),
         y=float(result.geometry.coordinates[1]),
     ) for result in results]
-    cache[key] = copy.deepcopy(results)
+    cache[key] = results
     return results
 
 def geocode(query, x=0, y=0, zoom=16, params={}):
@@ -63,7 +65,7 @@ def geocode(query, x=0, y=0, zoom=16, params={}):
         url += "&focus.point.lon={:.3f}".format(x)
         url += "&focus.point.lat={:.3f}".format(y)
     with poor.util.silent(KeyError):
-        return copy.deepcopy(cache[url])
+        return cache[url]
     results = poor.http.get_json(url)["features"]
     results = list(map(poor.AttrDict, results))
     results = [dict(
@@ -73,7 +75,7 @@ def geocode(query, x=0, y=0, zoom=16, params={}):
         y=float(result.geometry.coordinates[1]),
     ) for result in results]
     if results and results[0]:
-        cache[url] = copy.deepcopy(results)
+        cache[url] = results
     return results
 
 def parse_description(props):
@@ -96,7 +98,7 @@ def reverse(x, y, radius, limit=1, params={}):
     lang = (lang if lang in ("fi", "sv") else "fi")
     url = REVERSE_URL.format(**locals())
     with poor.util.silent(KeyError):
-        return copy.deepcopy(cache[url])
+        return cache[url]
     results = poor.http.get_json(url)["features"]
     results = list(map(poor.AttrDict, results))
     results = [dict(
@@ -106,5 +108,5 @@ def reverse(x, y, radius, limit=1, params={}):
         y=float(result.geometry.coordinates[1]),
     ) for result in results]
     if results and results[0]:
-        cache[url] = copy.deepcopy(results)
+        cache[url] = results
     return results
@@ -21,7 +21,6 @@ Geocoding using HERE.
 https://developer.here.com/
 """
 
-import copy
 import poor
 import random
 import urllib.parse
@@ -42,51 +41,46 @@ URL_REVERSE = ("https://revgeocode.search.hereapi.com/v1/revgeocode?"
                "apiKey=" + poor.key.get("HERE_APIKEY") +
                "&at={lat},{lon}"
                "&language={lang}")
-cache = {}
+cache = poor.cache.Cache("geocoder.here")
 
 def autocomplete(query, x=0, y=0, zoom=16, params={}):
     """Return a list of autocomplete dictionaries matching `query`."""
-    query = query.strip()
+    query = poor.util.normalize_query(query)
     if len(query) < 3: return []
     query = urllib.parse.quote_plus(query)
     lang = poor.util.get_default_language("en")
     url = URL_AUTOSUGGEST.format(**locals())
     if x and y:
+        x, y = poor.util.quantize_bias(x, y, zoom)
         url += "&at={:.3f},{:.3f}".format(y,x)
     else:
         # HERE requires reference point
         url += "&at={:.3f},{:.3f}".format(59,24)
-    with poor.util.silent(KeyError):
-        return copy.deepcopy(cache[url])
-    results = poor.http.get_json(url)["items"]
-    results = list(map(poor.AttrDict, results))
-    results = parse_results(results)
-    if results and results[0]:
-        cache[url] = copy.deepcopy(results)
-    return results
+    return cache.fetch(url, lambda: get_results(url))
 
 def geocode(query, x=0, y=0, zoom=16, params={}):
     """Return a list of dictionaries of places matching `query`."""
     if isinstance(query, str):
-        query = urllib.parse.quote_plus(query)
+        query = urllib.parse.quote_plus(poor.util.normalize_query(query))
         limit = params.get("limit", 20)
         lang = poor.util.get_default_language("en")
         #lang = (lang if lang in ("de", "en", "it", "fr") else "en")
         url = URL.format(**locals())
         if x and y:
+            x, y = poor.util.quantize_bias(x, y, zoom)
             url += "&at={:.3f},{:.3f}".format(y,x)
         else:
             # HERE requires reference point
             url += "&at={:.3f},{:.3f}".format(59,24)
     else: # should be query type with reference
         url = query['href'] + "&apiKey=" + poor.key.get("HERE_APIKEY")
-    with poor.util.silent(KeyError):
-        return copy.deepcopy(cache[url])
+    return cache.fetch(url, lambda: get_results(url))
+
+def get_results(url):
+    """Return a list of dictionaries of places found at `url`."""
     results = poor.http.get_json(url)["items"]
     results = list(map(poor.AttrDict, results))
     results = parse_results(results)
-    if results and results[0]:
-        cache[url] = copy.deepcopy(results)
     return results
 
 def merge(d, t, delim="\n", categ=""):
@@ -193,11 +187,4 @@ def reverse(x, y, radius, limit=1, params={}):
     lat = y
     lang = poor.util.get_default_language("en")
     url = URL_REVERSE.format(**locals())
-    with poor.util.silent(KeyError):
-        return copy.deepcopy(cache[url])
-    results = poor.http.get_json(url)["items"]
-    results = list(map(poor.AttrDict, results))
-    results = parse_results(results)
-    if results and results[0]:
-        cache[url] = copy.deepcopy(results)
-    return results
+    return cache.fetch(url, lambda: get_results(url))
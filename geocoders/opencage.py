@@ -21,7 +21,6 @@ Geocoding using OpenCage Geocoder.
 https://geocoder.opencagedata.com/api
 """
 
-import copy
 import poor
 import re
 import urllib.parse
@@ -40,18 +39,21 @@ URL_REVERSE = ("http://api.opencagedata.com/geocode/v1/json"
                "&no_annotations=1"
                "&language={lang}")
 
-cache = {}
+cache = poor.cache.Cache("geocoder.opencage")
 
 def geocode(query, x=0, y=0, zoom=16, params={}):
     """Return a list of dictionaries of places matching `query`."""
-    query = urllib.parse.quote_plus(query)
+    query = urllib.parse.quote_plus(poor.util.normalize_query(query))
     limit = params.get("limit", 10)
     lang = poor.util.get_default_language("en")
     url = URL.format(**locals())
     if x and y:
+        x, y = poor.util.quantize_bias(x, y, zoom)
         url += "&proximity={:.3f},{:.3f}".format(y,x)
-    with poor.util.silent(KeyError):
-        return copy.deepcopy(cache[url])
+    return cache.fetch(url, lambda: get_results(url))
+
+def get_results(url):
+    """Return a list of dictionaries of places found at `url`."""
     results = poor.http.get_json(url)["results"]
     results = list(map(poor.AttrDict, results))
     results = [dict(
@@ -63,8 +65,6 @@ def geocode(query, x=0, y=0, zoom=16, params={}):
         x=float(result.geometry.lng),
         y=float(result.geometry.lat),
     ) for result in results]
-    if results and results[0]:
-        cache[url] = copy.deepcopy(results)
     return results
 
 def parse_description(result):
@@ -101,19 +101,4 @@ def reverse(x, y, radius, limit=1, params={}):
     lat = y
     lang = poor.util.get_default_language("en")
     url = URL_REVERSE.format(**locals())
-    with poor.util.silent(KeyError):
-        return copy.deepcopy(cache[url])
-    results = poor.http.get_json(url)["results"]
-    results = list(map(poor.AttrDict, results))
-    results = [dict(
-        address=result.formatted,
-        poi_type=parse_type(result),
-        postcode=parse_postcode(result),
-        title=parse_title(result),
-        description=parse_description(result),
-        x=float(result.geometry.lng),
-        y=float(result.geometry.lat),
-    ) for result in results]
-    if results and results[0]:
-        cache[url] = copy.deepcopy(results)
-    return results
+    return cache.fetch(url, lambda: get_results(url))
@@ -21,13 +21,15 @@ Geocoding using OSM Scout Server Geocoder.
 https://github.com/rinigus/osmscout-server
 """
 
-import copy
 import poor
 import urllib.parse
 
 URL = "http://localhost:8553/v1/search?limit={limit}&search={query}"
 URL_REVERSE = "http://localhost:8553/v1/guide?radius={radius}&limit={limit}&lng={lng}&lat={lat}&poitype=any"
-cache = {}
+cache = poor.cache.Cache("geocoder.osmscout")
+
+# Maximum amount of autocomplete results.
+AUTOCOMPLETE_LIMIT = 25
 
 def autocomplete(query, x=0, y=0, zoom=16, params={}):
     """Return a list of autocomplete dictionaries matching `query`."""
@@ -37,16 +39,19 @@ def autocomplete(query, x=0, y=0, zoom=16, params={}):
 
 def geocode(query, x=0, y=0, zoom=16, params={}):
     """Return a list of dictionaries of places matching `query`."""
-    query = urllib.parse.quote_plus(query)
+    query = urllib.parse.quote_plus(poor.util.normalize_query(query))
     limit = params.get("limit", 25)
     url = URL.format(**locals())
     if x and y:
+        x, y = poor.util.quantize_bias(x, y, zoom)
         url += "&lng={:.3f}".format(x)
         url += "&lat={:.3f}".format(y)
         if zoom:
             url += "&zoom={zoom}".format(zoom=int(zoom))
-    with poor.util.silent(KeyError):
-        return copy.deepcopy(cache[url])
+    return cache.fetch(url, lambda: get_results(url))
+
+def get_results(url):
+    """Return a list of dictionaries of places found at `url`."""
     results = poor.http.get_json(url)
     results = list(map(poor.AttrDict, results))
     results = [dict(
@@ -61,8 +66,24 @@ def geocode(query, x=0, y=0, zoom=16, params={}):
         x=float(result.lng),
         y=float(result.lat),
     ) for result in results]
-    if results and results[0]:
-        cache[url] = copy.deepcopy(results)
+    return results
+
+def get_results_reverse(url):
+    """Return a list of dictionaries of places near point at `url`."""
+    results = poor.http.get_json(url)
+    results = poor.AttrDict(results)
+    results = [dict(
+        address=parse_address(result),
+        link=result.get("website", ""),
+        phone=result.get("phone", ""),
+        poi_type=parse_type(result),
+        postcode=result.get("postal_code", ""),
+        title=result.title,
+        description=parse_description(result),
+        distance=float(result.distance),
+        x=float(result.lng),
+        y=float(result.lat),
+    ) for result in results.results]
     return results
 
 def parse_address(result):
@@ -102,23 +123,5 @@ def reverse(x, y, radius, limit=25, params={}):
     lng = x
     lat = y
     url = URL_REVERSE.format(**locals())
-    with poor.util.silent(KeyError):
-        return copy.deepcopy(cache[url])
-    results = poor.http.get_json(url)
-    results = poor.AttrDict(results)
-    results = [dict(
-        address=parse_address(result),
-        link=result.get("website", ""),
-        phone=result.get("phone", ""),
-        poi_type=parse_type(result),
-        postcode=result.get("postal_code", ""),
-        title=result.title,
-        description=parse_description(result),
-        distance=float(result.distance),
-        x=float(result.lng),
-        y=float(result.lat),
-    ) for result in results.results]
-    if results and results[0]:
-        cache[url] = copy.deepcopy(results)
-    return results
+    return cache.fetch(url, lambda: get_results_reverse(url))
 
@@ -21,13 +21,15 @@ Geocoding using Photon.
 https://photon.komoot.io/
 """
 
-import copy
 import poor
 import urllib.parse
 
 URL = "https://photon.komoot.io/api/?q={query}&limit={limit}&lang={lang}"
 URL_REVERSE = "https://photon.komoot.io/reverse?lon={lon}&lat={lat}&limit={limit}&lang={lang}&distance_sort=true"
-cache = {}
+cache = poor.cache.Cache("geocoder.photon")
+
+# Maximum amount of autocomplete results.
+AUTOCOMPLETE_LIMIT = 10
 
 def autocomplete(query, x=0, y=0, zoom=16, params={}):
     """Return a list of autocomplete dictionaries matching `query`."""
@@ -37,18 +39,21 @@ def autocomplete(query, x=0, y=0, zoom=16, params={}):
 
 def geocode(query, x=0, y=0, zoom=16, params={}):
     """Return a list of dictionaries of places matching `query`."""
-    query = urllib.parse.quote_plus(query)
+    query = urllib.parse.quote_plus(poor.util.normalize_query(query))
     limit = params.get("limit", 10)
     lang = poor.util.get_default_language("en")
     lang = (lang if lang in ("de", "en", "it", "fr") else "en")
     url = URL.format(**locals())
     if x and y:
+        x, y = poor.util.quantize_bias(x, y, zoom)
         url += "&lon={:.3f}".format(x)
         url += "&lat={:.3f}".format(y)
         if zoom:
             url += "&zoom={zoom}".format(zoom=int(zoom))
-    with poor.util.silent(KeyError):
-        return copy.deepcopy(cache[url])
+    return cache.fetch(url, lambda: get_results(url))
+
+def get_results(url):
+    """Return a list of dictionaries of places found at `url`."""
     results = poor.http.get_json(url)["features"]
     results = list(map(poor.AttrDict, results))
     results = [dict(
@@ -61,8 +66,6 @@ def geocode(query, x=0, y=0, zoom=16, params={}):
         x=float(result.geometry.coordinates[0]),
         y=float(result.geometry.coordinates[1]),
     ) for result in results]
-    if results and results[0]:
-        cache[url] = copy.deepcopy(results)
     return results
 
 def parse_address(props):
@@ -133,21 +136,5 @@ def reverse(x, y, radius, limit=1, params={}):
     lang = poor.util.get_default_language("en")
     lang = (lang if lang in ("de", "en", "it", "fr") else "en")
     url = URL_REVERSE.format(**locals())
-    with poor.util.silent(KeyError):
-        return copy.deepcopy(cache[url])
-    results = poor.http.get_json(url)["features"]
-    results = list(map(poor.AttrDict, results))
-    results = [dict(
-        address=parse_address_full(result),
-        label=parse_address_full(result),
-        poi_type=parse_type(result),
-        postcode=parse_postcode(result),
-        title=parse_title(result),
-        description=parse_description(result),
-        x=float(result.geometry.coordinates[0]),
-        y=float(result.geometry.coordinates[1]),
-    ) for result in results]
-    if results and results[0]:
-        cache[url] = copy.deepcopy(results)
-    return results
+    return cache.fetch(url, lambda: get_results(url))
 
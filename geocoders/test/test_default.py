@@ -16,12 +16,28 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 import poor.test
+import time
+
+from unittest.mock import patch
 
 
 class TestModule(poor.test.TestCase):
 
     def setup_method(self, method):
         self.geocoder = poor.Geocoder("default")
+        self.provider = self.geocoder._provider
+        self.providers = list(self.provider.providers)
+
+    def teardown_method(self, method):
+        self.provider.providers[:] = self.providers
+        self.provider._stats.clear()
+
+    def fake_geocode(self, answers):
+        def geocode(geocoder, query, **kwargs):
+            delay, results = answers[geocoder.id]
+            time.sleep(delay)
+            return results
+        return geocode
 
     def test_geocode(self):
         results = self.geocoder.geocode("seurasaari, helsinki")
@@ -31,3 +47,47 @@ class TestModule(poor.test.TestCase):
             assert result.title
             assert result.x
             assert result.y
+
+    def test_geocode__cancelled(self):
+        answers = dict(photon=(0, []), opencage=(0, []))
+        with patch.object(poor.Geocoder, "geocode", autospec=True,
+                          side_effect=self.fake_geocode(answers)), \
+             patch("poor.http.is_available", return_value=True):
+            with poor.http.channel("geocode"):
+                # Supersede the request with a newer one.
+                with poor.http.channel("test"), poor.http.channel("geocode"):
+                    pass
+                assert self.provider.geocode("seurasaari", 0, 0, 16, {}) == []
+        assert not self.provider._stats
+
+    def test_geocode__deadline(self):
+        place = dict(title="Seurasaari", x=24.885, y=60.185)
+        answers = dict(photon=(1, []), opencage=(1, [place]))
+        with patch.object(poor.Geocoder, "geocode", autospec=True,
+                          side_effect=self.fake_geocode(answers)), \
+             patch("poor.http.is_available", return_value=True), \
+             patch.object(self.provider, "DEADLINE", 0.1):
+            assert self.provider.geocode("seurasaari", 0, 0, 16, {}) == []
+
+    def test_geocode__merge(self):
+        place1 = dict(title="Seurasaari", x=24.885, y=60.185)
+        place2 = dict(title="Seurasari", x=24.886, y=60.185)
+        place3 = dict(title="Seurasaari Open-Air Museum", x=24.884, y=60.183)
+        answers = dict(photon=(0.1, [place1]), opencage=(0, [place2, place3]))
+        with patch.object(poor.Geocoder, "geocode", autospec=True,
+                          side_effect=self.fake_geocode(answers)), \
+             patch("poor.http.is_available", return_value=True):
+            results = self.provider.geocode("seurasaari", 0, 0, 16, {})
+        assert results == [place1, place3]
+
+    def test_geocode__order(self):
+        place = dict(title="Seurasaari", x=24.885, y=60.185)
+        answers = dict(photon=(0.2, []), opencage=(0, [place]))
+        with patch.object(poor.Geocoder, "geocode", autospec=True,
+                          side_effect=self.fake_geocode(answers)), \
+             patch("poor.http.is_available", return_value=True):
+            assert self.provider.geocode("seurasaari", 0, 0, 16, {}) == [place]
+        for i in range(100):
+            if len(self.provider._stats) == 2: break
+            time.sleep(0.01)
+        assert self.provider.providers == ["opencage", "photon"]
@@ -22,13 +22,12 @@ https://developer.foursquare.com/docs/api/venues/explore
 https://developer.foursquare.com/docs/api/venues/details
 """
 
-import copy
 import functools
 import itertools
 import poor
+import traceback
 import urllib.parse
 
-from concurrent.futures import ThreadPoolExecutor
 from poor.i18n import _
 
 CONF_DEFAULTS = {"sort_by_distance": False}
@@ -61,7 +60,7 @@ VENUE_URL = "".join((
     "&v=20180603",
 ))
 
-cache = {}
+cache = poor.cache.Cache("guide.foursquare")
 
 def autocomplete_type(query, params=None):
     """Return a list of autocomplete dictionaries matching `query`."""
@@ -100,37 +99,8 @@ def get_link(id):
     """Return hyperlink for venue with given `id`."""
     return "https://foursquare.com/v/{}?ref={}".format(id, CLIENT_ID)
 
-def inject_venue_details(results):
-    """Edit details of venues in-place to `results`."""
-    # We need separate API calls to get venue details.
-    # These are "premium" calls, aggressively rate-limited,
-    # returning HTTP 403 once the limit has been exhausted.
-    # https://developer.foursquare.com/docs/api/troubleshooting/rate-limits
-    with ThreadPoolExecutor(10) as executor:
-        urls = [VENUE_URL.format(id=x.id) for x in results]
-        details = executor.map(poor.http.get_json, urls)
-        details = list(map(poor.AttrDict, details))
-        venues = [x.response.venue for x in details]
-        for i in range(len(results)):
-            results[i].description = parse_description(venues[i])
-            results[i].link = parse_url(venues[i], results[i].link)
-            results[i].text = parse_text(venues[i])
-            results[i].phone = parse_phone(venues[i])
-
-def nearby(query_type, query_name, near, radius, params):
-    """Return X, Y and a list of dictionaries of places matching `query`."""
-    type_id = get_types().get(query_type, None)
-    if type_id is not None:
-        query = "&categoryId=" + type_id.id
-    else:
-        query = ""
-        query_name = query_name + ' ' + query_type
-    query = query + '&query=' + urllib.parse.quote_plus(query_name) if query_name else query
-    sort_by_distance = str(int(poor.conf.guides.foursquare.sort_by_distance))
-    x, y = prepare_point(near)
-    url = EXPLORE_URL.format(**locals()) + query
-    with poor.util.silent(KeyError):
-        return copy.deepcopy(cache[url])
+def get_results(url, x, y):
+    """Return X, Y and a list of dictionaries of places found at `url`."""
     results = poor.http.get_json(url)
     results = poor.AttrDict(results)
     results = [poor.AttrDict(
@@ -148,12 +118,51 @@ def nearby(query_type, query_name, near, radius, params):
         group["items"] for group in
         results.response.get("groups", [])
     )]
-    with poor.util.silent(Exception, tb=True):
+    try:
         inject_venue_details(results)
-    if results and results[0]:
-        cache[url] = copy.deepcopy((x, y, results))
+    except poor.http.Cancelled:
+        # Let results without details go uncached.
+        raise
+    except Exception:
+        traceback.print_exc()
     return x, y, results
 
+def inject_venue_details(results):
+    """Edit details of venues in-place to `results`."""
+    # We need separate API calls to get venue details.
+    # These are "premium" calls, aggressively rate-limited,
+    # returning HTTP 403 once the limit has been exhausted.
+    # https://developer.foursquare.com/docs/api/troubleshooting/rate-limits
+    urls = [VENUE_URL.format(id=x.id) for x in results]
+    details = poor.http.get_json_many(urls, fail_fast=True)
+    for i in range(len(results)):
+        if isinstance(details[i], Exception): continue
+        with poor.util.silent(Exception, tb=True):
+            venue = poor.AttrDict(details[i]).response.venue
+            results[i].description = parse_description(venue)
+            results[i].link = parse_url(venue, results[i].link)
+            results[i].text = parse_text(venue)
+            results[i].phone = parse_phone(venue)
+
+def nearby(query_type, query_name, near, radius, params):
+    """Return X, Y and a list of dictionaries of places matching `query`."""
+    type_id = get_types().get(query_type, None)
+    if type_id is not None:
+        query = "&categoryId=" + type_id.id
+    else:
+        query = ""
+        query_name = query_name + ' ' + query_type
+    query_name = poor.util.normalize_query(query_name)
+    query = query + '&query=' + urllib.parse.quote_plus(query_name) if query_name else query
+    sort_by_distance = str(int(poor.conf.guides.foursquare.sort_by_distance))
+    x, y = prepare_point(near)
+    if isinstance(near, (list, tuple)):
+        x, y, radius = poor.util.quantize_near(x, y, radius)
+    url = EXPLORE_URL.format(**locals()) + query
+    return cache.fetch(url,
+                       lambda: get_results(url, x, y),
+                       valid=lambda value: bool(value[2]))
+
 def parse_address(venue):
     with poor.util.silent(Exception):
         return ", ".join(venue.location.formattedAddress).strip()
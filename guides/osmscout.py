@@ -21,7 +21,6 @@ Listing nearby places using OSM Scout Server.
 https://github.com/rinigus/osmscout-server
 """
 
-import copy
 import functools
 import json
 import poor
@@ -49,7 +48,7 @@ URL_ROUTEONLY = ("http://localhost:8553/v1/guide"
                  "&name={query_name}"
                  "&radius={radius}")
 
-cache = {}
+cache = poor.cache.Cache("guide.osmscout")
 
 def autocomplete_type(query, params=None):
     """Return a list of autocomplete dictionaries matching `query`."""
@@ -74,7 +73,7 @@ def get_types():
 def nearby(query_type, query_name, near, radius, params):
     """Return X, Y and a list of dictionaries of places matching `query`."""
     query_type = urllib.parse.quote_plus(query_type)
-    query_name = urllib.parse.quote_plus(query_name)
+    query_name = urllib.parse.quote_plus(poor.util.normalize_query(query_name))
     limit = params.get("limit", 50)
     route_search = params.get("alongRoute", False)
     route = params.get("route", {})
@@ -83,34 +82,17 @@ def nearby(query_type, query_name, near, radius, params):
         url = URL_ROUTEONLY.format(**locals())
     elif isinstance(near, (list, tuple)):
         x, y = near[0], near[1]
+        if not route_search:
+            x, y, radius = poor.util.quantize_near(x, y, radius)
         url = URL_XY.format(**locals())
     else:
         search = urllib.parse.quote_plus(near)
         url = URL_SEARCH.format(**locals())
     if route_search:
-        results = poor.http.post_json(url, json.dumps(route))
-    else:
-        with poor.util.silent(KeyError):
-            return copy.deepcopy(cache[url])
-        results = poor.http.get_json(url)
-    results = poor.AttrDict(results)
-    x = float(results.origin.lng)
-    y = float(results.origin.lat)
-    results = [dict(
-        address=parse_address(result),
-        link=result.get("website", ""),
-        phone=result.get("phone", ""),
-        poi_type=parse_type(result),
-        postcode=result.get("postal_code", ""),
-        title=result.title,
-        description=parse_description(result),
-        distance=float(result.distance),
-        x=float(result.lng),
-        y=float(result.lat),
-    ) for result in results.results]
-    if not route_search and results and results[0]:
-        cache[url] = copy.deepcopy((x, y, results))
-    return x, y, results
+        return parse_results(poor.http.post_json(url, json.dumps(route)))
+    return cache.fetch(url,
+                       lambda: parse_results(poor.http.get_json(url)),
+                       valid=lambda value: bool(value[2]))
 
 def normalize(t):
     """Normalize the string"""
@@ -133,6 +115,25 @@ def parse_description(result):
         items.append(result.admin_region)
     return ", ".join(items) or "–"
 
+def parse_results(results):
+    """Return X, Y and a list of dictionaries of places from `results`."""
+    results = poor.AttrDict(results)
+    x = float(results.origin.lng)
+    y = float(results.origin.lat)
+    results = [dict(
+        address=parse_address(result),
+        link=result.get("website", ""),
+        phone=result.get("phone", ""),
+        poi_type=parse_type(result),
+        postcode=result.get("postal_code", ""),
+        title=result.title,
+        description=parse_description(result),
+        distance=float(result.distance),
+        x=float(result.lng),
+        y=float(result.lat),
+    ) for result in results.results]
+    return x, y, results
+
 def parse_type(result):
     with poor.util.silent(Exception):
         type = result.type
@@ -17,6 +17,8 @@
 
 import poor.test
 
+from unittest.mock import patch
+
 
 class TestModule(poor.test.TestCase):
 
@@ -30,6 +32,15 @@ class TestModule(poor.test.TestCase):
         for result in results:
             assert result.label
 
+    def test_get_results__cancelled(self):
+        provider = self.guide._provider
+        response = dict(response=dict(groups=[dict(items=[dict(venue=dict(
+            id="1", name="Cafe", location=dict(lat=60.18, lng=24.81)))])]))
+        with patch("poor.http.get_json", return_value=response), \
+             patch("poor.http.get_json_many", side_effect=poor.http.Cancelled):
+            self.assert_raises(poor.http.Cancelled,
+                               provider.get_results, "url", 24.81, 60.18)
+
     def test_nearby(self):
         results = self.guide.nearby("restaurant", "", (24.8099,60.1828), 1000)
         results = list(map(poor.AttrDict, results))
@@ -40,8 +40,10 @@ from poor.paths import DATA_HOME_DIR
 from poor.paths import LOCALE_DIR
 from poor import i18n
 from poor import util
+from poor import cache
 from poor import http
 from poor import polysimp
+from poor import ranking
 from poor import storage
 from poor.attrdict import AttrDict
 from poor.config import ConfigurationStore
@@ -52,6 +54,8 @@ from poor.guide import Guide
 from poor.history import HistoryManager
 from poor.keystore import KeyStore
 key = KeyStore()
+from poor.searchindex import SearchIndex
+index = SearchIndex()
 from poor.magfield import MagField
 from poor.router import Router
 from poor.sun import Sun
@@ -60,6 +64,7 @@ from poor.application import Application
 
 assert Application
 assert AttrDict
+assert cache
 assert CACHE_HOME_DIR
 assert CONFIG_HOME_DIR
 assert ConfigurationStore
@@ -76,7 +81,9 @@ assert MagField
 assert Map
 assert MapManager
 assert polysimp
+assert ranking
 assert Router
+assert SearchIndex
 assert storage
 assert Sun
 assert util
@@ -17,9 +17,16 @@
 
 """An application to display maps and stuff."""
 
+import collections
+import itertools
 import poor
+import pyotherside
+import queue
 import random
 import sys
+import threading
+
+from poor.searchindex import format_result
 
 __all__ = ("Application",)
 
@@ -35,6 +42,7 @@ class Application:
         random.seed()
         self.history = poor.HistoryManager()
         self.magfield = poor.MagField()
+        self._search_ids = itertools.count(1)
         self.sun = poor.Sun()
         self._voice = {}
 
@@ -48,6 +56,8 @@ class Application:
         self.set_geocoder(poor.conf.geocoder)
         self.set_guide(poor.conf.guide)
         self.set_router(poor.conf.router)
+        self.prewarm()
+        poor.http.report()
 
     def get_attribution(self, type, providers):
         """Return attribution entries for given providers."""
@@ -60,6 +70,18 @@ class Application:
                         items.append(item)
         return items
 
+    def prewarm(self):
+        """Open connections to hosts of current providers in background."""
+        urls = []
+        for provider in (self.geocoder, self.guide, self.router):
+            if provider is None: continue
+            with poor.util.silent(Exception):
+                urls.extend(provider.urls)
+        if self.router is not None:
+            with poor.util.silent(Exception):
+                urls.extend(self.router.geocoder.urls)
+        poor.http.prewarm(urls)
+
     def quit(self):
         """Quit the application."""
         print("Quitting")
@@ -73,6 +95,67 @@ class Application:
         for i in self._voice.keys(): self._voice[i].quit()
         print("All quit methods called")
 
+    def search(self, query, x=0, y=0, center_x=0, center_y=0, zoom=16, radius=1000):
+        """
+        Return a list of places matching `query` from all sources.
+
+        History, bookmarked POIs, the geocoder and, if a point to search
+        around is known, the guide are searched at once. Results so far are
+        sent to QML as each source answers, as signal "search.results" with
+        the search id, deduplicated and ranked results, see
+        :func:`poor.ranking.rank`, and a list of sources not yet answered.
+        Search ids increase, signals of earlier searches can be ignored.
+        `x` and `y` should be the current position, `center_x` and
+        `center_y` the point to search around, by default the position,
+        and `radius` meters around that to search the guide.
+        """
+        if not query.strip(): return []
+        id = next(self._search_ids)
+        center_x, center_y = center_x or x, center_y or y
+        # Sources in order of preference for duplicates.
+        sources = collections.OrderedDict()
+        sources["history"] = lambda: self._search_index("history", query, x, y)
+        sources["poi"] = lambda: self._search_index("poi", query, x, y)
+        if self.geocoder is not None:
+            sources["geocoder"] = lambda: self.geocoder.geocode(
+                query, x, y, center_x, center_y, zoom)
+        if self.guide is not None and center_x and center_y:
+            sources["guide"] = lambda: self.guide.nearby(
+                "", query, (center_x, center_y), radius)
+        answers = queue.Queue()
+        def run(source, function):
+            results = []
+            with poor.util.silent(Exception, tb=True):
+                results = function()
+            # Geocoder and guide return a dict(error=True) on errors.
+            answers.put((source, results if isinstance(results, list) else []))
+        for source, function in sources.items():
+            threading.Thread(target=run, args=(source, function), daemon=True).start()
+        found = {}
+        pending = list(sources)
+        while pending:
+            source, results = answers.get()
+            pending.remove(source)
+            found[source] = results
+            merged = poor.ranking.rank([place for name in sources if name in found
+                                        for place in found[name]], query, x, y)
+            pyotherside.send("search.results", id, merged, list(pending))
+        return merged
+
+    def _search_index(self, source, query, x, y):
+        """Return a list of places from `source` in the search index."""
+        results = []
+        for place in poor.index.search(query, x, y, sources=(source,)):
+            result = format_result(place)
+            result["distance"] = ""
+            result["provider"] = source
+            if x and y:
+                result["distance"] = poor.util.format_distance_and_bearing(
+                    poor.util.calculate_distance(x, y, place["x"], place["y"]),
+                    poor.util.calculate_bearing(x, y, place["x"], place["y"]))
+            results.append(result)
+        return results
+
     def set_basemap(self, basemap):
         """Set basemap from string `basemap`."""
         self.basemap.set_basemap(basemap)
@@ -114,6 +197,7 @@ class Application:
         self.set_geocoder(poor.conf.geocoder)
         self.set_guide(poor.conf.guide)
         self.set_router(poor.conf.router)
+        self.prewarm()
 
     def set_router(self, router):
         """Set routing provider from string `router`."""
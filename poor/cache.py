@@ -0,0 +1,418 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2026 Rinigus
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Bounded in-memory caches of provider results."""
+
+# IMPLEMENTATION COMMENTS
+#
+# Caches are used by providers through the mapping interface, i.e.
+# cache[key] raises KeyError for missing and expired items, so that
+# providers can keep their "with silent(KeyError): return cache[key]"
+# idiom. Memory use is estimated recursively with sys.getsizeof when
+# items are stored, which is approximate, but good enough to bound the
+# total. All caches created are registered to allow checking memory use
+# and hit rates across providers, see stats.
+#
+# Values are frozen when stored, dictionaries and lists converted to
+# read-only FrozenDicts and FrozenLists, so that cache hits can be returned
+# without copying. Callers that need to modify results should make
+# a shallow copy of the parts they modify, e.g. dict(result), the
+# rest can be shared with the cache.
+#
+# Cache.fetch wraps finding a value for a missing key. Empty values and
+# failures are kept for a short time, NEGATIVE_TTL, to avoid repeating
+# them on every keystroke or retry. Other expired values are kept for
+# STALE seconds more: these are returned immediately while refreshed in
+# a background thread and, if refreshing fails, served as stale while the
+# failure is remembered. Callers can check if stale values were served
+# with the watch context manager, which is thread-local like the channels
+# and priorities of poor.http.
+
+import collections
+import contextlib
+import copy
+import itertools
+import poor
+import sys
+import threading
+import time
+import weakref
+
+__all__ = ("Cache", "FrozenDict", "FrozenList")
+
+# Default maximum approximate size in bytes
+# and lifetime in seconds of items in a cache.
+MAX_SIZE = 4 * 1024**2
+TTL = 3600
+
+# Maximum approximate size in bytes of a cache of routes,
+# long routes taking a few megabytes each.
+MAX_SIZE_ROUTER = 32 * 1024**2
+
+# Seconds to keep empty values and failures to find values
+# and seconds to keep expired values for use while refreshing.
+NEGATIVE_TTL = 30
+STALE = 24 * 3600
+
+# Amount of items of long lists to estimate size from.
+SIZE_SAMPLE = 100
+
+# Types of items that need no freezing.
+SCALARS = (bool, float, int, str, type(None))
+
+_caches = weakref.WeakValueDictionary()
+_local = threading.local()
+
+
+def clear():
+    """Remove all items from all caches."""
+    for cache in list(_caches.values()):
+        cache.clear()
+
+def freeze(value):
+    """Return `value` with dictionaries and lists made read-only."""
+    if isinstance(value, (FrozenDict, FrozenList)):
+        return value
+    if isinstance(value, dict):
+        return FrozenDict((k, freeze(v)) for k, v in value.items())
+    if isinstance(value, list):
+        if _is_flat(value):
+            # Copy e.g. route coordinates at C speed.
+            return FrozenList(value)
+        return FrozenList(freeze(x) for x in value)
+    if isinstance(value, tuple):
+        if _is_flat(value):
+            return value
+        return tuple(freeze(x) for x in value)
+    return value
+
+def get_size(value):
+    """Return approximate memory use of `value` in bytes."""
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        for k, v in value.items():
+            size += get_size(k) + get_size(v)
+    elif isinstance(value, (list, tuple)) and len(value) > SIZE_SAMPLE:
+        # Estimate long lists, e.g. route coordinates,
+        # from evenly spaced items rather than all.
+        step = len(value) / SIZE_SAMPLE
+        sample = [value[int(i * step)] for i in range(SIZE_SAMPLE)]
+        size += sum(map(get_size, sample)) * len(value) // SIZE_SAMPLE
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        for item in value:
+            size += get_size(item)
+    return size
+
+def _is_flat(value):
+    """Return ``True`` if `value` contains only immutable scalars."""
+    return all(map(isinstance, value, itertools.repeat(SCALARS)))
+
+def stats():
+    """Return a dictionary of statistics of caches by name."""
+    return {k: v.stats for k, v in list(_caches.items())}
+
+@contextlib.contextmanager
+def watch():
+    """
+    Yield a dictionary to track use of caches in the current thread.
+
+    The "stale" item of the dictionary is set to ``True`` if a stale value
+    was served by :meth:`Cache.fetch` within the context.
+    """
+    previous = getattr(_local, "state", None)
+    state = _local.state = dict(stale=False)
+    try:
+        yield state
+    finally:
+        _local.state = previous
+        if previous is not None and state["stale"]:
+            previous["stale"] = True
+
+
+class Cache:
+
+    """
+    Thread-safe LRU cache with expiry and a memory budget.
+
+    Values are stored frozen, see :func:`freeze`, and returned as such
+    without copying. Items are evicted least recently used first once the
+    approximate total size exceeds `max_size` bytes. Items older than
+    `ttl` seconds are considered missing, ``None`` meaning no expiry, but
+    kept for `stale` seconds more for use by :meth:`fetch`. `name`
+    identifies the cache in :func:`stats`.
+    """
+
+    def __init__(self, name, max_size=MAX_SIZE, ttl=TTL, stale=STALE):
+        """Initialize a :class:`Cache` instance."""
+        self._evictions = 0
+        self._failures = {}
+        self._hits = 0
+        self._items = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self._max_size = max_size
+        self._misses = 0
+        self._refreshing = set()
+        self._size = 0
+        self.name = name
+        self.stale = stale
+        self.ttl = ttl
+        _caches[name] = self
+
+    def __contains__(self, key):
+        """Return ``True`` if `key` has a value that has not expired."""
+        with self._lock:
+            return self._get(key, count=False) is not None
+
+    def __delitem__(self, key):
+        """Remove `key` from the cache."""
+        with self._lock:
+            self._remove(key)
+
+    def __getitem__(self, key):
+        """Return value of `key` or raise :class:`KeyError`."""
+        with self._lock:
+            item = self._get(key)
+            if item is None:
+                raise KeyError(key)
+            return item[0]
+
+    def __len__(self):
+        """Return the amount of items in the cache."""
+        return len(self._items)
+
+    def __setitem__(self, key, value):
+        """Store `value` for `key`, evicting old items if needed."""
+        self.set(key, value)
+
+    @poor.util.locked_method
+    def clear(self):
+        """Remove all items from the cache."""
+        self._failures.clear()
+        self._items.clear()
+        self._size = 0
+
+    def fetch(self, key, function, valid=bool):
+        """
+        Return value of `key`, calling `function` to find it if missing.
+
+        Values found are stored as usual if `valid(value)` is ``True``,
+        else for :data:`NEGATIVE_TTL` seconds, as are exceptions raised,
+        to be raised again. Expired values are returned and refreshed in
+        a background thread or, if refreshing failed, returned marked
+        stale, see :func:`watch`.
+        """
+        with self._lock:
+            item = self._get(key, stale=True)
+            failure = self._get_failure(key)
+        if item is not None:
+            if item[2] is None or item[2] >= time.time():
+                return item[0]
+            if failure is not None:
+                if getattr(_local, "state", None) is not None:
+                    _local.state["stale"] = True
+                return item[0]
+            self._refresh(key, function, valid)
+            return item[0]
+        if failure is not None:
+            raise failure
+        return self._find(key, function, valid)
+
+    def _find(self, key, function, valid):
+        """Return value of `key` found by calling `function`."""
+        try:
+            value = function()
+        except poor.http.Cancelled:
+            raise
+        except Exception as error:
+            with self._lock:
+                self._failures[key] = (error, time.time() + NEGATIVE_TTL)
+            raise
+        with self._lock:
+            self._failures.pop(key, None)
+        if valid(value):
+            self.set(key, value)
+        else:
+            # Not worth serving stale, find again once expired.
+            self.set(key, value, NEGATIVE_TTL, stale=0)
+        return value
+
+    def get(self, key, default=None):
+        """Return value of `key` or `default`."""
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def _get(self, key, count=True, stale=False):
+        """Return item of `key` or ``None`` if missing or expired."""
+        item = self._items.get(key)
+        if item is not None and item[2] is not None and item[2] < time.time():
+            if item[3] < time.time():
+                self._remove(key)
+                item = None
+            elif not stale:
+                item = None
+        if item is None:
+            if count: self._misses += 1
+            return None
+        self._items.move_to_end(key)
+        if count: self._hits += 1
+        return item
+
+    def _get_failure(self, key):
+        """Return exception of a recent failure to find `key` or ``None``."""
+        failure = self._failures.get(key)
+        if failure is None: return None
+        if failure[1] < time.time():
+            del self._failures[key]
+            return None
+        return failure[0]
+
+    def _refresh(self, key, function, valid):
+        """Find value of `key` in a background thread."""
+        with self._lock:
+            if key in self._refreshing: return
+            self._refreshing.add(key)
+        def refresh():
+            # Failures are remembered by _find.
+            with poor.util.silent(Exception), \
+                 poor.http.priority(poor.http.PRIORITY_PREFETCH):
+                self._find(key, function, valid)
+            with self._lock:
+                self._refreshing.discard(key)
+        threading.Thread(target=refresh, daemon=True).start()
+
+    def _remove(self, key):
+        """Remove `key` from the cache if present."""
+        item = self._items.pop(key, None)
+        if item is not None:
+            self._size -= item[1]
+
+    def set(self, key, value, ttl=-1, stale=-1):
+        """
+        Store `value` for `key`, evicting old items if needed.
+
+        `ttl` overrides the lifetime of the cache for this item, ``None``
+        meaning no expiry and the default -1 using the cache's `ttl`.
+        `stale` likewise overrides the seconds to keep the item once
+        expired for use by :meth:`fetch`.
+        """
+        if ttl == -1: ttl = self.ttl
+        if stale == -1: stale = self.stale
+        value = freeze(value)
+        size = get_size(key) + get_size(value)
+        expires = None if ttl is None else time.time() + ttl
+        keep = None if expires is None else expires + (stale or 0)
+        with self._lock:
+            self._remove(key)
+            if size > self._max_size: return
+            self._items[key] = (value, size, expires, keep)
+            self._size += size
+            while self._size > self._max_size:
+                self._remove(next(iter(self._items)))
+                self._evictions += 1
+
+    @property
+    def size(self):
+        """Return approximate total size of items in bytes."""
+        return self._size
+
+    @property
+    def stats(self):
+        """Return a dictionary of counters of cache use."""
+        with self._lock:
+            return dict(evictions=self._evictions,
+                        hits=self._hits,
+                        items=len(self._items),
+                        max_size=self._max_size,
+                        misses=self._misses,
+                        size=self._size)
+
+
+class FrozenDict(dict):
+
+    """
+    Read-only dictionary.
+
+    Copying, e.g. with :func:`copy.copy` or ``dict(value)``, returns
+    a regular modifiable dictionary.
+    """
+
+    def __copy__(self):
+        """Return a modifiable shallow copy."""
+        return dict(self)
+
+    def __deepcopy__(self, memo):
+        """Return a modifiable deep copy."""
+        return {copy.deepcopy(k, memo): copy.deepcopy(v, memo)
+                for k, v in self.items()}
+
+    def __reduce__(self):
+        """Return arguments to reconstruct when pickling."""
+        return (self.__class__, (dict(self),))
+
+    def _read_only(self, *args, **kwargs):
+        """Raise :class:`TypeError` on modification attempts."""
+        raise TypeError("FrozenDict is read-only")
+
+    __delitem__ = _read_only
+    __ior__ = _read_only
+    __setitem__ = _read_only
+    clear = _read_only
+    pop = _read_only
+    popitem = _read_only
+    setdefault = _read_only
+    update = _read_only
+
+
+class FrozenList(list):
+
+    """
+    Read-only list.
+
+    Copying, e.g. with :func:`copy.copy` or ``list(value)``, returns
+    a regular modifiable list.
+    """
+
+    def __copy__(self):
+        """Return a modifiable shallow copy."""
+        return list(self)
+
+    def __deepcopy__(self, memo):
+        """Return a modifiable deep copy."""
+        return [copy.deepcopy(x, memo) for x in self]
+
+    def __reduce__(self):
+        """Return arguments to reconstruct when pickling."""
+        return (self.__class__, (list(self),))
+
+    def _read_only(self, *args, **kwargs):
+        """Raise :class:`TypeError` on modification attempts."""
+        raise TypeError("FrozenList is read-only")
+
+    __delitem__ = _read_only
+    __iadd__ = _read_only
+    __imul__ = _read_only
+    __setitem__ = _read_only
+    append = _read_only
+    clear = _read_only
+    extend = _read_only
+    insert = _read_only
+    pop = _read_only
+    remove = _read_only
+    reverse = _read_only
+    sort = _read_only
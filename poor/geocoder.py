@@ -18,6 +18,7 @@
 """Translating addresses and names into coordinates."""
 
 import importlib.machinery
+import json
 import os
 import poor
 import random
@@ -28,12 +29,19 @@ import traceback
 
 from poor.i18n import _
 from poor.openlocationcode.openlocationcode import isFull as olc_isFull, decode as olc_decode
+from poor.prefixcache import PrefixCache
+from poor.reversecache import ReverseCache
+from poor.searchindex import format_result
 
 __all__ = ("Geocoder",)
 
 RE_GEO_URI = re.compile(r"\bgeo:(-?[\d.]+),(-?[\d.]+)\b", re.IGNORECASE)
 RE_LAT_LON = re.compile(r"^\s*(-?\d+(\.\d+)?)[^\w\-]+(-?\d+(\.\d+)?)\s*")
 
+# Maximum amount of autocomplete results from the search index
+# of history, bookmarked POIs and earlier geocoding results.
+LOCAL_LIMIT = 3
+
 
 class Geocoder:
 
@@ -55,7 +63,9 @@ class Geocoder:
         self._attribution = values.get("attribution", {})
         self.id = id
         self.name = values["name"]
+        self._prefix_cache = PrefixCache()
         self._provider = None
+        self._reverse_cache = ReverseCache()
         self._init_provider(re.sub(r"\.json$", ".py", path))
 
     @property
@@ -68,24 +78,47 @@ class Geocoder:
         Return a list of autocomplete dictionaries matching `query`.
 
         `params` can be used to specify a dictionary of geocoder-specific
-        parameters.
+        parameters. Matches from the search index of known places,
+        see :attr:`poor.index`, are listed first, followed by those of
+        the provider. If the provider defines ``AUTOCOMPLETE_LIMIT``, the
+        amount of results it returns at most, results for longer queries
+        are derived from cached results of shorter ones when possible.
         """
         params = params or {}
-        if (not hasattr(self._provider, "autocomplete") or
-            not callable(self._provider.autocomplete) or
-            RE_GEO_URI.search(query) or
+        if (RE_GEO_URI.search(query) or
             RE_LAT_LON.search(query) or
             olc_isFull(query.strip())):
             return []
+        local = self._search_local(query, x or center_x, y or center_y)
+        if (not hasattr(self._provider, "autocomplete") or
+            not callable(self._provider.autocomplete)):
+            return local
+        results = self._autocomplete(query, center_x, center_y, zoom, params)
+        return poor.ranking.deduplicate(local + results)
+
+    def _autocomplete(self, query, x, y, zoom, params):
+        """Return a list of autocomplete dictionaries from provider."""
+        limit = getattr(self._provider, "AUTOCOMPLETE_LIMIT", None)
+        if limit is not None:
+            limit = params.get("limit", limit)
+            context = self._get_autocomplete_context(x, y, zoom, params)
+            results = self._prefix_cache.get(context, query)
+            if results is not None:
+                return self._prepare_autocomplete(results)
         try:
-            results = self._provider.autocomplete(query=query, x=center_x, y=center_y, zoom=zoom, params=params)
+            with poor.http.channel("autocomplete"), \
+                 poor.http.priority(poor.http.PRIORITY_AUTOCOMPLETE), \
+                 poor.cache.watch() as state:
+                results = self._provider.autocomplete(query=query, x=x, y=y, zoom=zoom, params=params)
+        except poor.http.Cancelled:
+            return []
         except Exception:
             print("Autocomplete failed:", file=sys.stderr)
             traceback.print_exc()
             return []
-        for result in results:
-            result["provider"] = self.id
-        return results
+        if limit is not None and not state["stale"]:
+            self._prefix_cache.put(context, query, results, len(results) < limit)
+        return self._prepare_autocomplete(results, state["stale"])
 
     def _format_distance(self, x1, y1, x2, y2):
         """Calculate and format a human readable distance string."""
@@ -99,7 +132,8 @@ class Geocoder:
 
         `params` can be used to specify a dictionary of geocoder-specific
         parameters. If the current position as `x` and `y` are provided,
-        the results will include correct distance and bearing.
+        the results will include correct distance and bearing. Results are
+        deduplicated and ranked, see :func:`poor.ranking.rank`.
         """
         params = params or {}
         # check special string queries
@@ -140,18 +174,37 @@ class Geocoder:
                              provider=self.id)]
 
         try:
-            results = self._provider.geocode(query=query, x=center_x, y=center_y, zoom=zoom, params=params)
+            with poor.http.channel("geocode"), \
+                 poor.http.priority(poor.http.PRIORITY_GEOCODE), \
+                 poor.cache.watch() as state:
+                results = self._provider.geocode(query=query, x=center_x, y=center_y, zoom=zoom, params=params)
+        except poor.http.Cancelled:
+            return []
         except socket.timeout:
             return dict(error=True, message=_("Connection timed out"))
         except Exception:
             print("Geocoding failed:", file=sys.stderr)
             traceback.print_exc()
             return []
+        for result in results:
+            # Index results to find them while typing later.
+            poor.index.add("geocoder", {k: v for k, v in result.items()
+                                        if k not in ("distance", "provider")})
+        # Results can be frozen if cached by provider.
+        results = [dict(x) for x in results]
         for result in results:
             result["distance"] = self._format_distance(
                 x, y, result["x"], result["y"])
             result["provider"] = self.id
-        return results
+            if state["stale"]:
+                result["stale"] = True
+        return poor.ranking.rank(results, query if isinstance(query, str) else "", x, y)
+
+    def _get_autocomplete_context(self, x, y, zoom, params):
+        """Return key of parameters affecting autocomplete results."""
+        bias = poor.util.quantize_bias(x, y, zoom) if x and y else None
+        return json.dumps([bias, int(zoom or 0), params],
+                          sort_keys=True, default=str)
 
     def _init_provider(self, path):
         """Initialize geocoding provider module from `path`."""
@@ -167,28 +220,68 @@ class Geocoder:
             path = os.path.join(poor.DATA_DIR, leaf)
         return path, poor.util.read_json(path)
 
+    def _prepare_autocomplete(self, results, stale=False):
+        """Return a modifiable copy of autocomplete `results`."""
+        # Results can be frozen if cached by provider.
+        results = [dict(x) for x in results]
+        for result in results:
+            result["provider"] = self.id
+            if stale:
+                result["stale"] = True
+        return results
+
     def reverse(self, x, y, radius, limit=1, params=None):
         """
         Return a closest object near given coordinates.
 
         `params` can be used to specify a dictionary of geocoder-specific
-        parameters.
+        parameters. Results of an earlier query close enough to `x`, `y`,
+        see :class:`poor.reversecache.ReverseCache`, are reused if some of
+        those are within `radius`.
         """
         params = params or {}
-
+        key = json.dumps(params, sort_keys=True, default=str)
+        results = self._reverse_cache.get(x, y, radius, limit, key)
+        if results is not None:
+            for result in results:
+                result["provider"] = self.id
+            return results
         try:
-            results = self._provider.reverse(x=x, y=y, radius=radius, limit=limit, params=params)
+            with poor.http.priority(poor.http.PRIORITY_GEOCODE), \
+                 poor.cache.watch() as state:
+                results = self._provider.reverse(x=x, y=y, radius=radius, limit=limit, params=params)
         except socket.timeout:
             return dict(error=True, message=_("Connection timed out"))
         except Exception:
             print("Geocoding failed:", file=sys.stderr)
             traceback.print_exc()
             return []
+        if results and not state["stale"]:
+            self._reverse_cache.put(x, y, radius, limit, results, key)
         results_filtered = []
+        # Results can be frozen if cached by provider.
+        results = [dict(x) for x in results]
         for result in results:
             if "distance" not in result:
                 result["distance"] = poor.util.calculate_distance(x, y, result["x"], result["y"])
             if result["distance"] < radius:
                 result["provider"] = self.id
+                if state["stale"]:
+                    result["stale"] = True
                 results_filtered.append(result)
         return results_filtered
+
+    def _search_local(self, query, x, y):
+        """Return a list of autocomplete dictionaries from search index."""
+        return [dict(format_result(place), provider=self.id)
+                for place in poor.index.search(query, x, y, limit=LOCAL_LIMIT)]
+
+    @property
+    def urls(self):
+        """Return a list of URL templates used by the provider."""
+        urls = poor.util.get_provider_urls(self._provider)
+        # Fallback geocoders list the actual providers used.
+        for id in getattr(self._provider, "providers", []):
+            with poor.util.silent(Exception):
+                urls.extend(Geocoder(id).urls)
+        return urls
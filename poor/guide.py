@@ -71,7 +71,8 @@ class Guide:
         params = params or {}
         if not self.autocomplete_type_supported: return []
         try:
-            results = self._provider.autocomplete_type(query, params)
+            with poor.http.priority(poor.http.PRIORITY_AUTOCOMPLETE):
+                results = self._provider.autocomplete_type(query, params)
         except Exception:
             print("Autocomplete failed:", file=sys.stderr)
             traceback.print_exc()
@@ -118,18 +119,38 @@ class Guide:
         """
         params = params or {}
         try:
-            x, y, results = self._provider.nearby(query_type, query_name, near, radius, params)
+            with poor.http.channel("nearby"), \
+                 poor.http.priority(poor.http.PRIORITY_GUIDE), \
+                 poor.cache.watch() as state:
+                x, y, results = self._provider.nearby(query_type, query_name, near, radius, params)
+        except poor.http.Cancelled:
+            return []
         except socket.timeout:
             return dict(error=True, message=_("Connection timed out"))
         except Exception:
             print("Nearby failed:", file=sys.stderr)
             traceback.print_exc()
             return []
+        # Results can be frozen if cached by provider.
+        results = [dict(x) for x in results]
+        if isinstance(near, (list, tuple)) and not params.get("alongRoute"):
+            # Providers can search around a point snapped to a grid
+            # for caching, measure distance from the actual point.
+            x, y = near[0], near[1]
+            for result in results:
+                result["distance"] = poor.util.calculate_distance(
+                    x, y, result["x"], result["y"])
+            results = [r for r in results if r["distance"] <= radius]
+        # Keep the order of the provider, sorted by distance
+        # or relevance depending on its settings.
+        results = poor.ranking.deduplicate(results)
         for result in results:
             if "distance" not in result:
                 result["distance"] = poor.util.calculate_distance(
                     x, y, result["x"], result["y"])
             result["provider"] = self.id
+            if state["stale"]:
+                result["stale"] = True
         for result in results:
             result["distance"] = self._format_distance(
                 x, y, result["x"], result["y"], result["distance"])
@@ -141,3 +162,8 @@ class Guide:
         path = re.sub(r"\.json$", "_settings.qml", self._path)
         if not os.path.isfile(path): return None
         return poor.util.path2uri(path)
+
+    @property
+    def urls(self):
+        """Return a list of URL templates used by the provider."""
+        return poor.util.get_provider_urls(self._provider)
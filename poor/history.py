@@ -50,6 +50,7 @@ class HistoryManager:
         if not d['text']: return
         self.remove_destination(d['text'])
         self._destinations.insert(0, d)
+        poor.index.add("history", self._get_index_place(d))
 
     def add_place(self, place):
         """Add `place` to the list of places."""
@@ -90,6 +91,7 @@ class HistoryManager:
         self._place_types = []
         self._places = []
         self._routes = []
+        self._update_index()
         self.write()
 
     @property
@@ -97,6 +99,10 @@ class HistoryManager:
         """Return a list of destinations."""
         return self._destinations[:]
 
+    def _get_index_place(self, dest):
+        """Return destination `dest` as a place for the search index."""
+        return dict(title=dest["text"], x=dest["x"], y=dest["y"])
+
     @property
     def place_names(self):
         """Return a list of place names."""
@@ -143,6 +149,7 @@ class HistoryManager:
                 # old format, 2.2
                 self._routes[i] = dict(locations=self._routes[i], optimized=False)
             self._routes[i] = AttrDict(self._routes[i])
+        self._update_index()
 
     @property
     def routes(self):
@@ -154,6 +161,7 @@ class HistoryManager:
         t = dtxt.strip()
         for i in reversed(range(len(self._destinations))):
             if self._destinations[i]['text'] == t:
+                poor.index.remove("history", self._get_index_place(self._destinations[i]))
                 del self._destinations[i]
 
     def remove_place(self, place):
@@ -188,6 +196,11 @@ class HistoryManager:
             if rkey(self._routes[i]) == key:
                 del self._routes[i]
 
+    def _update_index(self):
+        """Update destinations in the search index of known places."""
+        poor.index.set("history", [self._get_index_place(x)
+                                   for x in self._destinations])
+
     def write(self):
         """Write list of queries to file."""
         with poor.util.silent(Exception, tb=True):
@@ -25,6 +25,43 @@
 # simplicity and, at the same time, ignore ongoing blocked connections
 # when its time to stop the program.
 #
+# Requests are submitted to the thread pool as tasks, each returning a
+# future of the response. Callers can issue several requests at once
+# using the *_async functions and collect the results later; the
+# synchronous functions are thin wrappers waiting for the future. The
+# returned futures can be awaited in asyncio code after wrapping them
+# with asyncio.wrap_future. Worker threads are daemon threads as
+# concurrent.futures.ThreadPoolExecutor would block exit while
+# connections hang.
+#
+# Pending requests are dispatched in the order of priority, set per
+# thread with the priority context manager, so that e.g. a reroute is
+# not stuck behind a burst of guide requests. At most NCONNECTIONS
+# requests per host are dispatched at a time, leaving the remaining
+# workers free for requests to other hosts.
+#
+# Responses to GET requests are cached on disk, see poor.httpcache.
+# Fresh responses are returned without a network round-trip, stale ones
+# with validators are revalidated using conditional requests.
+#
+# Hosts failing repeatedly are tracked by a circuit breaker. Requests
+# to a host that is known to be down fail fast with Unavailable until a
+# cool-down has passed, after which a single probe request is let
+# through, see CircuitBreaker.
+#
+# For benchmarks without network access, exchanges can be recorded to
+# a directory and replayed later, see set_replay_mode and
+# poor.httpreplay.
+#
+# Request counts, bytes, errors and timing histograms are collected
+# per host, see stats. Application starts report to periodically send
+# those to QML as signal "http.stats".
+#
+# Connections are normally opened lazily on first use. To avoid paying
+# DNS, TCP and TLS setup on the first user-visible request, prewarm can
+# be used to connect to the hosts of the current providers at the
+# lowest priority in the background.
+#
 # Turns out that calling connection close method can be either ignored
 # or this call is ignored. For example, if the server has been
 # suspended for one reason or another. As a result, the blocking call
@@ -33,15 +70,28 @@
 # program is closed, as expected.
 
 
+import bisect
+import codecs
+import collections
+import concurrent.futures
+import contextlib
+import copy
 import http.client
+import itertools
 import json
+import os
 import poor
+import pyotherside
 import queue
 import re
 import sys
 import threading
+import time
 import urllib.parse
-from poor.attrdict import AttrDict
+import zlib
+
+from poor.httpcache import ResponseCache
+from poor.httpreplay import Recorder
 
 BROKEN_CONNECTION_ERRORS = [
     BrokenPipeError,
@@ -50,13 +100,131 @@ BROKEN_CONNECTION_ERRORS = [
 ]
 
 HEADERS = {
+    "Accept-Encoding": "gzip, deflate",
     "Connection": "Keep-Alive",
     "User-Agent": "pure-maps/{}".format(poor.__version__),
 }
 
 RE_LOCALHOST = re.compile(r"://(127.0.0.1|localhost)\b")
 
-NTHREADS=4
+# Consecutive failures after which requests to a host fail fast,
+# and the initial and maximum seconds to wait before probing again.
+BREAKER_THRESHOLD = 3
+BREAKER_COOLDOWN = 5
+BREAKER_COOLDOWN_MAX = 300
+
+CACHE_SIZE = 20 * 1024**2
+CHUNK_SIZE = 64 * 1024
+NCONNECTIONS = 4
+STATS_INTERVAL = 60
+NTHREADS = max(8, 2 * poor.util.cpu_count())
+
+# Upper bounds in seconds of timing histogram buckets,
+# the last bucket holds values above the last bound.
+HISTOGRAM_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+# Priorities of requests, lower values are handled first.
+PRIORITY_REROUTE = 0
+PRIORITY_ROUTE = 1
+PRIORITY_GEOCODE = 2
+PRIORITY_AUTOCOMPLETE = 3
+PRIORITY_GUIDE = 4
+PRIORITY_PREFETCH = 5
+PRIORITY_DEFAULT = PRIORITY_GEOCODE
+
+class Cancelled(Exception):
+
+    """Request superseded by a newer request in the same channel."""
+
+    pass
+
+
+class CircuitBreaker:
+
+    """
+    Per-host tracking of failures to fail fast on unavailable hosts.
+
+    After `threshold` consecutive failures the circuit of a host is open
+    and requests fail immediately for `cooldown` seconds. After that,
+    a single probe request is let through: success closes the circuit,
+    failure opens it again with the cool-down doubled, up to
+    `max_cooldown` seconds.
+    """
+
+    def __init__(self, threshold, cooldown, max_cooldown):
+        """Initialize a :class:`CircuitBreaker` instance."""
+        self._cooldown = cooldown
+        self._hosts = {}
+        self._lock = threading.Lock()
+        self._max_cooldown = max_cooldown
+        self._threshold = threshold
+
+    @poor.util.locked_method
+    def allow(self, key):
+        """Return ``True`` if a request to host `key` can be made."""
+        host = self._hosts.get(key)
+        if host is None or host.failures < self._threshold: return True
+        if host.probe == threading.get_ident(): return True
+        if host.probe is not None: return False
+        if time.time() < host.opened + host.cooldown: return False
+        # Let the calling thread probe if the host is back up,
+        # retries in the same thread belong to the same probe.
+        host.probe = threading.get_ident()
+        return True
+
+    @poor.util.locked_method
+    def get_state(self, key):
+        """Return state of host `key`: "closed", "open" or "half-open"."""
+        host = self._hosts.get(key)
+        if host is None or host.failures < self._threshold: return "closed"
+        if host.probe is not None: return "half-open"
+        if time.time() < host.opened + host.cooldown: return "open"
+        return "half-open"
+
+    @poor.util.locked_method
+    def is_available(self, key):
+        """Return ``False`` if requests to host `key` currently fail fast."""
+        host = self._hosts.get(key)
+        if host is None or host.failures < self._threshold: return True
+        if host.probe is not None: return False
+        return time.time() >= host.opened + host.cooldown
+
+    @poor.util.locked_method
+    def record_failure(self, key):
+        """Record a failed request to host `key`."""
+        host = self._hosts.setdefault(key, poor.AttrDict(
+            cooldown=self._cooldown, failures=0, opened=0, probe=None))
+        host.failures += 1
+        if host.probe is not None:
+            host.cooldown = min(2 * host.cooldown, self._max_cooldown)
+            host.opened = time.time()
+            host.probe = None
+            print("Probe of {} failed, retrying in {:.0f} s"
+                  .format(key, host.cooldown),
+                  file=sys.stderr)
+        elif host.failures == self._threshold:
+            host.opened = time.time()
+            print("{} failed {:d} times, retrying in {:.0f} s"
+                  .format(key, host.failures, host.cooldown),
+                  file=sys.stderr)
+
+    @poor.util.locked_method
+    def record_success(self, key):
+        """Record a successful request to host `key`."""
+        self._hosts.pop(key, None)
+
+    @poor.util.locked_method
+    def release(self, key):
+        """Release probe of host `key` made by the calling thread."""
+        host = self._hosts.get(key)
+        if host is not None and host.probe == threading.get_ident():
+            host.probe = None
+
+    @poor.util.locked_method
+    def reset(self):
+        """Forget all failures."""
+        self._hosts = {}
+
 
 class ConnectionPool:
 
@@ -72,7 +240,7 @@ class ConnectionPool:
     @poor.util.locked_method
     def _allocate(self, url):
         """Initialize a queue of HTTP connections to `url`."""
-        key = self._get_key(url)
+        key = self.get_key(url)
         if key in self._queue: return
         self._queue[key] = queue.LifoQueue()
         for i in range(self._threads):
@@ -80,7 +248,7 @@ class ConnectionPool:
 
     def get(self, url):
         """Return an HTTP connection to `url`."""
-        key = self._get_key(url)
+        key = self.get_key(url)
         if key not in self._queue:
             self._allocate(url)
         while True:
@@ -95,7 +263,7 @@ class ConnectionPool:
             connection = self._new(url)
         return connection
 
-    def _get_key(self, url):
+    def get_key(self, url):
         """Return a dictionary key for the host of `url`."""
         components = urllib.parse.urlparse(url)
         return "{}:{}".format(components.scheme, components.netloc)
@@ -123,10 +291,18 @@ class ConnectionPool:
     def put(self, url, connection):
         """Return `connection` to the pool of connections."""
         if not self._alive: return
-        key = self._get_key(url)
+        key = self.get_key(url)
         self._queue[key].task_done()
         self._queue[key].put(connection)
 
+    @poor.util.locked_method
+    def set_threads(self, threads):
+        """Set the maximum amount of connections per host."""
+        for q in self._queue.values():
+            for i in range(threads - self._threads):
+                q.put(None)
+        self._threads = max(self._threads, threads)
+
     def reset(self, url):
         """Close and re-establish HTTP connection to `url`."""
         if not self._alive: return
@@ -157,108 +333,599 @@ class ConnectionPool:
                         print("Connecttion {}:{} closed".format(key, id(connection)))
 
 
-def _request_worker(task_queue, result_queue):
-    """Worker for filling requests"""
-    while True:
-        task = task_queue.get()
-        if task is None: break
-        try:
-            result = _request_real(method=task['method'], url=task['url'],
-                                   body=task['body'], encoding=task['encoding'],
-                                   retry=task['retry'],
-                                   headers=task['headers'])
-            result_queue.put({'result': result})
-        except Exception as e:
-            result_queue.put({'exception': e})
-        task_queue.task_done()
+class ThreadPool:
 
+    """A pool of daemon threads used to perform requests in priority order."""
 
-class ThreadPool:
-    """Pool of threads used to perform connections"""
-    def __init__(self, threads):
-        self._thread_queues = queue.LifoQueue()
-        for i in range(threads):
-            task = queue.Queue()
-            result = queue.Queue()
-            q = AttrDict( dict(task=task, result=result) )
-            thread = threading.Thread( target=_request_worker,
-                                       kwargs=dict(task_queue=q.task,
-                                                   result_queue=q.result),
-                                       daemon=True )
-            thread.start()
-            self._thread_queues.put(q)
-
-    def request(self, method, url, body=None, encoding=None, retry=1, headers=None):
-        task = dict(method=method, url=url, body=body,
-                    encoding=encoding, retry=retry, headers=headers)
-        while True:
-            try:
-                q = self._thread_queues.get(timeout=1)
-                break
-            except queue.Empty:
-                if not pool.is_alive():
-                    raise Exception("Connection pool closed")
-        if q is None: raise Exception("No thread queue found")
-        q.task.put(task)
+    def __init__(self, threads, host_threads):
+        """Initialize a :class:`ThreadPool` instance."""
+        self._active = collections.Counter()
+        self._condition = threading.Condition()
+        self._counter = itertools.count()
+        self._host_threads = host_threads
+        self._pending = []
+        self._threads = 0
+        self._workers = 0
+        self.set_threads(threads)
+
+    def _next(self):
+        """Return next task to run or ``None`` if worker should stop."""
+        with self._condition:
+            while True:
+                if self._workers > self._threads:
+                    self._workers -= 1
+                    return None
+                for i, task in enumerate(self._pending):
+                    host = task[3]
+                    if host is not None and self._active[host] >= self._host_threads:
+                        continue
+                    del self._pending[i]
+                    if host is not None:
+                        self._active[host] += 1
+                    return task
+                self._condition.wait()
+
+    def promote(self, future, priority):
+        """Raise priority of pending `future` to at least `priority`."""
+        with self._condition:
+            for i, task in enumerate(self._pending):
+                if task[2] is not future: continue
+                if task[0] <= priority: return
+                del self._pending[i]
+                bisect.insort(self._pending, (priority,) + task[1:])
+                return
+
+    def set_host_threads(self, threads):
+        """Set the maximum amount of simultaneous requests per host."""
+        with self._condition:
+            self._host_threads = threads
+            self._condition.notify_all()
+
+    def set_threads(self, threads):
+        """Set the amount of worker threads."""
+        with self._condition:
+            self._threads = threads
+            while self._workers < self._threads:
+                threading.Thread(target=self._work, daemon=True).start()
+                self._workers += 1
+            self._condition.notify_all()
+
+    def submit(self, function, *args, host=None, priority=None, **kwargs):
+        """
+        Schedule `function` to be called and return a future of the result.
+
+        Pending calls are run in the order of `priority`, lower values first,
+        by default using :func:`get_priority`. If `host` is given, at most
+        the configured amount of calls for the same host run simultaneously.
+        """
+        if not pool.is_alive():
+            raise Exception("Connection pool closed")
+        if priority is None:
+            priority = get_priority()
+        future = concurrent.futures.Future()
+        task = (priority, next(self._counter), future, host, time.time(), function, args, kwargs)
+        with self._condition:
+            bisect.insort(self._pending, task)
+            self._condition.notify()
+        return future
+
+    def _work(self):
+        """Call scheduled functions and set results to their futures."""
         while True:
+            task = self._next()
+            if task is None: break
+            priority, count, future, host, queued, function, args, kwargs = task
             try:
-                result = q.result.get(timeout=1)
-                q.result.task_done()
-            except queue.Empty:
-                if not pool.is_alive():
-                    raise Exception("Connection pool closed")
-                else: continue
-            self._thread_queues.task_done()
-            self._thread_queues.put(q)
-            if 'exception' in result: raise result['exception']
-            return result['result']
-
-
-# keep at most the same number of connections to the same host as we have worker threads
-pool = ConnectionPool(NTHREADS)
-thread_pool = ThreadPool(NTHREADS)
-
-def get(url, encoding=None, retry=1, headers=None):
+                if not future.set_running_or_notify_cancel(): continue
+                if host is not None:
+                    statistics.add_time(host, "queue", time.time() - queued)
+                try:
+                    future.set_result(function(*args, **kwargs))
+                except Exception as error:
+                    future.set_exception(error)
+            finally:
+                if host is not None:
+                    with self._condition:
+                        self._active[host] -= 1
+                        self._condition.notify_all()
+
+
+class Statistics:
+
+    """Counters and timing histograms of requests per host."""
+
+    def __init__(self):
+        """Initialize a :class:`Statistics` instance."""
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    @poor.util.locked_method
+    def add_cache_hit(self, host):
+        """Add a request to `host` answered from the cache."""
+        self._get_host(host)["cached"] += 1
+
+    @poor.util.locked_method
+    def add_error(self, host, name):
+        """Add an error of class `name` in a request to `host`."""
+        errors = self._get_host(host)["errors"]
+        errors[name] = errors.get(name, 0) + 1
+
+    @poor.util.locked_method
+    def add_request(self, host, reused, sent):
+        """Add a request of `sent` body bytes to `host`."""
+        stats = self._get_host(host)
+        stats["requests"] += 1
+        stats["reused"] += int(reused)
+        stats["sent"] += sent
+
+    @poor.util.locked_method
+    def add_time(self, host, name, seconds):
+        """Add `seconds` to histogram `name` of `host`."""
+        times = self._get_host(host)["times"]
+        histogram = times.setdefault(name, dict(
+            buckets=list(HISTOGRAM_BUCKETS),
+            counts=[0] * (len(HISTOGRAM_BUCKETS) + 1),
+            count=0,
+            sum=0))
+        histogram["counts"][bisect.bisect_left(HISTOGRAM_BUCKETS, seconds)] += 1
+        histogram["count"] += 1
+        histogram["sum"] += seconds
+
+    @poor.util.locked_method
+    def add_traffic(self, host, received, decoded):
+        """Add `received` bytes decompressed to `decoded` bytes from `host`."""
+        stats = self._get_host(host)
+        stats["received"] += received
+        stats["decoded"] += decoded
+
+    def _get_host(self, host):
+        """Return counters of `host`, initializing if missing."""
+        return self._hosts.setdefault(host, dict(
+            cached=0,
+            decoded=0,
+            errors={},
+            received=0,
+            requests=0,
+            reused=0,
+            sent=0,
+            times={}))
+
+    @poor.util.locked_method
+    def get_stats(self):
+        """Return a dictionary of counters and histograms per host."""
+        return copy.deepcopy(self._hosts)
+
+    @poor.util.locked_method
+    def get_traffic(self):
+        """Return a dictionary of bytes received and decoded per host."""
+        return {k: dict(received=v["received"], decoded=v["decoded"])
+                for k, v in self._hosts.items()}
+
+    @poor.util.locked_method
+    def reset(self):
+        """Reset all counters."""
+        self._hosts = {}
+
+
+class Token:
+
+    """Cancellation token of requests made in a channel."""
+
+    def __init__(self, channel, generation):
+        """Initialize a :class:`Token` instance."""
+        self.channel = channel
+        self.generation = generation
+
+    @property
+    def cancelled(self):
+        """Return ``True`` if a newer request has entered the channel."""
+        return _channels.get(self.channel) != self.generation
+
+
+class Unavailable(Exception):
+
+    """Request not made as host failed repeatedly, see :class:`CircuitBreaker`."""
+
+    pass
+
+
+# Keep at most NCONNECTIONS connections per host, the thread pool
+# runs at most the same amount of requests to the same host at a time.
+pool = ConnectionPool(NCONNECTIONS)
+thread_pool = ThreadPool(NTHREADS, NCONNECTIONS)
+statistics = Statistics()
+breaker = CircuitBreaker(BREAKER_THRESHOLD, BREAKER_COOLDOWN, BREAKER_COOLDOWN_MAX)
+_channels = {}
+_channels_lock = threading.Lock()
+_local = threading.local()
+_inflight = {}
+_inflight_lock = threading.Lock()
+cache = ResponseCache(os.path.join(poor.CACHE_HOME_DIR, "http"), CACHE_SIZE)
+recorder = None
+
+@contextlib.contextmanager
+def channel(name):
+    """
+    Make requests in the current thread in channel `name`.
+
+    Entering a channel cancels requests made earlier in the same channel:
+    those not yet sent are dropped and responses of those in flight are
+    discarded without parsing, raising :exc:`Cancelled` to the caller.
+    Nested use of the same channel within a thread continues the request
+    entered first. Yield the cancellation :class:`Token` of the request.
+    """
+    previous = get_token()
+    if previous is not None and previous.channel == name:
+        yield previous
+        return
+    with _channels_lock:
+        generation = _channels[name] = _channels.get(name, 0) + 1
+    _local.token = Token(name, generation)
+    try:
+        yield _local.token
+    finally:
+        _local.token = previous
+
+def configure(threads=None, host_threads=None):
+    """Set the amount of worker threads and of connections per host."""
+    if threads is not None:
+        thread_pool.set_threads(threads)
+    if host_threads is not None:
+        pool.set_threads(host_threads)
+        thread_pool.set_host_threads(host_threads)
+
+def get(url, encoding=None, retry=1, headers=None, ttl=None):
     """Make a HTTP GET request at `url` and return response."""
-    return _request("GET",
-                    url,
-                    body=None,
-                    encoding=encoding,
-                    retry=retry,
-                    headers=headers)
-
-def get_json(url, encoding="utf_8", retry=1, headers=None):
+    return _wait(get_async(url,
+                           encoding=encoding,
+                           retry=retry,
+                           headers=headers,
+                           ttl=ttl))
+
+def get_async(url, encoding=None, retry=1, headers=None, ttl=None):
+    """Make a HTTP GET request at `url` and return a future of the response."""
+    return _submit(_request_real,
+                   "GET",
+                   url,
+                   body=None,
+                   encoding=encoding,
+                   retry=retry,
+                   headers=headers,
+                   ttl=ttl)
+
+def get_json(url, encoding="utf_8", retry=1, headers=None, ttl=None):
     """Make a HTTP GET request at `url` and return response parsed as JSON."""
-    return _request_json("GET",
-                         url,
-                         body=None,
-                         encoding=encoding,
-                         retry=retry,
-                         headers=headers)
+    return _wait(get_json_async(url,
+                                encoding=encoding,
+                                retry=retry,
+                                headers=headers,
+                                ttl=ttl))
+
+def get_json_async(url, encoding="utf_8", retry=1, headers=None, ttl=None):
+    """Make a HTTP GET request at `url` and return a future of the parsed JSON."""
+    return _submit(_request_json,
+                   "GET",
+                   url,
+                   body=None,
+                   encoding=encoding,
+                   retry=retry,
+                   headers=headers,
+                   ttl=ttl)
+
+def get_json_many(urls, max_parallel=NCONNECTIONS, fail_fast=False, encoding="utf_8", retry=1, headers=None, ttl=None):
+    """
+    Make HTTP GET requests at `urls` and return responses parsed as JSON.
+
+    At most `max_parallel` requests are pending at a time, all sharing the
+    common thread pool. Return a list in the order of `urls` holding either
+    the parsed response or the exception raised by that request. If
+    `fail_fast` is ``True``, requests not yet started after the first
+    failure are skipped, their items set to an exception as well.
+    :class:`Cancelled` is raised as the whole batch is superseded.
+    """
+    results = [None] * len(urls)
+    futures = {}
+    remaining = list(enumerate(urls))
+    failed = False
+    while remaining or futures:
+        while remaining and len(futures) < max_parallel and not failed:
+            i, url = remaining.pop(0)
+            futures[get_json_async(url,
+                                   encoding=encoding,
+                                   retry=retry,
+                                   headers=headers,
+                                   ttl=ttl)] = i
+        if failed:
+            for i, url in remaining:
+                results[i] = Exception("Skipped after an earlier failure")
+            remaining = []
+        if not futures: break
+        # Wait in short intervals to not leave the calling thread
+        # blocked once the connection pool has been terminated.
+        done, pending = concurrent.futures.wait(
+            futures, timeout=1, return_when=concurrent.futures.FIRST_COMPLETED)
+        if not done and not pool.is_alive():
+            raise Exception("Connection pool closed")
+        for future in done:
+            i = futures.pop(future)
+            try:
+                results[i] = future.result()
+            except Cancelled:
+                raise # Cancelled
+            except Exception as error:
+                results[i] = error
+                failed = failed or fail_fast
+    return results
+
+def get_priority():
+    """Return priority of requests made in the current thread."""
+    return getattr(_local, "priority", PRIORITY_DEFAULT)
+
+def get_token():
+    """Return cancellation token of requests made in the current thread."""
+    return getattr(_local, "token", None)
+
+def is_available(url):
+    """
+    Return ``False`` if requests to the host of `url` currently fail fast.
+
+    `url` can be a URL template, only the scheme and host are used. Requests
+    to unavailable hosts raise :class:`Unavailable` without connecting.
+    """
+    return breaker.is_available(pool.get_key(url))
 
 def post(url, body, encoding=None, retry=1, headers=None):
     """Make a HTTP POST request at `url` and return response."""
-    return _request("POST",
-                    url,
-                    body=body,
-                    encoding=encoding,
-                    retry=retry,
-                    headers=headers)
+    return _wait(post_async(url,
+                            body,
+                            encoding=encoding,
+                            retry=retry,
+                            headers=headers))
+
+def post_async(url, body, encoding=None, retry=1, headers=None):
+    """Make a HTTP POST request at `url` and return a future of the response."""
+    return _submit(_request_real,
+                   "POST",
+                   url,
+                   body=body,
+                   encoding=encoding,
+                   retry=retry,
+                   headers=headers)
 
 def post_json(url, body, encoding="utf_8", retry=1, headers=None):
     """Make a HTTP POST request at `url` and return response parsed as JSON."""
-    return _request_json("POST",
-                         url,
-                         body=body,
-                         encoding=encoding,
-                         retry=retry,
-                         headers=headers)
-
-def _request(method, url, body=None, encoding=None, retry=1, headers=None):
-    return thread_pool.request(method=method, url=url, body=body,
-                               encoding=encoding, retry=retry, headers=headers)
-
-def _request_real(method, url, body, encoding, retry, headers):
+    return _wait(post_json_async(url,
+                                 body,
+                                 encoding=encoding,
+                                 retry=retry,
+                                 headers=headers))
+
+def post_json_async(url, body, encoding="utf_8", retry=1, headers=None):
+    """Make a HTTP POST request at `url` and return a future of the parsed JSON."""
+    return _submit(_request_json,
+                   "POST",
+                   url,
+                   body=body,
+                   encoding=encoding,
+                   retry=retry,
+                   headers=headers)
+
+def prewarm(urls):
+    """
+    Open connections to hosts of `urls` in the background.
+
+    `urls` can be URL templates, only the scheme and host are used. At most
+    one connection per host is opened and hosts already having an open
+    connection are skipped. Return a list of futures, one per host.
+    """
+    hosts = {}
+    for url in urls:
+        if "{" in pool.get_key(url): continue
+        hosts.setdefault(pool.get_key(url), url)
+    return [thread_pool.submit(_prewarm,
+                               url,
+                               host=key,
+                               priority=PRIORITY_PREFETCH)
+            for key, url in hosts.items()]
+
+@contextlib.contextmanager
+def priority(value):
+    """Make requests in the current thread with priority `value`."""
+    previous = get_priority()
+    _local.priority = value
+    try:
+        yield
+    finally:
+        _local.priority = previous
+
+def report(interval=STATS_INTERVAL):
+    """
+    Send statistics periodically to QML as signal "http.stats".
+
+    Statistics are sent every `interval` seconds, if any requests have been
+    made since last sent, until the connection pool is terminated.
+    """
+    def send():
+        previous = None
+        while pool.is_alive():
+            time.sleep(interval)
+            data = stats()
+            total = sum(x["requests"] + x["cached"] for x in data.values())
+            if total == previous: continue
+            pyotherside.send("http.stats", data)
+            previous = total
+    threading.Thread(target=send, daemon=True).start()
+
+def set_replay_mode(mode, directory=None, latency=0, bandwidth=None):
+    """
+    Set mode of recording and replaying requests.
+
+    `mode` can be ``None`` for normal requests over the network, "record"
+    to store exchanges made over the network to `directory` or "replay" to
+    serve those stored exchanges instead of making requests. When replaying,
+    responses are delayed by `latency` seconds and, if `bandwidth` is given,
+    the time to transfer the body at `bandwidth` bytes per second. The disk
+    cache is bypassed when recording or replaying.
+    """
+    global recorder
+    if mode is None:
+        recorder = None
+    else:
+        recorder = Recorder(directory, mode, latency, bandwidth)
+
+def stats():
+    """
+    Return a dictionary of request statistics per host.
+
+    Counters per host are `requests` made over the network, `reused`
+    connections of those, `cached` responses used without a request,
+    `sent` request body bytes, `received` response bytes, `decoded` bytes
+    after decompression and `errors` as a dictionary of error class to
+    count. `times` holds histograms in seconds of `queue` wait before a
+    thread was free, `connect` time of new connections, `ttfb` time to
+    first byte of response and `transfer` time of reading the response.
+    """
+    return statistics.get_stats()
+
+@contextlib.contextmanager
+def token(value):
+    """
+    Make requests in the current thread with cancellation token `value`.
+
+    Use to continue the request of another thread, e.g. one returned by
+    :func:`get_token`, in a helper thread, so that entering the same
+    channel there does not cancel the request.
+    """
+    previous = get_token()
+    _local.token = value
+    try:
+        yield value
+    finally:
+        _local.token = previous
+
+def traffic():
+    """
+    Return a dictionary of traffic per host.
+
+    Each item is a dictionary with keys "received" for the amount of bytes
+    received over the network, i.e. compressed, and "decoded" for the
+    amount of bytes after decompression.
+    """
+    return statistics.get_traffic()
+
+def _submit(function, method, url, **kwargs):
+    """
+    Schedule request and return a future of the response.
+
+    Identical requests, i.e. those with the same method, URL, body and other
+    arguments, are coalesced while in flight: only one request is sent and
+    all callers share its result.
+    """
+    key = (function.__name__, method, url, repr(sorted(kwargs.items())))
+    token = get_token()
+    with _inflight_lock:
+        if key in _inflight:
+            future, tokens = _inflight[key]
+            tokens.append(token)
+            thread_pool.promote(future, get_priority())
+            return _follow(future)
+        tokens = [token]
+        future = thread_pool.submit(function,
+                                    method,
+                                    url,
+                                    host=pool.get_key(url),
+                                    tokens=tokens,
+                                    **kwargs)
+        _inflight[key] = (future, tokens)
+    def done(future):
+        with _inflight_lock:
+            if key in _inflight and _inflight[key][0] is future:
+                del _inflight[key]
+    future.add_done_callback(done)
+    return future
+
+def _follow(future):
+    """Return a new future with a copy of the result of `future`."""
+    follower = concurrent.futures.Future()
+    def done(future):
+        try:
+            # Parsed JSON is mutable, give each caller its own copy.
+            follower.set_result(copy.deepcopy(future.result()))
+        except Exception as error:
+            follower.set_exception(error)
+    future.add_done_callback(done)
+    return follower
+
+def _check_cancelled(tokens):
+    """Raise :exc:`Cancelled` if all callers have been superseded."""
+    if tokens and all(x is not None and x.cancelled for x in tokens):
+        raise Cancelled("Superseded by a newer request")
+
+def _decode(blob, encoding):
+    """Return `blob` decoded to text using `encoding` or as is if ``None``."""
+    if encoding is None: return blob
+    return blob.decode(encoding, errors="replace")
+
+def _parse_json(blob, encoding):
+    """Return `blob` parsed as JSON, decoded using `encoding` if needed."""
+    if encoding is None or codecs.lookup(encoding).name.startswith("utf-"):
+        # The json module detects UTF-8, -16 and -32 from
+        # bytes itself, no need to decode to text first.
+        try:
+            return json.loads(blob)
+        except UnicodeDecodeError:
+            encoding = encoding or "utf_8"
+    return json.loads(blob.decode(encoding, errors="replace"))
+
+def _prewarm(url):
+    """Connect an idle connection to `url` unless one is open already."""
+    connection = pool.get(url)
+    try:
+        if connection.sock is not None: return
+        start = time.time()
+        connection.connect()
+        statistics.add_time(pool.get_key(url), "connect", time.time() - start)
+    except Exception as error:
+        # Leave connection to be opened again on first use.
+        print("Failed to connect to {}: {}: {}"
+              .format(pool.get_key(url), error.__class__.__name__, str(error)),
+              file=sys.stderr)
+        connection.close()
+    finally:
+        pool.put(url, connection)
+
+def _read(response):
+    """Return response body decompressed and the amount of bytes received."""
+    encoding = (response.getheader("Content-Encoding") or "").strip().lower()
+    if encoding in ("", "identity"):
+        blob = response.read()
+        return blob, len(blob)
+    if encoding in ("gzip", "x-gzip"):
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    elif encoding == "deflate":
+        decompressor = None
+    else:
+        response.read()
+        raise Exception("Unsupported content encoding: {}".format(repr(encoding)))
+    # Decompress while reading to avoid holding both
+    # the compressed and decompressed body in memory.
+    chunks = []
+    received = 0
+    while True:
+        chunk = response.read(CHUNK_SIZE)
+        if not chunk: break
+        if decompressor is None:
+            # Deflate is supposed to be zlib-wrapped,
+            # but some servers send raw deflate data.
+            wbits = zlib.MAX_WBITS if chunk[0] & 0x0f == 8 else -zlib.MAX_WBITS
+            decompressor = zlib.decompressobj(wbits)
+        received += len(chunk)
+        chunks.append(decompressor.decompress(chunk))
+    if decompressor is not None:
+        chunks.append(decompressor.flush())
+    return b"".join(chunks), received
+
+def _request_real(method, url, body, encoding, retry, headers, ttl=None, tokens=None):
     """
     Make a HTTP request at `url` using `method`.
 
@@ -268,11 +935,37 @@ def _request_real(method, url, body, encoding, retry, headers):
     If `encoding` is ``None``, return bytes, otherwise decode response data to
     text using `encoding`. Try again `retry` times in some particular cases
     that imply a connection error. `headers` should be a dictionary of custom
-    headers to add to the defaults :attr:`http.HEADERS`.
+    headers to add to the defaults :attr:`http.HEADERS`. Responses to GET
+    requests are cached on disk as allowed by the server, `ttl` can be used to
+    override the server given freshness lifetime in seconds, zero disabling
+    the cache for the request. `tokens` is a list of cancellation tokens of
+    the callers, see :func:`channel`.
     """
     #print("{} {}".format(method, url))
+    _check_cancelled(tokens)
+    if recorder is not None and recorder.replaying:
+        return _replay(method, url, body, encoding, tokens)
+    cached = None
+    key = pool.get_key(url)
+    use_cache = method == "GET" and ttl != 0 and recorder is None
+    if use_cache:
+        cached = cache.get(url)
+        if cached is not None and cached.expires > time.time():
+            statistics.add_cache_hit(key)
+            return _decode(cached.body, encoding)
+        if cached is not None and not cached.etag and not cached.last_modified:
+            cached = None
+    if not breaker.allow(key):
+        statistics.add_error(key, Unavailable.__name__)
+        raise Unavailable("{} failed repeatedly, not retrying yet".format(key))
+    responded = False
     try:
         connection = pool.get(url)
+        reused = connection.sock is not None
+        if not reused:
+            start = time.time()
+            connection.connect()
+            statistics.add_time(key, "connect", time.time() - start)
         # Do relative requests (without scheme and netloc)
         # for better compatibility with different servers.
         components = urllib.parse.urlparse(url)
@@ -280,26 +973,59 @@ def _request_real(method, url, body, encoding, retry, headers):
         path = urllib.parse.urlunparse(components)
         headall = HEADERS.copy()
         headall.update(headers or {})
+        if cached is not None:
+            # Revalidate stale response, server
+            # responds 304 if it is still valid.
+            if cached.etag:
+                headall["If-None-Match"] = cached.etag
+            if cached.last_modified:
+                headall["If-Modified-Since"] = cached.last_modified
         if isinstance(body, str):
             # UTF-8 is likely to work in most cases,
             # otherwise caller can encode and give bytes.
             body = body.encode("utf_8")
+        start = time.time()
         connection.request(method, path, body, headers=headall)
         response = connection.getresponse()
+        statistics.add_time(key, "ttfb", time.time() - start)
+        statistics.add_request(key, reused, len(body or b""))
         # Always read response to avoid
         # http.client.ResponseNotReady: Request-sent.
-        blob = response.read()
+        start = time.time()
+        blob, received = _read(response)
+        statistics.add_time(key, "transfer", time.time() - start)
+        statistics.add_traffic(key, received, len(blob))
+        responded = True
+        if recorder is not None and recorder.recording:
+            recorder.record(method, url, body, response.status, response.headers, blob)
+        if response.status >= 500 or response.status == 429:
+            breaker.record_failure(key)
+        else:
+            breaker.record_success(key)
+        _check_cancelled(tokens)
+        if response.status == 304 and cached is not None:
+            cache.refresh(url, response.headers, ttl)
+            return _decode(cached.body, encoding)
         if not 200 <= response.status <= 299:
+            statistics.add_error(key, "HTTP {:d}".format(response.status))
             raise Exception("Server responded {}: {}".format(
                 repr(response.status), repr(response.reason)))
-        if encoding is None: return blob
-        return blob.decode(encoding, errors="replace")
+        if use_cache:
+            cache.put(url, blob, response.headers, ttl)
+        return _decode(blob, encoding)
+    except Cancelled:
+        breaker.release(key)
+        raise # Cancelled
     except Exception as error:
         if not pool.is_alive(): raise
+        if not responded:
+            statistics.add_error(key, error.__class__.__name__)
         connection.close()
         connection = None
         broken = tuple(BROKEN_CONNECTION_ERRORS)
         if not isinstance(error, broken) or retry == 0:
+            if not responded:
+                breaker.record_failure(key)
             name = error.__class__.__name__
             print("{} failed: {}: {}"
                   .format(method, name, str(error)),
@@ -310,9 +1036,17 @@ def _request_real(method, url, body, encoding, retry, headers):
         assert retry > 0
     finally:
         pool.put(url, connection)
-    return _request(method, url, body, encoding, retry-1, headers)
+    return _request_real(method, url, body, encoding, retry-1, headers, ttl, tokens)
 
-def _request_json(method, url, body=None, encoding="utf_8", retry=1, headers=None):
+def _replay(method, url, body, encoding, tokens):
+    """Return recorded response to request, see :func:`set_replay_mode`."""
+    response = recorder.replay(method, url, body)
+    _check_cancelled(tokens)
+    if not 200 <= response.status <= 299:
+        raise Exception("Server responded {}".format(repr(response.status)))
+    return _decode(response.body, encoding)
+
+def _request_json(method, url, body=None, encoding="utf_8", retry=1, headers=None, ttl=None, tokens=None):
     """
     Make a HTTP request, return response parsed as JSON.
 
@@ -322,20 +1056,34 @@ def _request_json(method, url, body=None, encoding="utf_8", retry=1, headers=Non
     If `encoding` is ``None``, return bytes, otherwise decode response data to
     text using `encoding`. Try again `retry` times in some particular cases
     that imply a connection error. `headers` should be a dictionary of custom
-    headers to add to the defaults :attr:`http.HEADERS`.
+    headers to add to the defaults :attr:`http.HEADERS`. `ttl` can be used to
+    override the freshness lifetime of cached GET responses. `tokens` is
+    a list of cancellation tokens of the callers, see :func:`channel`.
     """
-    text = _request(method, url, body, encoding, retry, headers)
-    if not text.strip() and retry > 0:
+    # Request bytes and parse those directly to avoid
+    # keeping a decoded copy of the response text around.
+    blob = _request_real(method, url, body, None, retry, headers, ttl, tokens)
+    if not blob.strip() and retry > 0:
         # A blank return is probably an error.
         pool.reset(url)
-        text = _request(method, url, body, encoding, retry, headers)
+        blob = _request_real(method, url, body, None, retry, headers, ttl, tokens)
+    _check_cancelled(tokens)
     try:
-        if not text.strip():
+        if not blob.strip():
             raise ValueError("Expected JSON, received blank")
-        return json.loads(text)
+        return _parse_json(blob, encoding)
     except Exception as error:
         name = error.__class__.__name__
         print("Failed to parse JSON data: {}: {}"
               .format(name, str(error)),
               file=sys.stderr)
         raise # Exception
+
+def _wait(future):
+    """Return the result of `future` once it is done."""
+    # Wait in short intervals to not leave the calling thread
+    # blocked once the connection pool has been terminated.
+    while not concurrent.futures.wait([future], timeout=1).done:
+        if not pool.is_alive():
+            raise Exception("Connection pool closed")
+    return future.result()
@@ -0,0 +1,227 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2026 Rinigus
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Disk-backed cache of HTTP responses."""
+
+# IMPLEMENTATION COMMENTS
+#
+# Each response is stored in a separate file named by a hash of the
+# URL. The file starts with a line of JSON metadata (expiry time and
+# validators) followed by the response body. The time of last use is
+# kept as the file modification time, which allows to rebuild the LRU
+# index from the directory listing after restart.
+
+import email.utils
+import hashlib
+import json
+import os
+import poor
+import re
+import threading
+import time
+
+from poor.attrdict import AttrDict
+
+__all__ = ("ResponseCache",)
+
+RE_MAX_AGE = re.compile(r"\bmax-age\s*=\s*(\d+)", re.IGNORECASE)
+RE_NO_CACHE = re.compile(r"\bno-cache\b", re.IGNORECASE)
+RE_NO_STORE = re.compile(r"\bno-store\b", re.IGNORECASE)
+
+
+def get_expiry(headers, ttl=None, now=None):
+    """
+    Return time when response with `headers` becomes stale.
+
+    Return ``None`` if the response should not be stored. If `ttl` is not
+    ``None``, it overrides the freshness lifetime given by the server.
+    """
+    now = time.time() if now is None else now
+    if ttl is not None:
+        return now + ttl
+    control = headers.get("Cache-Control") or ""
+    if RE_NO_STORE.search(control):
+        return None
+    if RE_NO_CACHE.search(control):
+        return now
+    match = RE_MAX_AGE.search(control)
+    if match is not None:
+        age = 0
+        with poor.util.silent(Exception):
+            age = int(headers.get("Age") or 0)
+        return now + int(match.group(1)) - age
+    if headers.get("Expires"):
+        try:
+            expires = email.utils.parsedate_to_datetime(headers.get("Expires"))
+            return expires.timestamp()
+        except Exception:
+            # Invalid dates, such as "0", mean already expired.
+            return now
+    return now
+
+
+class ResponseCache:
+
+    """Disk-backed cache of HTTP responses with LRU eviction."""
+
+    def __init__(self, directory, max_size):
+        """Initialize a :class:`ResponseCache` instance."""
+        self._directory = directory
+        self._index = None
+        self._lock = threading.Lock()
+        self._max_size = max_size
+        self._size = 0
+
+    @poor.util.locked_method
+    def clear(self):
+        """Remove all cached responses."""
+        self._load_index()
+        for key in list(self._index):
+            self._remove(key)
+
+    def _evict(self):
+        """Remove least recently used responses until within size limit."""
+        if self._size <= self._max_size: return
+        keys = sorted(self._index, key=lambda x: self._index[x][1])
+        for key in keys:
+            if self._size <= self._max_size: break
+            self._remove(key)
+
+    @poor.util.locked_method
+    def get(self, url):
+        """
+        Return cached response for `url` or ``None``.
+
+        Returned response has attributes `body`, `expires`, `etag`
+        and `last_modified`. The response can be stale, which should be
+        checked by the caller comparing `expires` to current time.
+        """
+        self._load_index()
+        key = self._get_key(url)
+        if key not in self._index: return None
+        try:
+            with open(self._get_path(key), "rb") as f:
+                meta = json.loads(f.readline().decode("utf_8"))
+                body = f.read()
+        except Exception:
+            self._remove(key)
+            return None
+        now = time.time()
+        self._index[key][1] = now
+        with poor.util.silent(Exception):
+            os.utime(self._get_path(key), (now, now))
+        return AttrDict(body=body,
+                        expires=meta.get("expires", 0),
+                        etag=meta.get("etag"),
+                        last_modified=meta.get("last_modified"))
+
+    def _get_key(self, url):
+        """Return a file name compatible key for `url`."""
+        return hashlib.sha1(url.encode("utf_8")).hexdigest()
+
+    def _get_path(self, key):
+        """Return path to the file of `key`."""
+        return os.path.join(self._directory, key)
+
+    def _load_index(self):
+        """Read sizes and last use times of cached responses."""
+        if self._index is not None: return
+        self._index = {}
+        self._size = 0
+        if not os.path.isdir(self._directory): return
+        with os.scandir(self._directory) as it:
+            for entry in it:
+                with poor.util.silent(Exception):
+                    stat = entry.stat()
+                    self._index[entry.name] = [stat.st_size, stat.st_mtime]
+                    self._size += stat.st_size
+        self._evict()
+
+    @poor.util.locked_method
+    def put(self, url, body, headers, ttl=None):
+        """
+        Store response `body` for `url` if allowed by `headers`.
+
+        `headers` should be a mapping of response headers. If `ttl` is not
+        ``None``, it overrides the freshness lifetime given by the server.
+        Return ``True`` if response was stored.
+        """
+        self._load_index()
+        expires = get_expiry(headers, ttl)
+        etag = headers.get("ETag")
+        last_modified = headers.get("Last-Modified")
+        if expires is None or not body: return False
+        if expires <= time.time() and not etag and not last_modified:
+            # Nothing to gain from storing responses
+            # that are stale and cannot be revalidated.
+            return False
+        meta = dict(expires=expires, etag=etag, last_modified=last_modified)
+        return self._write(self._get_key(url), meta, body)
+
+    @poor.util.locked_method
+    def refresh(self, url, headers, ttl=None):
+        """Update expiry time of `url` after successful revalidation."""
+        self._load_index()
+        key = self._get_key(url)
+        if key not in self._index: return False
+        try:
+            with open(self._get_path(key), "rb") as f:
+                meta = json.loads(f.readline().decode("utf_8"))
+                body = f.read()
+        except Exception:
+            self._remove(key)
+            return False
+        expires = get_expiry(headers, ttl)
+        if expires is None:
+            self._remove(key)
+            return False
+        meta["expires"] = expires
+        meta["etag"] = headers.get("ETag") or meta.get("etag")
+        return self._write(key, meta, body)
+
+    def _remove(self, key):
+        """Remove response of `key` from the cache."""
+        size = self._index.pop(key, [0])[0]
+        self._size -= size
+        with poor.util.silent(Exception):
+            os.remove(self._get_path(key))
+
+    @property
+    def size(self):
+        """Return total size of cached responses in bytes."""
+        with self._lock:
+            self._load_index()
+            return self._size
+
+    def _write(self, key, meta, body):
+        """Write response file for `key`."""
+        path = self._get_path(key)
+        try:
+            poor.util.makedirs(self._directory)
+            with poor.util.atomic_open(path, "wb") as f:
+                f.write(json.dumps(meta).encode("utf_8"))
+                f.write(b"\n")
+                f.write(body)
+        except Exception:
+            self._remove(key)
+            return False
+        self._size -= self._index.get(key, [0])[0]
+        size = os.path.getsize(path)
+        self._index[key] = [size, time.time()]
+        self._size += size
+        self._evict()
+        return True
@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2026 Rinigus
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Recording and replaying HTTP exchanges for offline benchmarks."""
+
+# IMPLEMENTATION COMMENTS
+#
+# Each exchange is stored in a separate file named by a hash of the
+# method, redacted URL and request body. As in poor.httpcache, the file
+# starts with a line of JSON metadata followed by the response body,
+# which is stored decompressed. API keys are redacted from the URL
+# before hashing, so that fixtures recorded with one set of keys can be
+# replayed with another, or without any keys at all.
+
+import hashlib
+import json
+import os
+import poor
+import time
+import urllib.parse
+
+from poor.attrdict import AttrDict
+
+__all__ = ("Recorder",)
+
+# Names of query parameters holding API keys, compared case-insensitively.
+REDACT = ("access_token",
+          "api_key",
+          "apikey",
+          "app_code",
+          "app_id",
+          "client_id",
+          "client_secret",
+          "key",
+          "token")
+
+# Response headers stored along with the body.
+HEADERS = ("Content-Type", "ETag", "Last-Modified")
+
+
+def redact(url):
+    """Return `url` with API keys replaced by a placeholder."""
+    components = urllib.parse.urlsplit(url)
+    query = urllib.parse.parse_qsl(components.query, keep_blank_values=True)
+    query = [(k, "REDACTED" if k.lower() in REDACT else v) for k, v in query]
+    return urllib.parse.urlunsplit((components.scheme,
+                                    components.netloc,
+                                    components.path,
+                                    urllib.parse.urlencode(query, safe="{},:;"),
+                                    components.fragment))
+
+
+class Recorder:
+
+    """
+    Storage of recorded HTTP exchanges.
+
+    `mode` should be "record" to store exchanges made over the network or
+    "replay" to serve stored exchanges instead. When replaying, each
+    response is delayed by `latency` seconds and, if `bandwidth` is given,
+    the time to transfer the body at `bandwidth` bytes per second.
+    """
+
+    def __init__(self, directory, mode, latency=0, bandwidth=None):
+        """Initialize a :class:`Recorder` instance."""
+        if mode not in ("record", "replay"):
+            raise ValueError("Bad mode: {}".format(repr(mode)))
+        self.bandwidth = bandwidth
+        self.directory = directory
+        self.latency = latency
+        self.mode = mode
+
+    def _get_key(self, method, url, body):
+        """Return a file name compatible key for request."""
+        if isinstance(body, str):
+            body = body.encode("utf_8")
+        digest = hashlib.sha1(body or b"").hexdigest()
+        key = "{} {} {}".format(method, redact(url), digest)
+        return hashlib.sha1(key.encode("utf_8")).hexdigest()
+
+    def _get_path(self, key):
+        """Return path to the file of `key`."""
+        return os.path.join(self.directory, key)
+
+    def record(self, method, url, body, status, headers, blob):
+        """Store response `blob` with `status` and `headers` to request."""
+        if isinstance(body, str):
+            body = body.encode("utf_8")
+        meta = dict(method=method,
+                    url=redact(url),
+                    body_sha1=hashlib.sha1(body or b"").hexdigest(),
+                    status=status,
+                    headers={x: headers.get(x) for x in HEADERS if headers.get(x)})
+        path = self._get_path(self._get_key(method, url, body))
+        poor.util.makedirs(self.directory)
+        with poor.util.atomic_open(path, "wb") as f:
+            f.write(json.dumps(meta).encode("utf_8"))
+            f.write(b"\n")
+            f.write(blob)
+
+    @property
+    def recording(self):
+        """Return ``True`` if exchanges are being recorded."""
+        return self.mode == "record"
+
+    def replay(self, method, url, body):
+        """
+        Return recorded response to request.
+
+        Returned response has attributes `status`, `headers` and `body`.
+        Raise :class:`LookupError` if the request has not been recorded.
+        """
+        path = self._get_path(self._get_key(method, url, body))
+        if not os.path.isfile(path):
+            raise LookupError("No recorded response for {} {}"
+                              .format(method, redact(url)))
+        with open(path, "rb") as f:
+            meta = json.loads(f.readline().decode("utf_8"))
+            blob = f.read()
+        delay = self.latency
+        if self.bandwidth:
+            delay += len(blob) / self.bandwidth
+        if delay > 0:
+            time.sleep(delay)
+        return AttrDict(status=meta["status"],
+                        headers=meta["headers"],
+                        body=blob)
+
+    @property
+    def replaying(self):
+        """Return ``True`` if recorded exchanges are being replayed."""
+        return self.mode == "replay"
@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2026 Rinigus
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Caching autocomplete results by query prefix."""
+
+# IMPLEMENTATION COMMENTS
+#
+# Results are stored in a trie of normalized queries, one trie per
+# context, i.e. proximity bias and other parameters affecting results.
+# If results for a query were not truncated at the provider's limit,
+# they should include all matches for any longer query starting with
+# the same text, as matches narrow down when text is added. Such longer
+# queries are answered by filtering the results of the longest cached
+# prefix, falling back on the network only if none of the candidates
+# match or if the results of the prefix were truncated.
+
+import collections
+import poor
+import re
+import threading
+import time
+
+__all__ = ("PrefixCache",)
+
+# Maximum amount of contexts and of queries per context to keep.
+MAX_CONTEXTS = 16
+MAX_QUERIES = 256
+
+# Fields of results matched against query.
+FIELDS = ("title", "label", "description", "address")
+
+RE_WORD = re.compile(r"\w+")
+
+
+def get_words(text):
+    """Return a list of normalized words in `text`."""
+    return RE_WORD.findall(poor.util.normalize_query(text))
+
+def match(result, words):
+    """Return ``True`` if each of `words` starts a word of `result`."""
+    candidates = get_words(" ".join(str(result.get(x) or "") for x in FIELDS))
+    return all(any(x.startswith(word) for x in candidates) for word in words)
+
+
+class PrefixCache:
+
+    """
+    Cache of autocomplete results by query prefix.
+
+    Results for a query are answered from the results of the longest cached
+    prefix of the query, if those were complete, i.e. not truncated at
+    the provider's limit. Results are stored frozen, see
+    :func:`poor.cache.freeze`, and expire after `ttl` seconds.
+    """
+
+    def __init__(self, ttl=poor.cache.TTL):
+        """Initialize a :class:`PrefixCache` instance."""
+        self._contexts = collections.OrderedDict()
+        self._hits = 0
+        self._lock = threading.Lock()
+        self._misses = 0
+        self.ttl = ttl
+
+    @poor.util.locked_method
+    def clear(self):
+        """Remove all cached results."""
+        self._contexts.clear()
+
+    @poor.util.locked_method
+    def get(self, context, query):
+        """Return results for `query` in `context` or ``None``."""
+        query = poor.util.normalize_query(query)
+        trie = self._contexts.get(context)
+        if trie is None:
+            self._misses += 1
+            return None
+        self._contexts.move_to_end(context)
+        node, found, depth = trie["root"], None, 0
+        for i, char in enumerate(query):
+            node = node["children"].get(char)
+            if node is None: break
+            if node["expires"] is None: continue
+            if node["expires"] < time.time(): continue
+            found, depth = node, i + 1
+        if found is None:
+            self._misses += 1
+            return None
+        if depth == len(query):
+            self._hits += 1
+            return found["results"]
+        if not found["complete"]:
+            self._misses += 1
+            return None
+        words = get_words(query)
+        results = [x for x in found["results"] if match(x, words)]
+        if not results:
+            self._misses += 1
+            return None
+        self._hits += 1
+        return poor.cache.freeze(results)
+
+    @poor.util.locked_method
+    def put(self, context, query, results, complete):
+        """
+        Store `results` for `query` in `context`.
+
+        `complete` should be ``True`` if `results` were not truncated,
+        i.e. include all matches for `query`.
+        """
+        query = poor.util.normalize_query(query)
+        if not query: return
+        trie = self._contexts.get(context)
+        if trie is None or trie["count"] >= MAX_QUERIES:
+            # Start over rather than track use of each query.
+            trie = dict(count=0, root=self._new_node())
+        self._contexts[context] = trie
+        self._contexts.move_to_end(context)
+        while len(self._contexts) > MAX_CONTEXTS:
+            self._contexts.popitem(last=False)
+        node = trie["root"]
+        for char in query:
+            node = node["children"].setdefault(char, self._new_node())
+        if node["expires"] is None:
+            trie["count"] += 1
+        node["complete"] = complete
+        node["expires"] = time.time() + self.ttl
+        node["results"] = poor.cache.freeze(results)
+
+    def _new_node(self):
+        """Return a new empty trie node."""
+        return dict(children={}, complete=False, expires=None, results=None)
+
+    @property
+    def stats(self):
+        """Return a dictionary of counters of cache use."""
+        with self._lock:
+            return dict(contexts=len(self._contexts),
+                        hits=self._hits,
+                        misses=self._misses)
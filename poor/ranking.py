@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2026 Rinigus
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Deduplicating and ranking search results."""
+
+# IMPLEMENTATION COMMENTS
+#
+# Near-duplicates are places within DUPLICATE_DISTANCE of each other
+# with similar normalized titles. To avoid comparing all pairs, places
+# are bucketed in a grid of cells DUPLICATE_DISTANCE wide and compared
+# only to places in the same and neighbouring cells. Title similarity is
+# the ratio of difflib.SequenceMatcher, checked after the cheaper upper
+# bound quick_ratio, with numbers required to match. Of duplicates, the
+# first one is kept, i.e. callers should list results in order of
+# preference.
+#
+# The score of a place is a weighted sum of text match, the fraction of
+# query trigrams found in the title, label, description and address, see
+# poor.searchindex, proximity, decreasing with the logarithm of distance
+# from the reference point, and confidence, depending on the source of
+# the place and its position in the results of that source, as providers
+# list their best matches first.
+
+import collections
+import difflib
+import math
+import poor
+import re
+
+from poor.searchindex import get_trigrams, get_words
+
+__all__ = ("deduplicate", "rank", "score")
+
+# Maximum distance in meters and minimum title similarity
+# of places to consider the same place.
+DUPLICATE_DISTANCE = 100
+DUPLICATE_SIMILARITY = 0.8
+
+# Confidence of places by source, "source" of places from
+# the search index, "provider" of others, default otherwise.
+CONFIDENCE = {"history": 1.0, "poi": 1.0}
+CONFIDENCE_DEFAULT = 0.8
+
+# Weights of text match, proximity and confidence in score.
+WEIGHT_CONFIDENCE = 0.35
+WEIGHT_PROXIMITY = 0.15
+WEIGHT_TEXT = 0.5
+
+# Fields of places matched against query.
+FIELDS = ("title", "label", "description", "address")
+
+RE_NUMBER = re.compile(r"\d+")
+
+
+def deduplicate(places, distance=DUPLICATE_DISTANCE, min_similarity=DUPLICATE_SIMILARITY):
+    """
+    Return `places` without near-duplicates.
+
+    Places within `distance` meters of each other with titles at least
+    `min_similarity` similar are considered the same, the first of those
+    is kept. Places without coordinates are kept as is.
+    """
+    buckets = collections.defaultdict(list)
+    step = distance / 111320
+    results = []
+    for place in places:
+        x, y = place.get("x"), place.get("y")
+        if x is None or y is None:
+            results.append(place)
+            continue
+        # Longitude cells shrink towards the poles.
+        scale = max(0.01, math.cos(math.radians(y)))
+        i, j = math.floor(x * scale / step), math.floor(y / step)
+        title = _get_title(place)
+        if not any(poor.util.calculate_distance(x, y, other["x"], other["y"]) <= distance and
+                   _is_similar(title, other_title, min_similarity)
+                   for di in (-1, 0, 1)
+                   for dj in (-1, 0, 1)
+                   for other, other_title in buckets.get((i + di, j + dj), ())):
+            buckets[(i, j)].append((place, title))
+            results.append(place)
+    return results
+
+def _get_title(place):
+    """Return normalized title of `place`."""
+    return poor.util.normalize_query(place.get("title") or place.get("text") or "")
+
+def _is_similar(a, b, min_similarity):
+    """Return ``True`` if normalized titles `a` and `b` are similar."""
+    if a == b: return True
+    # Titles differing by house, platform etc. number
+    # are different places, however similar otherwise.
+    if RE_NUMBER.findall(a) != RE_NUMBER.findall(b): return False
+    matcher = difflib.SequenceMatcher(None, a, b)
+    return (matcher.quick_ratio() >= min_similarity and
+            matcher.ratio() >= min_similarity)
+
+def rank(places, query="", x=0, y=0):
+    """
+    Return `places` without near-duplicates, best first.
+
+    Places are sorted by :func:`score`, equal ones kept in given order.
+    Confidence of each place is based on its position among places from
+    the same source.
+    """
+    positions = collections.Counter()
+    scored = []
+    words = get_words(query)
+    trigrams = get_trigrams(words)
+    for place in places:
+        source = place.get("source") or place.get("provider")
+        confidence = CONFIDENCE.get(source, CONFIDENCE_DEFAULT)
+        confidence /= 1 + 0.1 * positions[source]
+        positions[source] += 1
+        scored.append((score(place, trigrams, x, y, confidence), place))
+    scored.sort(key=lambda item: -item[0])
+    return deduplicate([place for s, place in scored])
+
+def score(place, trigrams, x=0, y=0, confidence=CONFIDENCE_DEFAULT):
+    """
+    Return score of `place` between zero and one.
+
+    `trigrams` should be trigrams of the query, see
+    :func:`poor.searchindex.get_trigrams`, none matching all places.
+    `x` and `y` give the reference point, zero disabling proximity.
+    """
+    text = 1
+    if trigrams:
+        found = get_trigrams(get_words(" ".join(
+            str(place.get(k) or "") for k in FIELDS)))
+        text = len(trigrams & found) / len(trigrams)
+    proximity = 1
+    if x and y and place.get("x") is not None and place.get("y") is not None:
+        distance = poor.util.calculate_distance(x, y, place["x"], place["y"])
+        # Zero at 10,000 km.
+        proximity = max(0, 1 - math.log10(1 + distance / 1000) / 4)
+    return (WEIGHT_TEXT * text +
+            WEIGHT_PROXIMITY * proximity +
+            WEIGHT_CONFIDENCE * confidence)
@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2026 Rinigus
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Caching reverse geocoding results on a spatial grid."""
+
+# IMPLEMENTATION COMMENTS
+#
+# Reverse geocoding queries are stored in grid cells by the queried point.
+# Each radius is rounded to a power of two, a level, and each level has
+# its own grid with cells that size, so that cells neighbouring the one
+# of a new query cover all earlier queries close enough to reuse. An
+# earlier query is reused if its point is within HYSTERESIS times radius
+# of the new point, i.e. small movements and nearby taps keep using the
+# same results until moved further, and if some of its results are
+# within radius of the new point. Otherwise the network is queried.
+
+import collections
+import math
+import poor
+import threading
+import time
+
+__all__ = ("ReverseCache",)
+
+# Fraction of radius a point can move from an earlier query
+# for results of that query to be reused.
+HYSTERESIS = 0.5
+
+# Maximum amount of queries to keep.
+MAX_QUERIES = 1000
+
+
+class ReverseCache:
+
+    """Cache of reverse geocoding results on a spatial grid."""
+
+    def __init__(self, ttl=poor.cache.TTL):
+        """Initialize a :class:`ReverseCache` instance."""
+        self._cells = collections.OrderedDict()
+        self._count = 0
+        self._hits = 0
+        self._lock = threading.Lock()
+        self._misses = 0
+        self.ttl = ttl
+
+    @poor.util.locked_method
+    def clear(self):
+        """Remove all cached results."""
+        self._cells.clear()
+        self._count = 0
+
+    def _get_cell(self, x, y, level):
+        """Return key of the grid cell of `x`, `y` at `level`."""
+        step = self._get_step(level)
+        return (level, math.floor(x / step), math.floor(y / step))
+
+    def _get_level(self, radius):
+        """Return grid level of `radius`."""
+        return max(0, round(math.log2(max(1, radius))))
+
+    def _get_step(self, level):
+        """Return cell size in degrees at grid `level`."""
+        return 2**level / 111320
+
+    @poor.util.locked_method
+    def get(self, x, y, radius, limit, key=""):
+        """
+        Return results of a close enough earlier query or ``None``.
+
+        Returned results are modifiable copies with `distance` calculated
+        from `x`, `y`, those beyond `radius` left out, closest first and
+        at most `limit`. `key` identifies other parameters of the query.
+        """
+        level = self._get_level(radius)
+        step = self._get_step(level)
+        _, i, j = self._get_cell(x, y, level)
+        # Longitude cells shrink towards the poles.
+        scale = max(0.01, math.cos(math.radians(y)))
+        ni = math.ceil(HYSTERESIS * radius / (step * 111320 * scale))
+        nj = math.ceil(HYSTERESIS * radius / (step * 111320))
+        now = time.time()
+        for di in range(-ni, ni + 1):
+            for dj in range(-nj, nj + 1):
+                for query in self._cells.get((level, i + di, j + dj), []):
+                    if query["expires"] < now: continue
+                    if query["key"] != key: continue
+                    if query["limit"] < limit: continue
+                    if poor.util.calculate_distance(
+                            x, y, query["x"], query["y"]) > HYSTERESIS * radius:
+                        continue
+                    results = [dict(r, distance=poor.util.calculate_distance(
+                        x, y, r["x"], r["y"])) for r in query["results"]]
+                    results = [r for r in results if r["distance"] < radius]
+                    if not results: continue
+                    self._hits += 1
+                    results.sort(key=lambda r: r["distance"])
+                    return results[:limit]
+        self._misses += 1
+        return None
+
+    @poor.util.locked_method
+    def put(self, x, y, radius, limit, results, key=""):
+        """Store `results` of query at `x`, `y`."""
+        cell = self._get_cell(x, y, self._get_level(radius))
+        queries = self._cells.setdefault(cell, [])
+        queries.append(dict(expires=time.time() + self.ttl,
+                            key=key,
+                            limit=limit,
+                            results=poor.cache.freeze(results),
+                            x=x,
+                            y=y))
+        self._cells.move_to_end(cell)
+        self._count += 1
+        while self._count > MAX_QUERIES:
+            # Remove least recently stored cells first.
+            _, queries = self._cells.popitem(last=False)
+            self._count -= len(queries)
+
+    @property
+    def stats(self):
+        """Return a dictionary of counters of cache use."""
+        with self._lock:
+            return dict(hits=self._hits,
+                        misses=self._misses,
+                        queries=self._count)
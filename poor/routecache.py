@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2026 Rinigus
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Persistent cache of routes."""
+
+# IMPLEMENTATION COMMENTS
+#
+# Routes are stored as JSON in an SQLite database along with their
+# expiry time, time of last use and size. A single connection is shared
+# by all threads, serialized by a lock. Database errors are printed and
+# otherwise ignored, a broken cache only means routing over the network.
+#
+# Encoding and writing a long route takes long enough to delay routing
+# noticeably, so routes found are written in background threads, see
+# put_async, which can be waited for with flush.
+
+import json
+import os
+import poor
+import sqlite3
+import sys
+import threading
+import time
+
+__all__ = ("RouteCache",)
+
+
+class RouteCache:
+
+    """Persistent cache of routes with expiry and LRU eviction."""
+
+    def __init__(self, path, max_size):
+        """Initialize a :class:`RouteCache` instance."""
+        self._connection = None
+        self._lock = threading.Lock()
+        self._max_size = max_size
+        self._path = path
+        self._writers = set()
+
+    @poor.util.locked_method
+    def clear(self):
+        """Remove all cached routes."""
+        with poor.util.silent(Exception, tb=True):
+            with self._connect() as connection:
+                connection.execute("DELETE FROM routes")
+
+    def _connect(self):
+        """Return connection to the database, creating it if needed."""
+        if self._connection is not None:
+            return self._connection
+        poor.util.makedirs(os.path.dirname(self._path))
+        connection = sqlite3.connect(self._path, check_same_thread=False)
+        connection.execute("""
+            CREATE TABLE IF NOT EXISTS routes (
+                key TEXT PRIMARY KEY,
+                route TEXT NOT NULL,
+                expires REAL NOT NULL,
+                used REAL NOT NULL,
+                size INTEGER NOT NULL)""")
+        self._connection = connection
+        return connection
+
+    def _evict(self, connection):
+        """Remove expired and least recently used routes over size limit."""
+        connection.execute("DELETE FROM routes WHERE expires < ?", (time.time(),))
+        size = connection.execute("SELECT TOTAL(size) FROM routes").fetchone()[0]
+        if size <= self._max_size: return
+        rows = connection.execute("SELECT key, size FROM routes ORDER BY used")
+        for key, item_size in rows.fetchall():
+            if size <= self._max_size: break
+            connection.execute("DELETE FROM routes WHERE key = ?", (key,))
+            size -= item_size
+
+    def flush(self):
+        """Wait for routes being written in the background."""
+        for writer in list(self._writers):
+            writer.join()
+
+    @poor.util.locked_method
+    def get(self, key):
+        """Return route cached for `key` or ``None``."""
+        try:
+            with self._connect() as connection:
+                row = connection.execute(
+                    "SELECT route, expires FROM routes WHERE key = ?",
+                    (key,)).fetchone()
+                if row is None: return None
+                if row[1] < time.time():
+                    connection.execute("DELETE FROM routes WHERE key = ?", (key,))
+                    return None
+                connection.execute(
+                    "UPDATE routes SET used = ? WHERE key = ?",
+                    (time.time(), key))
+                return json.loads(row[0])
+        except Exception as error:
+            print("Failed to read route cache: {}: {}"
+                  .format(error.__class__.__name__, str(error)),
+                  file=sys.stderr)
+            return None
+
+    @poor.util.locked_method
+    def put(self, key, route, ttl):
+        """Store `route` for `key` to be used for `ttl` seconds."""
+        try:
+            blob = json.dumps(route)
+            with self._connect() as connection:
+                now = time.time()
+                connection.execute(
+                    "INSERT OR REPLACE INTO routes VALUES (?, ?, ?, ?, ?)",
+                    (key, blob, now + ttl, now, len(blob)))
+                self._evict(connection)
+            return True
+        except Exception as error:
+            print("Failed to write route cache: {}: {}"
+                  .format(error.__class__.__name__, str(error)),
+                  file=sys.stderr)
+            return False
+
+    def put_async(self, key, route, ttl):
+        """Store `route` for `key` in a background thread, see :meth:`put`."""
+        def write():
+            try:
+                self.put(key, route, ttl)
+            finally:
+                self._writers.discard(writer)
+        writer = threading.Thread(target=write, daemon=True)
+        self._writers.add(writer)
+        writer.start()
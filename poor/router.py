@@ -17,21 +17,41 @@
 
 """Finding routes between addresses and/or coordinates."""
 
-import copy
+import hashlib
 import importlib.machinery
+import json
 import os
 import poor
 import random
 import re
 import socket
 import sys
+import threading
+import time
 import traceback
 
 from poor.attrdict import AttrDict
 from poor.i18n import _
+from poor.routecache import RouteCache
 
 __all__ = ("Router",)
 
+# Default seconds to keep routes in the persistent cache,
+# overridden by providers defining CACHE_TTL or get_cache_ttl,
+# and maximum total size of the persistent cache in bytes.
+CACHE_TTL = 24 * 3600
+CACHE_SIZE = 32 * 1024**2
+
+# Seconds during which an identical reroute request
+# is answered with the previous route found.
+DEBOUNCE_TIME = 2
+
+# Parameters only affecting the user interface,
+# ignored when comparing route requests.
+DEBOUNCE_IGNORE = ("fitToView", "notification", "save", "voicePrompt")
+
+cache = RouteCache(os.path.join(poor.CACHE_HOME_DIR, "routes.sqlite"), CACHE_SIZE)
+
 
 class Router:
 
@@ -57,9 +77,13 @@ class Router:
         self._path = path
         self.auto_route = values.get("auto_route", True)
         self._can_reroute = values.get("can_reroute", True)
+        self.debounce_time = DEBOUNCE_TIME
         self.offline = values.get("offline", False)
         self.from_needed = values.get("from_needed", True)
         self.to_needed = values.get("to_needed", True)
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._previous = None
         self._provider = None
         self._init_provider(id, re.sub(r"\.json$", ".py", path))
 
@@ -73,6 +97,46 @@ class Router:
         """Return whether the router allows rerouting."""
         return self._can_reroute
 
+    def _get_cache_key(self, locations, params):
+        """Return key used to find route from the persistent cache."""
+        key = json.dumps([self.id,
+                          self._get_debounce_key(locations, params),
+                          poor.conf.units,
+                          poor.util.get_default_locale()],
+                         sort_keys=True, default=str)
+        return hashlib.sha1(key.encode("utf_8")).hexdigest()
+
+    def _get_cache_ttl(self, params):
+        """Return seconds to keep route in the persistent cache."""
+        if hasattr(self._provider, "get_cache_ttl"):
+            return self._provider.get_cache_ttl(params)
+        return getattr(self._provider, "CACHE_TTL", CACHE_TTL)
+
+    def _get_debounce_key(self, locations, params):
+        """Return key used to compare route requests."""
+        # Round coordinates to about ten meters and heading to ten degrees
+        # to match rerouting requests made at almost the same time.
+        def normalize(location):
+            if isinstance(location, dict):
+                location = dict(location)
+                for name in ("x", "y"):
+                    if isinstance(location.get(name), float):
+                        location[name] = round(location[name], 4)
+                return location
+            if isinstance(location, (list, tuple)):
+                return [round(x, 4) if isinstance(x, float) else x for x in location]
+            return location
+        params = {k: v for k, v in params.items() if k not in DEBOUNCE_IGNORE}
+        if isinstance(params.get("heading"), (int, float)):
+            params["heading"] = round(params["heading"], -1)
+        locations = list(map(normalize, locations))
+        # Besides the request, routes depend on router options, such as
+        # costing and language, which are not passed in params.
+        options = None
+        with poor.util.silent(KeyError):
+            options = poor.conf.get("routers.{}".format(self.id))
+        return json.dumps([locations, params, options], sort_keys=True, default=str)
+
     def _init_provider(self, id, path):
         """Initialize routing provider module from `path`."""
         name = "poor.router.provider{:d}".format(random.randrange(10**12))
@@ -81,6 +145,14 @@ class Router:
         if hasattr(self._provider, "CONF_DEFAULTS"):
             poor.conf.register_router(id, self._provider.CONF_DEFAULTS)
 
+    def _is_cacheable(self, route):
+        """Return ``True`` if `route` can be stored in the cache."""
+        if isinstance(route, list):
+            return bool(route) and all(map(self._is_cacheable, route))
+        return (isinstance(route, dict) and
+                not route.get("error") and
+                bool(route.get("x")))
+
     def _load_attributes(self, id):
         """Read and return attributes from JSON file."""
         leaf = os.path.join("routers", "{}.json".format(id))
@@ -106,7 +178,7 @@ class Router:
                         street = _("Exit: ") + ("; ".join(sign["exit_name"]))
                 elif street is not None and len(street)>0:
                     street = "; ".join(street)
-                mn = copy.deepcopy(m)
+                mn = dict(m)
                 mn["street"] = street
                 mnew.append(mn)
             route["maneuvers"] = mnew
@@ -128,24 +200,85 @@ class Router:
         will be ``None`` in non-rerouting context. `params` can be
         used to specify a dictionary of router-specific parameters.
 
+        Identical requests made while a route is being found, or, when
+        rerouting, within :attr:`debounce_time` seconds after, return
+        a read-only copy of that route, see :func:`poor.cache.freeze`.
         """
+        key = self._get_debounce_key(locations, params)
+        with self._lock:
+            previous = self._previous
+            if (params.get("heading") is not None and
+                previous is not None and previous["key"] == key and
+                time.time() - previous["time"] < self.debounce_time):
+                return previous["route"]
+            inflight = self._inflight.get(key)
+            owner = inflight is None
+            if owner:
+                inflight = dict(event=threading.Event(), route=None, waiters=0)
+                self._inflight[key] = inflight
+            else:
+                inflight["waiters"] += 1
+        if not owner:
+            inflight["event"].wait()
+            return inflight["route"]
+        route = None
+        try:
+            route = self._route(locations, params)
+        finally:
+            with self._lock:
+                del self._inflight[key]
+            # Share a frozen copy with other callers, the caller
+            # finding the route gets the original. Freezing takes
+            # time for long routes, avoid unless actually shared,
+            # i.e. with callers waiting or to debounce reroutes.
+            reroute = params.get("heading") is not None
+            if inflight["waiters"] > 0 or reroute:
+                inflight["route"] = poor.cache.freeze(route)
+            if reroute and (isinstance(route, list) or
+                            (isinstance(route, dict) and not route.get("error"))):
+                with self._lock:
+                    self._previous = dict(key=key, route=inflight["route"], time=time.time())
+            inflight["event"].set()
+        return route
+
+    def _route(self, locations, params):
+        """Find route using provider and return its properties."""
         params = AttrDict(params)
+        # Heading is given only when rerouting.
+        priority = (poor.http.PRIORITY_REROUTE
+                    if params.get("heading") is not None
+                    else poor.http.PRIORITY_ROUTE)
+        ttl = self._get_cache_ttl(params)
+        if ttl > 0:
+            key = self._get_cache_key(locations, params)
+            route = cache.get(key)
+            if route is not None:
+                return route
         try:
-            route = self._provider.route(locations=locations, params=params)
+            with poor.http.channel("route"), poor.http.priority(priority):
+                route = self._provider.route(locations=locations, params=params)
+        except poor.http.Cancelled:
+            return dict(error=True, cancelled=True)
         except socket.timeout:
             return dict(error=True, message=_("Connection timed out"))
         except Exception:
             print("Routing failed:", file=sys.stderr)
             traceback.print_exc()
             return dict(error=True)
+        # Routes can be frozen if cached by provider,
+        # copy the parts that are modified below.
         if isinstance(route, dict):
+            route = dict(route)
             route["provider"] = self.id
             self._process_route(route)
         if isinstance(route, list):
+            route = [dict(x) if isinstance(x, dict) else x for x in route]
             for alternative in route:
                 if isinstance(alternative, dict):
                     alternative["provider"] = self.id
                     self._process_route(alternative)
+        if ttl > 0 and self._is_cacheable(route):
+            cache.put_async(key, route, ttl)
         return route
 
     @property
@@ -154,3 +287,8 @@ class Router:
         path = re.sub(r"\.json$", "_settings.qml", self._path)
         if not os.path.isfile(path): return None
         return poor.util.path2uri(path)
+
+    @property
+    def urls(self):
+        """Return a list of URL templates used by the provider."""
+        return poor.util.get_provider_urls(self._provider)
@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2026 Rinigus
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""In-memory search index of known places."""
+
+# IMPLEMENTATION COMMENTS
+#
+# Places are indexed by trigrams of the normalized words of their title,
+# label, description and address. Words are padded in front only, so that
+# all trigrams of a prefix are found in the trigrams of the full word and
+# partial queries score as well as complete ones, while typos still leave
+# most trigrams in common. The text score of a place is the fraction of
+# query trigrams it contains, with a bonus if each query word starts
+# a word of the place, minus a penalty growing with the logarithm of
+# distance from the reference point.
+#
+# Places are grouped by source, e.g. "history", "poi" or "geocoder".
+# Sources kept elsewhere are replaced as a whole when loaded and then
+# updated place by place, others are added to one by one, evicting the
+# oldest beyond MAX_PLACES. Places are keyed within their source by
+# normalized title and coordinates, adding a place again replaces it.
+
+import collections
+import itertools
+import math
+import poor
+import re
+import threading
+
+__all__ = ("SearchIndex",)
+
+# Maximum amount of places to keep per source.
+MAX_PLACES = 1000
+
+# Minimum fraction of query trigrams a place must contain to match.
+MIN_SCORE = 0.6
+
+# Fields of places searched.
+FIELDS = ("title", "label", "description", "address", "text")
+
+RE_WORD = re.compile(r"\w+")
+
+
+def format_result(place):
+    """
+    Return a search result dictionary of indexed `place`.
+
+    Places from different sources name their fields differently,
+    `title`, `description`, `label` and `poi_type` are filled in
+    from the alternatives.
+    """
+    title = place.get("title") or place.get("text") or ""
+    description = place.get("description") or place.get("address") or ""
+    label = place.get("label") or ", ".join(filter(None, (title, description)))
+    return dict(place,
+                description=description,
+                label=label,
+                poi_type=place.get("poi_type") or place.get("poiType") or "",
+                title=title)
+
+def get_trigrams(words):
+    """Return a set of trigrams of `words`."""
+    trigrams = set()
+    for word in words:
+        word = "  " + word
+        trigrams.update(word[i:i+3] for i in range(len(word) - 2))
+    return trigrams
+
+def get_words(text):
+    """Return a list of normalized words in `text`."""
+    return RE_WORD.findall(poor.util.normalize_query(text))
+
+
+class SearchIndex:
+
+    """In-memory search index of known places."""
+
+    def __init__(self):
+        """Initialize a :class:`SearchIndex` instance."""
+        self._ids = itertools.count()
+        self._lock = threading.Lock()
+        self._places = {}
+        self._sources = collections.defaultdict(collections.OrderedDict)
+        self._trigrams = collections.defaultdict(set)
+
+    def __len__(self):
+        """Return the amount of places in the index."""
+        return len(self._places)
+
+    def add(self, source, place):
+        """Add `place` from `source` to the index."""
+        with self._lock:
+            self._add(source, place)
+            places = self._sources[source]
+            while len(places) > MAX_PLACES:
+                self._remove(source, next(iter(places)))
+
+    def _add(self, source, place):
+        """Add `place` from `source` to the index."""
+        text = " ".join(str(place.get(x) or "") for x in FIELDS)
+        words = get_words(text)
+        if not words: return
+        if place.get("x") is None or place.get("y") is None: return
+        key = self._get_key(place)
+        self._remove(source, key)
+        id = next(self._ids)
+        trigrams = get_trigrams(words)
+        self._places[id] = dict(place=poor.cache.freeze(place),
+                                source=source,
+                                trigrams=trigrams,
+                                words=words)
+        self._sources[source][key] = id
+        for trigram in trigrams:
+            self._trigrams[trigram].add(id)
+
+    @poor.util.locked_method
+    def clear(self, source=None):
+        """Remove all places or places from `source`."""
+        for name in ([source] if source else list(self._sources)):
+            for key in list(self._sources[name]):
+                self._remove(name, key)
+
+    def _get_key(self, place):
+        """Return key identifying `place` within its source."""
+        title = place.get("title") or place.get("text") or ""
+        return (poor.util.normalize_query(title),
+                round(place["x"], 4),
+                round(place["y"], 4))
+
+    def remove(self, source, place):
+        """Remove `place` from `source` if present."""
+        if place.get("x") is None or place.get("y") is None: return
+        with self._lock:
+            self._remove(source, self._get_key(place))
+
+    def _remove(self, source, key):
+        """Remove place with `key` from `source` if present."""
+        id = self._sources[source].pop(key, None)
+        if id is None: return
+        item = self._places.pop(id)
+        for trigram in item["trigrams"]:
+            ids = self._trigrams[trigram]
+            ids.discard(id)
+            if not ids:
+                del self._trigrams[trigram]
+
+    def search(self, query, x=0, y=0, limit=10, sources=None):
+        """
+        Return a list of places matching `query`.
+
+        Places are ranked by text match and, if `x` and `y` are given,
+        by distance from there. If `sources` is given, only places from
+        those are returned. Returned places are copies of those added
+        with `source` and `score` added.
+        """
+        words = get_words(query)
+        if not words: return []
+        trigrams = get_trigrams(words)
+        with self._lock:
+            counts = collections.Counter()
+            for trigram in trigrams:
+                counts.update(self._trigrams.get(trigram, ()))
+            results = []
+            for id, count in counts.items():
+                score = count / len(trigrams)
+                if score < MIN_SCORE: continue
+                item = self._places[id]
+                if sources is not None and item["source"] not in sources:
+                    continue
+                if all(any(w.startswith(word) for w in item["words"])
+                       for word in words):
+                    score += 0.5
+                place = item["place"]
+                if x and y:
+                    distance = poor.util.calculate_distance(
+                        x, y, place["x"], place["y"])
+                    score -= 0.1 * math.log10(1 + distance / 1000)
+                results.append((score, id, item))
+        # Sort by score, most recently added first if equal.
+        results.sort(key=lambda r: (-r[0], -r[1]))
+        return [dict(item["place"], source=item["source"], score=score)
+                for score, id, item in results[:limit]]
+
+    def set(self, source, places):
+        """Replace places from `source` with `places`, most recent first."""
+        with self._lock:
+            for key in list(self._sources[source]):
+                self._remove(source, key)
+            for place in reversed(places[:MAX_PLACES]):
+                self._add(source, place)
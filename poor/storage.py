@@ -26,7 +26,9 @@ def read_pois(path=None):
     path = path or os.path.join(poor.CONFIG_HOME_DIR, "pois.json")
     if os.path.isfile(path):
         with poor.util.silent(Exception, tb=True):
-            return poor.util.read_json(path)
+            pois = poor.util.read_json(path)
+            poor.index.set("poi", pois)
+            return pois
     return []
 
 def read_route(path=None):
@@ -40,6 +42,7 @@ def read_route(path=None):
 def write_pois(pois, path=None):
     """Write a list of POIs to JSON file at `path`."""
     path = path or os.path.join(poor.CONFIG_HOME_DIR, "pois.json")
+    poor.index.set("poi", pois)
     with poor.util.silent(Exception, tb=True):
         poor.util.write_json(pois, path)
 
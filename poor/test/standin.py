@@ -0,0 +1,428 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2026 Rinigus
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Local stand-in server emulating routing, geocoding and guide APIs.
+
+Responses are synthetic, but follow the schemas parsed by the providers
+of osmscout-server (Valhalla /v2/route, /v2/optimized_route and
+/v2/trace_route, /v1/search, /v1/guide and /v1/poi_types), OSRM
+(/route/v1 and /trip/v1) and Photon (/api and /reverse). The amount of
+route shape points, maneuvers and search results as well as response
+latency are configurable, allowing benchmarks without network access.
+
+To use from the command line, e.g. in place of osmscout-server::
+
+    python3 -m poor.test.standin --port 8553 --points 5000 --latency 0.1
+
+In tests, start a :class:`StandinServer` on a free port and point
+provider URLs to :attr:`StandinServer.url`.
+"""
+
+import argparse
+import http.server
+import json
+import math
+import random
+import threading
+import time
+import urllib.parse
+
+__all__ = ("StandinServer",)
+
+POI_TYPES = ["amenity_cafe",
+             "amenity_fuel",
+             "amenity_parking",
+             "amenity_pharmacy",
+             "amenity_restaurant",
+             "shop_supermarket",
+             "tourism_hotel",
+             "tourism_museum"]
+
+
+def encode_epl(x, y, precision=5):
+    """Return coordinates `x`, `y` as Google Encoded polyline string."""
+    def encode(value):
+        value = ~(value << 1) if value < 0 else value << 1
+        chunks = []
+        while value >= 0x20:
+            chunks.append(chr((0x20 | (value & 0x1f)) + 63))
+            value >>= 5
+        chunks.append(chr(value + 63))
+        return "".join(chunks)
+    chunks = []
+    px = py = 0
+    for xi, yi in zip(x, y):
+        xi = int(round(xi * 10**precision))
+        yi = int(round(yi * 10**precision))
+        chunks.append(encode(yi - py))
+        chunks.append(encode(xi - px))
+        px, py = xi, yi
+    return "".join(chunks)
+
+def interpolate(x1, y1, x2, y2, n):
+    """Return `n` points on a line from `x1`, `y1` to `x2`, `y2`."""
+    n = max(2, n)
+    x = [x1 + (x2 - x1) * i / (n - 1) for i in range(n)]
+    y = [y1 + (y2 - y1) * i / (n - 1) for i in range(n)]
+    return x, y
+
+def distance(x1, y1, x2, y2):
+    """Return approximate distance in meters between two points."""
+    dx = (x2 - x1) * math.cos(math.radians((y1 + y2) / 2))
+    return 111320 * math.hypot(dx, y2 - y1)
+
+
+class Handler(http.server.BaseHTTPRequestHandler):
+
+    """Request handler dispatching on path to response generators."""
+
+    # Headers and body are written separately, avoid
+    # Nagle's algorithm delaying the body with keep-alive.
+    disable_nagle_algorithm = True
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self._respond(None)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        self._respond(self.rfile.read(length))
+
+    def log_message(self, *args):
+        pass
+
+    def _respond(self, body):
+        """Send response generated for request path."""
+        server = self.server
+        if server.latency > 0:
+            time.sleep(server.latency)
+        failure = server.get_failure()
+        if failure == "reset":
+            # Drop connection without a response.
+            self.close_connection = True
+            return
+        if failure == "slow":
+            time.sleep(server.slow_latency)
+        url = urllib.parse.urlsplit(self.path)
+        query = dict(urllib.parse.parse_qsl(url.query))
+        random_ = random.Random(self.path)
+        for prefix, function in (
+                ("/api", server.photon_search),
+                ("/reverse", server.photon_reverse),
+                ("/route/v1/", server.osrm_route),
+                ("/trip/v1/", server.osrm_trip),
+                ("/v1/guide", server.osmscout_guide),
+                ("/v1/poi_types", server.osmscout_poi_types),
+                ("/v1/search", server.osmscout_search),
+                ("/v2/optimized_route", server.valhalla_route),
+                ("/v2/route", server.valhalla_route),
+                ("/v2/trace_route", server.valhalla_trace_route)):
+            if not url.path.startswith(prefix): continue
+            try:
+                data = function(url.path, query, body, random_)
+                status = 200
+            except Exception as error:
+                data = dict(error=str(error))
+                status = 400
+            break
+        else:
+            data = dict(error="Not found")
+            status = 404
+        blob = json.dumps(data).encode("utf_8")
+        if failure == "blank":
+            blob = b""
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(blob)))
+        self.end_headers()
+        self.wfile.write(blob)
+
+
+class StandinServer(http.server.ThreadingHTTPServer):
+
+    """
+    Local HTTP server with synthetic provider responses.
+
+    `points` is the amount of shape points per route leg, `maneuvers` the
+    amount of maneuvers per route leg and `results` the maximum amount of
+    search results, requests can ask for less. Each response is delayed
+    by `latency` seconds.
+
+    Failures can be injected by setting `failures` to a dictionary of
+    failure type to the fraction of requests failing that way. Types are
+    "reset" to drop the connection without a response, "blank" to respond
+    with an empty body and "slow" to delay by `slow_latency` seconds.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, port=0, latency=0, points=1000, maneuvers=50, results=25,
+                 failures=None, slow_latency=2):
+        """Initialize a :class:`StandinServer` instance."""
+        http.server.ThreadingHTTPServer.__init__(self, ("127.0.0.1", port), Handler)
+        self.failures = failures or {}
+        self.latency = latency
+        self.maneuvers = maneuvers
+        self.points = points
+        self.results = results
+        self.slow_latency = slow_latency
+        self._random = random.Random(0)
+        self._random_lock = threading.Lock()
+        self._thread = None
+
+    def get_failure(self):
+        """Return type of failure to inject in request or ``None``."""
+        with self._random_lock:
+            value = self._random.random()
+        for type in sorted(self.failures):
+            value -= self.failures[type]
+            if value < 0: return type
+        return None
+
+    def _get_places(self, x, y, limit, random_):
+        """Return a list of synthetic places around `x`, `y`."""
+        places = []
+        for i in range(min(limit, self.results)):
+            type = random_.choice(POI_TYPES)
+            places.append(dict(
+                x=x + random_.uniform(-0.01, 0.01),
+                y=y + random_.uniform(-0.01, 0.01),
+                name="{} {:d}".format(type.split("_")[1].capitalize(), i + 1),
+                street="Street {:d}".format(random_.randint(1, 100)),
+                housenumber=str(random_.randint(1, 200)),
+                city="City",
+                postcode="{:05d}".format(random_.randint(0, 99999)),
+                type=type))
+        return places
+
+    def _get_point(self, query):
+        """Return coordinates for free-form text `query`."""
+        random_ = random.Random(query)
+        return random_.uniform(-10, 30), random_.uniform(35, 65)
+
+    def osmscout_guide(self, path, query, body, random_):
+        """Return response of osmscout-server /v1/guide."""
+        if "lng" in query and "lat" in query:
+            x, y = float(query["lng"]), float(query["lat"])
+        else:
+            x, y = self._get_point(query.get("search", ""))
+        limit = int(query.get("limit", self.results))
+        places = self._get_places(x, y, limit, random_)
+        return dict(origin=dict(lng=x, lat=y), results=[dict(
+            title=place["name"],
+            lng=place["x"],
+            lat=place["y"],
+            distance=distance(x, y, place["x"], place["y"]),
+            type=place["type"],
+            admin_region="{}, {}".format(place["street"], place["city"]),
+            postal_code=place["postcode"],
+        ) for place in places])
+
+    def osmscout_poi_types(self, path, query, body, random_):
+        """Return response of osmscout-server /v1/poi_types."""
+        return list(POI_TYPES)
+
+    def osmscout_search(self, path, query, body, random_):
+        """Return response of osmscout-server /v1/search."""
+        x, y = self._get_point(query.get("search", ""))
+        limit = int(query.get("limit", self.results))
+        places = self._get_places(x, y, limit, random_)
+        return [dict(
+            title=place["name"],
+            lng=place["x"],
+            lat=place["y"],
+            type=place["type"],
+            admin_region="{}, {}".format(place["street"], place["city"]),
+            postal_code=place["postcode"],
+        ) for place in places]
+
+    def _osrm(self, path, key):
+        """Return response of OSRM /route/v1 or /trip/v1."""
+        locations = path.rstrip("/").split("/")[-1].split(";")
+        locations = [tuple(map(float, x.split(","))) for x in locations]
+        legs, X, Y = [], [], []
+        for i in range(len(locations) - 1):
+            (x1, y1), (x2, y2) = locations[i], locations[i+1]
+            x, y = interpolate(x1, y1, x2, y2, self.points)
+            steps = []
+            for j in range(self.maneuvers):
+                k = round(j * (len(x) - 1) / self.maneuvers)
+                type = "depart" if i == j == 0 else "turn"
+                modifier = "left" if j % 2 else "right"
+                steps.append(dict(
+                    maneuver=dict(location=[x[k], y[k]], type=type, modifier=modifier),
+                    name="Street {:d}".format(j + 1),
+                    distance=distance(x1, y1, x2, y2) / self.maneuvers,
+                    duration=distance(x1, y1, x2, y2) / self.maneuvers / 10))
+            steps.append(dict(
+                maneuver=dict(location=[x2, y2], type="arrive"),
+                name="", distance=0, duration=0))
+            legs.append(dict(
+                steps=steps,
+                annotation=dict(nodes=list(range(len(x)))),
+                distance=distance(x1, y1, x2, y2),
+                duration=distance(x1, y1, x2, y2) / 10))
+            X.extend(x if i == 0 else x[1:])
+            Y.extend(y if i == 0 else y[1:])
+        waypoints = [dict(location=list(x), name="", waypoint_index=i)
+                     for i, x in enumerate(locations)]
+        return {"code": "Ok", key: [dict(
+            geometry=encode_epl(X, Y, 5),
+            legs=legs,
+            distance=sum(x["distance"] for x in legs),
+            duration=sum(x["duration"] for x in legs),
+        )], "waypoints": waypoints}
+
+    def osrm_route(self, path, query, body, random_):
+        """Return response of OSRM /route/v1."""
+        return self._osrm(path, "routes")
+
+    def osrm_trip(self, path, query, body, random_):
+        """Return response of OSRM /trip/v1."""
+        return self._osrm(path, "trips")
+
+    def _photon(self, places):
+        """Return Photon response of `places`."""
+        return dict(type="FeatureCollection", features=[dict(
+            type="Feature",
+            geometry=dict(type="Point", coordinates=[place["x"], place["y"]]),
+            properties=dict(
+                name=place["name"],
+                street=place["street"],
+                housenumber=place["housenumber"],
+                city=place["city"],
+                country="Country",
+                postcode=place["postcode"],
+                osm_key=place["type"].split("_")[0],
+                osm_value=place["type"].split("_")[1]),
+        ) for place in places])
+
+    def photon_reverse(self, path, query, body, random_):
+        """Return response of Photon /reverse."""
+        x, y = float(query["lon"]), float(query["lat"])
+        limit = int(query.get("limit", 1))
+        return self._photon(self._get_places(x, y, limit, random_))
+
+    def photon_search(self, path, query, body, random_):
+        """Return response of Photon /api."""
+        x, y = self._get_point(query.get("q", ""))
+        limit = int(query.get("limit", self.results))
+        return self._photon(self._get_places(x, y, limit, random_))
+
+    def start(self):
+        """Start serving requests in a background thread."""
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop serving requests and close the server."""
+        self.shutdown()
+        self.server_close()
+
+    @property
+    def url(self):
+        """Return base URL of the server."""
+        return "http://127.0.0.1:{:d}".format(self.server_address[1])
+
+    def _valhalla(self, locations, language):
+        """Return Valhalla response for route via `locations`."""
+        legs = []
+        for i in range(len(locations) - 1):
+            x1, y1 = locations[i]["lon"], locations[i]["lat"]
+            x2, y2 = locations[i+1]["lon"], locations[i+1]["lat"]
+            x, y = interpolate(x1, y1, x2, y2, self.points)
+            length = distance(x1, y1, x2, y2) / 1000
+            maneuvers = []
+            for j in range(self.maneuvers):
+                k = round(j * (len(x) - 1) / self.maneuvers)
+                type = 1 if j == 0 else (10 if j % 2 else 15)
+                if j == 0:
+                    instruction = "Drive on Street {:d}.".format(j + 1)
+                else:
+                    instruction = "Turn {} onto Street {:d}.".format(
+                        "right" if j % 2 else "left", j + 1)
+                maneuvers.append(dict(
+                    type=type,
+                    instruction=instruction,
+                    verbal_pre_transition_instruction=instruction,
+                    street_names=["Street {:d}".format(j + 1)],
+                    begin_shape_index=k,
+                    end_shape_index=round((j + 1) * (len(x) - 1) / self.maneuvers),
+                    length=length / self.maneuvers,
+                    time=length / self.maneuvers * 100,
+                    travel_type="car"))
+            maneuvers.append(dict(
+                type=4,
+                instruction="You have arrived at your destination.",
+                begin_shape_index=len(x) - 1,
+                end_shape_index=len(x) - 1,
+                length=0,
+                time=0))
+            legs.append(dict(
+                shape=encode_epl(x, y, 6),
+                maneuvers=maneuvers,
+                summary=dict(length=length, time=length * 100)))
+        return dict(trip=dict(
+            locations=[dict(lat=x["lat"], lon=x["lon"], type="break", original_index=i)
+                       for i, x in enumerate(locations)],
+            legs=legs,
+            summary=dict(length=sum(x["summary"]["length"] for x in legs),
+                         time=sum(x["summary"]["time"] for x in legs)),
+            language=language,
+            status=0,
+            units="kilometers"))
+
+    def valhalla_route(self, path, query, body, random_):
+        """Return response of Valhalla /v2/route."""
+        input = json.loads(query["json"])
+        language = input.get("directions_options", {}).get("language", "en-US")
+        return self._valhalla(input["locations"], language)
+
+    def valhalla_trace_route(self, path, query, body, random_):
+        """Return response of Valhalla /v2/trace_route."""
+        input = json.loads(json.loads(body.decode("utf_8"))["json"])
+        language = input.get("directions_options", {}).get("language", "en-US")
+        shape = input["shape"]
+        return self._valhalla([shape[0], shape[-1]], language)
+
+
+def main():
+    """Run stand-in server until interrupted."""
+    parser = argparse.ArgumentParser(description="Local stand-in for routing, geocoding and guide APIs.")
+    parser.add_argument("--port", type=int, default=8553, help="port to listen at")
+    parser.add_argument("--latency", type=float, default=0, help="seconds to delay each response")
+    parser.add_argument("--points", type=int, default=1000, help="shape points per route leg")
+    parser.add_argument("--maneuvers", type=int, default=50, help="maneuvers per route leg")
+    parser.add_argument("--results", type=int, default=25, help="maximum amount of search results")
+    parser.add_argument("--blank", type=float, default=0, help="fraction of responses with a blank body")
+    parser.add_argument("--reset", type=float, default=0, help="fraction of connections dropped")
+    parser.add_argument("--slow", type=float, default=0, help="fraction of responses delayed")
+    parser.add_argument("--slow-latency", type=float, default=2, help="seconds to delay slow responses")
+    args = parser.parse_args()
+    failures = dict(blank=args.blank, reset=args.reset, slow=args.slow)
+    server = StandinServer(args.port, args.latency, args.points, args.maneuvers, args.results,
+                           failures, args.slow_latency)
+    print("Serving at {}".format(server.url))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2026 Rinigus
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import poor.test
+import time
+
+from unittest.mock import Mock, patch
+
+
+class TestApplication(poor.test.TestCase):
+
+    def setup_method(self, method):
+        self.app = poor.Application()
+        self.app.geocoder = Mock()
+        self.app.guide = Mock()
+        poor.index.clear()
+        poor.index.set("history", [dict(title="Kamppi", x=24.932, y=60.169)])
+        poor.index.set("poi", [dict(title="Kamppi Chapel", x=24.935, y=60.169)])
+
+    def teardown_method(self, method):
+        poor.index.clear()
+
+    def test_search(self):
+        def geocode(*args):
+            time.sleep(0.1)
+            return [dict(title="Kamppi", x=24.933, y=60.169, provider="photon"),
+                    dict(title="Kamppi Center", x=24.931, y=60.168, provider="photon")]
+        self.app.geocoder.geocode.side_effect = geocode
+        self.app.guide.nearby.return_value = dict(error=True)
+        with patch("pyotherside.send") as send:
+            results = self.app.search("kamppi", 24.94, 60.17)
+        titles = [x["title"] for x in results]
+        assert sorted(titles) == ["Kamppi", "Kamppi Center", "Kamppi Chapel"]
+        assert results[titles.index("Kamppi")]["provider"] == "history"
+        signals = [x[0] for x in send.call_args_list]
+        assert len(signals) == 4
+        assert all(x[0] == "search.results" for x in signals)
+        assert signals[-1][3] == []
+        # Results of the slow geocoder come last.
+        assert "Kamppi Center" not in [x["title"] for x in signals[-2][2]]
+        assert "Kamppi Center" in [x["title"] for x in signals[-1][2]]
+
+    def test_search__empty(self):
+        with patch("pyotherside.send") as send:
+            assert self.app.search(" ") == []
+        assert not send.called
+
+    def test_search__no_position(self):
+        self.app.geocoder.geocode.return_value = []
+        with patch("pyotherside.send"):
+            results = self.app.search("kamppi")
+        assert not self.app.guide.nearby.called
+        assert len(results) == 2
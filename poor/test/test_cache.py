@@ -0,0 +1,220 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2026 Rinigus
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+import copy
+import pickle
+import poor.test
+import sys
+import time
+
+from poor.cache import Cache
+from unittest.mock import patch
+
+
+class TestCache(poor.test.TestCase):
+
+    def setup_method(self, method):
+        self.cache = Cache("test", max_size=10000, ttl=60)
+
+    def test___contains__(self):
+        self.cache["a"] = 1
+        assert "a" in self.cache
+        assert "b" not in self.cache
+
+    def test___getitem__(self):
+        self.cache["a"] = [1, 2, 3]
+        assert self.cache["a"] == [1, 2, 3]
+        self.assert_raises(KeyError, lambda: self.cache["b"])
+
+    def test___getitem____frozen(self):
+        self.cache["a"] = dict(b=[1, 2], c=dict(d=3))
+        value = self.cache["a"]
+        assert value is self.cache["a"]
+        assert value == dict(b=[1, 2], c=dict(d=3))
+        self.assert_raises(TypeError, value.__setitem__, "b", 0)
+        self.assert_raises(TypeError, value["b"].append, 3)
+        self.assert_raises(TypeError, value["c"].update, d=4)
+
+    def test___getitem____expired(self):
+        self.cache.stale = 0
+        self.cache.ttl = 0.01
+        self.cache["a"] = 1
+        time.sleep(0.02)
+        self.assert_raises(KeyError, lambda: self.cache["a"])
+        assert len(self.cache) == 0
+
+    def test___getitem____stale(self):
+        self.cache.ttl = 0.01
+        self.cache["a"] = 1
+        time.sleep(0.02)
+        self.assert_raises(KeyError, lambda: self.cache["a"])
+        assert len(self.cache) == 1
+
+    def test___setitem____evict_lru(self):
+        for i in range(100):
+            self.cache[i] = "x" * 500
+            assert self.cache[0]
+        assert 0 in self.cache
+        assert 1 not in self.cache
+        assert self.cache.size <= 10000
+        assert self.cache.stats["evictions"] > 0
+
+    def test___setitem____too_large(self):
+        self.cache["a"] = "x" * 20000
+        assert "a" not in self.cache
+        assert self.cache.size == 0
+
+    def test_clear(self):
+        self.cache["a"] = 1
+        self.cache.clear()
+        assert "a" not in self.cache
+        assert self.cache.size == 0
+
+    def test_fetch(self):
+        calls = []
+        function = lambda: calls.append(1) or [1]
+        assert self.cache.fetch("a", function) == [1]
+        assert self.cache.fetch("a", function) == [1]
+        assert len(calls) == 1
+
+    def test_fetch__empty(self):
+        calls = []
+        function = lambda: calls.append(1) or ([1] if len(calls) > 1 else [])
+        with patch("poor.cache.NEGATIVE_TTL", 0.01):
+            assert self.cache.fetch("a", function) == []
+            assert self.cache.fetch("a", function) == []
+            assert len(calls) == 1
+            time.sleep(0.02)
+            # Empty values are not served stale once expired.
+            assert self.cache.fetch("a", function) == [1]
+            assert len(calls) == 2
+
+    def test_fetch__failure(self):
+        calls = []
+        def function():
+            calls.append(1)
+            raise ValueError
+        self.assert_raises(ValueError, self.cache.fetch, "a", function)
+        self.assert_raises(ValueError, self.cache.fetch, "a", function)
+        assert len(calls) == 1
+
+    def test_fetch__refresh(self):
+        self.cache.set("a", 1, ttl=0)
+        time.sleep(0.01)
+        assert self.cache.fetch("a", lambda: 2) == 1
+        for i in range(100):
+            if self.cache.get("a") == 2: break
+            time.sleep(0.01)
+        assert self.cache.get("a") == 2
+
+    def test_fetch__stale(self):
+        def function():
+            raise ValueError
+        self.cache.set("a", 1, ttl=0)
+        time.sleep(0.01)
+        with poor.cache.watch() as state:
+            assert self.cache.fetch("a", function) == 1
+        assert not state["stale"]
+        for i in range(100):
+            if self.cache._get_failure("a") is not None: break
+            time.sleep(0.01)
+        with poor.cache.watch() as state:
+            assert self.cache.fetch("a", function) == 1
+        assert state["stale"]
+
+    def test_get(self):
+        self.cache["a"] = 1
+        assert self.cache.get("a") == 1
+        assert self.cache.get("b", 2) == 2
+
+    def test_set__ttl(self):
+        self.cache.set("a", 1, ttl=0.01)
+        self.cache.set("b", 2, ttl=None)
+        time.sleep(0.02)
+        assert "a" not in self.cache
+        assert "b" in self.cache
+
+    def test_stats(self):
+        self.cache["a"] = 1
+        self.cache.get("a")
+        self.cache.get("b")
+        stats = self.cache.stats
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["items"] == 1
+
+
+class TestFrozenDict(poor.test.TestCase):
+
+    def test_copy(self):
+        value = poor.cache.freeze(dict(a=[1]))
+        value = copy.copy(value)
+        value["b"] = 2
+        assert value == dict(a=[1], b=2)
+
+    def test_deepcopy(self):
+        value = poor.cache.freeze(dict(a=[1]))
+        value = copy.deepcopy(value)
+        value["a"].append(2)
+        assert value == dict(a=[1, 2])
+
+    def test_pickle(self):
+        value = poor.cache.freeze(dict(a=[1]))
+        assert pickle.loads(pickle.dumps(value)) == value
+
+
+class TestModule(poor.test.TestCase):
+
+    def test_freeze(self):
+        value = poor.cache.freeze(dict(a=[1, dict(b=2)], c=(3,)))
+        assert isinstance(value, poor.cache.FrozenDict)
+        assert isinstance(value["a"], poor.cache.FrozenList)
+        assert isinstance(value["a"][1], poor.cache.FrozenDict)
+        assert value["c"] == (3,)
+        assert poor.cache.freeze(value) is value
+
+    def test_freeze__flat(self):
+        value = [1.0, 2, "a", None, True]
+        frozen = poor.cache.freeze(value)
+        assert isinstance(frozen, poor.cache.FrozenList)
+        assert frozen == value
+        assert frozen is not value
+        value = (1, [2])
+        assert isinstance(poor.cache.freeze(value)[1], poor.cache.FrozenList)
+
+    def test_get_size(self):
+        assert poor.cache.get_size([1, "abc"]) > poor.cache.get_size([])
+        assert poor.cache.get_size({"a": [1, 2]}) > poor.cache.get_size({"a": []})
+
+    def test_get_size__sample(self):
+        value = [float(i) for i in range(10000)]
+        exact = sys.getsizeof(value) + sum(map(sys.getsizeof, value))
+        assert abs(poor.cache.get_size(value) - exact) < 0.1 * exact
+
+    def test_stats(self):
+        cache = Cache("test_stats")
+        assert poor.cache.stats()["test_stats"] == cache.stats
+
+    def test_watch__nested(self):
+        cache = Cache("test_watch__nested", ttl=0)
+        cache._failures["a"] = (ValueError(), time.time() + 60)
+        cache.set("a", 1)
+        time.sleep(0.01)
+        with poor.cache.watch() as outer:
+            with poor.cache.watch() as inner:
+                assert cache.fetch("a", lambda: 2) == 1
+        assert inner["stale"]
+        assert outer["stale"]
@@ -16,6 +16,7 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 import poor.test
+import unittest.mock
 
 
 class TestGeocoder(poor.test.TestCase):
@@ -30,6 +31,19 @@ class TestGeocoder(poor.test.TestCase):
         b = poor.Geocoder("digitransit")
         assert a is b
 
+    def test_autocomplete__local(self):
+        geocoder = poor.Geocoder("photon")
+        poor.index.set("test", [dict(title="Kauppatori", x=24.952, y=60.167)])
+        with unittest.mock.patch.object(geocoder._provider, "autocomplete", lambda **kwargs: [
+                dict(title="Kauppatori", label="Kauppatori", x=24.9521, y=60.1671),
+                dict(title="Kauppakatu", label="Kauppakatu", x=25.7, y=62.2)]):
+            results = geocoder.autocomplete("kauppat", x=24.9, y=60.1, params=dict(limit=5))
+        poor.index.clear("test")
+        geocoder._prefix_cache.clear()
+        assert [x["title"] for x in results] == ["Kauppatori", "Kauppakatu"]
+        assert results[0]["source"] == "test"
+        assert results[0]["label"] == "Kauppatori"
+
     def test_geocode__geo_uri(self):
         geocoder = poor.Geocoder("default")
         point = geocoder.geocode("geo:60.169,24.941")
@@ -65,3 +79,36 @@ class TestGeocoder(poor.test.TestCase):
         point = geocoder.geocode("-60.169 -24.941")
         assert point[0]["x"] == -24.941
         assert point[0]["y"] == -60.169
+
+    def test_autocomplete__prefix(self):
+        geocoder = poor.Geocoder("photon")
+        calls = []
+        def autocomplete(query, x, y, zoom, params):
+            calls.append(query)
+            return [dict(title="Berlin", x=13.4, y=52.5)]
+        with unittest.mock.patch.object(geocoder._provider, "autocomplete", autocomplete):
+            a = geocoder.autocomplete("Ber", center_x=13.4, center_y=52.5)
+            b = geocoder.autocomplete("Berl", center_x=13.4, center_y=52.5)
+            c = geocoder.autocomplete("Bern", center_x=13.4, center_y=52.5)
+        geocoder._prefix_cache.clear()
+        assert calls == ["Ber", "Bern"]
+        assert a == b
+        assert b[0]["provider"] == "photon"
+        assert c[0]["title"] == "Berlin"
+        assert c[0]["provider"] == "photon"
+
+    def test_reverse__cache(self):
+        geocoder = poor.Geocoder("photon")
+        calls = []
+        def reverse(x, y, radius, limit, params):
+            calls.append((x, y))
+            return [dict(title="A", x=24.9410, y=60.1700)]
+        with unittest.mock.patch.object(geocoder._provider, "reverse", reverse):
+            a = geocoder.reverse(24.9410, 60.1700, 100)
+            b = geocoder.reverse(24.9412, 60.1701, 100)
+            c = geocoder.reverse(24.9600, 60.1800, 100)
+        geocoder._reverse_cache.clear()
+        assert len(calls) == 2
+        assert a[0]["title"] == b[0]["title"] == "A"
+        assert b[0]["provider"] == "photon"
+        assert c == []
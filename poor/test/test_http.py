@@ -15,9 +15,108 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import concurrent.futures
+import http.server
+import json
 import poor.test
+import shutil
+import tempfile
 import threading
 import time
+import zlib
+
+
+class Handler(http.server.BaseHTTPRequestHandler):
+
+    """Local HTTP server responding with requested paths as JSON."""
+
+    protocol_version = "HTTP/1.1"
+    requests = []
+
+    def do_GET(self):
+        Handler.requests.append(self.path)
+        if self.path.startswith("/slow"):
+            time.sleep(0.5)
+        body = json.dumps({"path": self.path, "data": "x" * 1000}).encode("utf_8")
+        if self.path.startswith("/latin1"):
+            body = json.dumps({"path": self.path, "data": "ä"}, ensure_ascii=False).encode("latin_1")
+        self.send_response(404 if self.path.startswith("/missing") else 200)
+        if self.path.startswith("/gzip"):
+            compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS)
+            body = compressor.compress(body) + compressor.flush()
+            self.send_header("Content-Encoding", "gzip")
+        if self.path.startswith("/deflate"):
+            body = zlib.compress(body)
+            self.send_header("Content-Encoding", "deflate")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class LocalServerTestCase(poor.test.TestCase):
+
+    def setup_method(self, method):
+        Handler.requests = []
+        self.server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = "http://127.0.0.1:{:d}".format(self.server.server_address[1])
+
+    def teardown_method(self, method):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class TestCircuitBreaker(poor.test.TestCase):
+
+    def setup_method(self, method):
+        self.breaker = poor.http.CircuitBreaker(2, 0.1, 0.3)
+
+    def test_allow(self):
+        assert self.breaker.allow("a")
+        self.breaker.record_failure("a")
+        assert self.breaker.allow("a")
+        self.breaker.record_failure("a")
+        assert not self.breaker.allow("a")
+        assert self.breaker.allow("b")
+
+    def test_allow__probe(self):
+        for i in range(2):
+            self.breaker.record_failure("a")
+        time.sleep(0.15)
+        assert self.breaker.get_state("a") == "half-open"
+        assert self.breaker.allow("a")
+        assert self.breaker.allow("a")
+        allowed = []
+        thread = threading.Thread(target=lambda: allowed.append(self.breaker.allow("a")))
+        thread.start()
+        thread.join()
+        assert allowed == [False]
+        self.breaker.record_success("a")
+        assert self.breaker.get_state("a") == "closed"
+
+    def test_record_failure__backoff(self):
+        for i in range(2):
+            self.breaker.record_failure("a")
+        time.sleep(0.15)
+        assert self.breaker.allow("a")
+        self.breaker.record_failure("a")
+        assert self.breaker.get_state("a") == "open"
+        time.sleep(0.15)
+        assert not self.breaker.is_available("a")
+        time.sleep(0.1)
+        assert self.breaker.is_available("a")
+
+    def test_release(self):
+        for i in range(2):
+            self.breaker.record_failure("a")
+        time.sleep(0.15)
+        assert self.breaker.allow("a")
+        assert not self.breaker.is_available("a")
+        self.breaker.release("a")
+        assert self.breaker.is_available("a")
 
 
 class TestConnectionPool(poor.test.TestCase):
@@ -79,8 +178,108 @@ class TestConnectionPool(poor.test.TestCase):
         assert not self.pool.is_alive()
 
 
+class TestStatistics(poor.test.TestCase):
+
+    def setup_method(self, method):
+        self.statistics = poor.http.Statistics()
+
+    def test_add_error(self):
+        self.statistics.add_error("a", "TimeoutError")
+        self.statistics.add_error("a", "TimeoutError")
+        assert self.statistics.get_stats()["a"]["errors"] == {"TimeoutError": 2}
+
+    def test_add_time(self):
+        self.statistics.add_time("a", "ttfb", 0.07)
+        self.statistics.add_time("a", "ttfb", 100)
+        histogram = self.statistics.get_stats()["a"]["times"]["ttfb"]
+        assert histogram["count"] == 2
+        assert histogram["counts"][poor.http.HISTOGRAM_BUCKETS.index(0.1)] == 1
+        assert histogram["counts"][-1] == 1
+
+
+class TestThreadPool(poor.test.TestCase):
+
+    def setup_method(self, method):
+        self.thread_pool = poor.http.ThreadPool(2, 2)
+
+    def test_promote(self):
+        self.thread_pool.set_threads(1)
+        event = threading.Event()
+        order = []
+        self.thread_pool.submit(event.wait, 5)
+        self.thread_pool.submit(order.append, "a", priority=2)
+        future = self.thread_pool.submit(order.append, "b", priority=5)
+        self.thread_pool.promote(future, 0)
+        event.set()
+        future.result(timeout=5)
+        time.sleep(0.1)
+        assert order == ["b", "a"]
+
+    def test_submit(self):
+        future = self.thread_pool.submit(sum, [1, 2, 3])
+        assert future.result(timeout=5) == 6
+
+    def test_submit__exception(self):
+        future = self.thread_pool.submit(int, "x")
+        self.assert_raises(ValueError, future.result, timeout=5)
+
+    def test_submit__host(self):
+        start = time.time()
+        futures = [self.thread_pool.submit(time.sleep, 0.2, host="a") for i in range(3)]
+        concurrent.futures.wait(futures, timeout=5)
+        assert time.time() - start > 0.3
+
+    def test_submit__many(self):
+        futures = [self.thread_pool.submit(time.sleep, 0.1) for i in range(10)]
+        done, pending = concurrent.futures.wait(futures, timeout=5)
+        assert len(done) == 10
+
+    def test_submit__priority(self):
+        self.thread_pool.set_threads(1)
+        event = threading.Event()
+        order = []
+        self.thread_pool.submit(event.wait, 5)
+        self.thread_pool.submit(order.append, "low", priority=5)
+        self.thread_pool.submit(order.append, "high", priority=0)
+        last = self.thread_pool.submit(order.append, "middle", priority=2)
+        event.set()
+        last.result(timeout=5)
+        time.sleep(0.1)
+        assert order == ["high", "middle", "low"]
+
+
 class TestModule(poor.test.TestCase):
 
+    def test_channel(self):
+        with poor.http.channel("test") as token1:
+            assert poor.http.get_token() is token1
+        with poor.http.channel("test") as token2:
+            assert token1.cancelled
+            assert not token2.cancelled
+        assert poor.http.get_token() is None
+
+    def test_channel__nested(self):
+        with poor.http.channel("test") as token1:
+            with poor.http.channel("test") as token2:
+                assert token1 is token2
+            assert not token1.cancelled
+
+    def test_priority(self):
+        assert poor.http.get_priority() == poor.http.PRIORITY_DEFAULT
+        with poor.http.priority(poor.http.PRIORITY_ROUTE):
+            assert poor.http.get_priority() == poor.http.PRIORITY_ROUTE
+        assert poor.http.get_priority() == poor.http.PRIORITY_DEFAULT
+
+    def test_token(self):
+        with poor.http.channel("test") as token1:
+            with poor.http.token(None):
+                assert poor.http.get_token() is None
+                with poor.http.token(token1):
+                    with poor.http.channel("test") as token2:
+                        assert token1 is token2
+            assert poor.http.get_token() is token1
+        assert not token1.cancelled
+
     def test_get(self):
         url = "https://otsaloma.io/"
         blob = poor.http.get(url, encoding="utf_8")
@@ -98,6 +297,121 @@ class TestModule(poor.test.TestCase):
         url = "https://otsaloma.io/pub/test.json"
         assert isinstance(poor.http.get_json(url), dict)
 
+    def test_get_json_async(self):
+        url = "https://otsaloma.io/pub/test.json"
+        futures = [poor.http.get_json_async(url) for i in range(3)]
+        for future in futures:
+            assert isinstance(future.result(timeout=30), dict)
+
     def test_get_json__error(self):
         url = "https://otsaloma.io/pub/test.xml"
         self.assert_raises(Exception, poor.http.get_json, url)
+
+
+class TestModuleLocal(LocalServerTestCase):
+
+    def test_get_json(self):
+        url = self.url + "/test"
+        assert poor.http.get_json(url, ttl=0)["path"] == "/test"
+
+    def test_get_json_async__coalesce(self):
+        url = self.url + "/slow"
+        futures = [poor.http.get_json_async(url, ttl=0) for i in range(3)]
+        results = [x.result(timeout=5) for x in futures]
+        assert [x["path"] for x in results] == ["/slow"] * 3
+        assert results[0] is not results[1]
+        assert Handler.requests == ["/slow"]
+
+    def test_get_json__deflate(self):
+        url = self.url + "/deflate"
+        assert poor.http.get_json(url, ttl=0)["path"] == "/deflate"
+
+    def test_get_json_many(self):
+        urls = [self.url + x for x in ("/a", "/missing", "/c")]
+        results = poor.http.get_json_many(urls, max_parallel=2, ttl=0)
+        assert results[0]["path"] == "/a"
+        assert isinstance(results[1], Exception)
+        assert results[2]["path"] == "/c"
+
+    def test_get_json_many__fail_fast(self):
+        urls = [self.url + x for x in ("/missing", "/b", "/c")]
+        results = poor.http.get_json_many(urls, max_parallel=1, fail_fast=True, ttl=0)
+        assert all(isinstance(x, Exception) for x in results)
+        assert Handler.requests == ["/missing"]
+
+    def test_get_json__unavailable(self):
+        url = self.url + "/test"
+        self.server.shutdown()
+        self.server.server_close()
+        try:
+            for i in range(poor.http.BREAKER_THRESHOLD):
+                self.assert_raises(OSError, poor.http.get_json, url, ttl=0)
+            assert not poor.http.is_available(url)
+            self.assert_raises(poor.http.Unavailable, poor.http.get_json, url, ttl=0)
+        finally:
+            poor.http.breaker.reset()
+
+    def test_get_json__encoding(self):
+        url = self.url + "/latin1"
+        assert poor.http.get_json(url, encoding="latin_1", ttl=0)["data"] == "ä"
+        assert poor.http.get_json(url, ttl=0)["data"] == "\ufffd"
+
+    def test_get_json__gzip(self):
+        url = self.url + "/gzip"
+        assert poor.http.get_json(url, ttl=0)["path"] == "/gzip"
+        traffic = poor.http.traffic()[poor.http.pool.get_key(url)]
+        assert traffic["received"] < traffic["decoded"]
+
+    def test_get_json__cancelled(self):
+        errors = []
+        def request():
+            with poor.http.channel("test"):
+                try:
+                    poor.http.get_json(self.url + "/slow?old", ttl=0)
+                except poor.http.Cancelled as error:
+                    errors.append(error)
+        thread = threading.Thread(target=request)
+        thread.start()
+        time.sleep(0.1)
+        with poor.http.channel("test"):
+            assert poor.http.get_json(self.url + "/new", ttl=0)
+        thread.join()
+        assert len(errors) == 1
+
+    def test_prewarm(self):
+        url = self.url + "/test?q={query}"
+        futures = poor.http.prewarm([url, url, "http://{host}/test"])
+        assert len(futures) == 1
+        futures[0].result(timeout=5)
+        connection = poor.http.pool.get(url)
+        assert connection.sock is not None
+        poor.http.pool.put(url, connection)
+        assert poor.http.get_json(self.url + "/test", ttl=0)
+        assert Handler.requests == ["/test"]
+
+    def test_set_replay_mode(self):
+        directory = tempfile.mkdtemp()
+        url = self.url + "/test"
+        try:
+            poor.http.set_replay_mode("record", directory)
+            assert poor.http.get_json(url)["path"] == "/test"
+            self.server.shutdown()
+            self.server.server_close()
+            poor.http.set_replay_mode("replay", directory)
+            assert poor.http.get_json(url)["path"] == "/test"
+            assert Handler.requests == ["/test"]
+        finally:
+            poor.http.set_replay_mode(None)
+            shutil.rmtree(directory)
+
+    def test_stats(self):
+        url = self.url + "/test"
+        for i in range(2):
+            assert poor.http.get_json(url, ttl=0)
+        stats = poor.http.stats()[poor.http.pool.get_key(url)]
+        assert stats["requests"] == 2
+        assert stats["reused"] == 1
+        assert stats["times"]["connect"]["count"] == 1
+        assert stats["times"]["queue"]["count"] == 2
+        assert stats["times"]["ttfb"]["count"] == 2
+        assert stats["times"]["transfer"]["count"] == 2
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2026 Rinigus
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import poor.test
+import shutil
+import tempfile
+import time
+
+from poor.httpcache import get_expiry, ResponseCache
+
+
+class TestResponseCache(poor.test.TestCase):
+
+    def setup_method(self, method):
+        self.directory = tempfile.mkdtemp()
+        self.cache = ResponseCache(self.directory, 1000)
+        self.url = "https://example.com/x?y=1"
+
+    def teardown_method(self, method):
+        shutil.rmtree(self.directory)
+
+    def test_clear(self):
+        self.cache.put(self.url, b"abc", {"Cache-Control": "max-age=60"})
+        self.cache.clear()
+        assert self.cache.get(self.url) is None
+        assert self.cache.size == 0
+
+    def test_get__fresh(self):
+        self.cache.put(self.url, b"abc", {"Cache-Control": "max-age=60"})
+        response = self.cache.get(self.url)
+        assert response.body == b"abc"
+        assert response.expires > time.time()
+
+    def test_get__missing(self):
+        assert self.cache.get(self.url) is None
+
+    def test_get__persistent(self):
+        self.cache.put(self.url, b"abc", {"Cache-Control": "max-age=60"})
+        cache = ResponseCache(self.directory, 1000)
+        assert cache.get(self.url).body == b"abc"
+
+    def test_put__etag(self):
+        assert self.cache.put(self.url, b"abc", {"ETag": '"1"'})
+        response = self.cache.get(self.url)
+        assert response.etag == '"1"'
+        assert response.expires <= time.time()
+
+    def test_put__evict(self):
+        for i in range(5):
+            url = "{}&i={:d}".format(self.url, i)
+            self.cache.put(url, b"x" * 300, {"Cache-Control": "max-age=60"})
+        assert self.cache.size <= 1000
+        assert self.cache.get(self.url + "&i=0") is None
+        assert self.cache.get(self.url + "&i=4") is not None
+
+    def test_put__evict_lru(self):
+        self.cache = ResponseCache(self.directory, 1200)
+        for i in range(3):
+            url = "{}&i={:d}".format(self.url, i)
+            self.cache.put(url, b"x" * 300, {"Cache-Control": "max-age=60"})
+            time.sleep(0.01)
+        self.cache.get(self.url + "&i=0")
+        self.cache.put(self.url, b"x" * 300, {"Cache-Control": "max-age=60"})
+        assert self.cache.get(self.url + "&i=0") is not None
+        assert self.cache.get(self.url + "&i=1") is None
+
+    def test_put__no_store(self):
+        assert not self.cache.put(self.url, b"abc", {"Cache-Control": "no-store"})
+        assert self.cache.get(self.url) is None
+
+    def test_put__stale(self):
+        assert not self.cache.put(self.url, b"abc", {})
+        assert self.cache.get(self.url) is None
+
+    def test_put__ttl(self):
+        assert self.cache.put(self.url, b"abc", {"Cache-Control": "no-store"}, ttl=60)
+        assert self.cache.get(self.url).expires > time.time()
+
+    def test_refresh(self):
+        self.cache.put(self.url, b"abc", {"ETag": '"1"'})
+        self.cache.refresh(self.url, {"Cache-Control": "max-age=60"})
+        response = self.cache.get(self.url)
+        assert response.body == b"abc"
+        assert response.expires > time.time()
+
+
+class TestModule(poor.test.TestCase):
+
+    def test_get_expiry__expires(self):
+        headers = {"Expires": "Wed, 21 Oct 2015 07:28:00 GMT"}
+        assert get_expiry(headers, now=0) == 1445412480
+
+    def test_get_expiry__expires_invalid(self):
+        assert get_expiry({"Expires": "0"}, now=10) == 10
+
+    def test_get_expiry__max_age(self):
+        headers = {"Cache-Control": "public, max-age=60", "Age": "10"}
+        assert get_expiry(headers, now=0) == 50
+
+    def test_get_expiry__no_cache(self):
+        assert get_expiry({"Cache-Control": "no-cache"}, now=10) == 10
+
+    def test_get_expiry__no_store(self):
+        assert get_expiry({"Cache-Control": "no-store"}, now=10) is None
+
+    def test_get_expiry__ttl(self):
+        assert get_expiry({"Cache-Control": "no-store"}, ttl=5, now=10) == 15
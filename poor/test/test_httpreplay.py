@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2026 Rinigus
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+import poor.test
+import shutil
+import tempfile
+import time
+
+from poor.httpreplay import redact, Recorder
+
+
+class TestRecorder(poor.test.TestCase):
+
+    def setup_method(self, method):
+        self.directory = tempfile.mkdtemp()
+        self.url = "https://example.com/x?q=helsinki&apiKey=secret"
+
+    def teardown_method(self, method):
+        shutil.rmtree(self.directory)
+
+    def test_replay(self):
+        recorder = Recorder(self.directory, "record")
+        recorder.record("GET", self.url, None, 200, {"Content-Type": "text/plain"}, b"abc")
+        recorder = Recorder(self.directory, "replay")
+        response = recorder.replay("GET", self.url, None)
+        assert response.status == 200
+        assert response.headers["Content-Type"] == "text/plain"
+        assert response.body == b"abc"
+
+    def test_replay__bandwidth(self):
+        recorder = Recorder(self.directory, "record")
+        recorder.record("GET", self.url, None, 200, {}, b"x" * 100)
+        recorder = Recorder(self.directory, "replay", latency=0.05, bandwidth=1000)
+        start = time.time()
+        recorder.replay("GET", self.url, None)
+        assert time.time() - start >= 0.15
+
+    def test_replay__body(self):
+        recorder = Recorder(self.directory, "record")
+        recorder.record("POST", self.url, "a", 200, {}, b"a")
+        recorder.record("POST", self.url, "b", 200, {}, b"b")
+        recorder = Recorder(self.directory, "replay")
+        assert recorder.replay("POST", self.url, b"a").body == b"a"
+        assert recorder.replay("POST", self.url, b"b").body == b"b"
+
+    def test_replay__missing(self):
+        recorder = Recorder(self.directory, "replay")
+        self.assert_raises(LookupError, recorder.replay, "GET", self.url, None)
+
+    def test_replay__other_key(self):
+        recorder = Recorder(self.directory, "record")
+        recorder.record("GET", self.url, None, 200, {}, b"abc")
+        recorder = Recorder(self.directory, "replay")
+        url = self.url.replace("secret", "other")
+        assert recorder.replay("GET", url, None).body == b"abc"
+
+
+class TestModule(poor.test.TestCase):
+
+    def test_redact(self):
+        url = "https://example.com/x?q=helsinki&apiKey=secret&client_secret=abc"
+        assert redact(url) == "https://example.com/x?q=helsinki&apiKey=REDACTED&client_secret=REDACTED"
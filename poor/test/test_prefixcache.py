@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2026 Rinigus
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import poor.test
+import time
+
+from poor.prefixcache import PrefixCache
+
+RESULTS = [dict(title="Berlin", description="Germany"),
+           dict(title="Bern", description="Switzerland"),
+           dict(title="Bergen", description="Norway")]
+
+
+class TestPrefixCache(poor.test.TestCase):
+
+    def setup_method(self, method):
+        self.cache = PrefixCache(ttl=60)
+
+    def test_get(self):
+        self.cache.put("a", "Ber", RESULTS, True)
+        assert self.cache.get("a", "ber") == RESULTS
+        assert self.cache.get("b", "ber") is None
+
+    def test_get__expired(self):
+        self.cache.ttl = 0.01
+        self.cache.put("a", "ber", RESULTS, True)
+        time.sleep(0.02)
+        assert self.cache.get("a", "ber") is None
+
+    def test_get__filter(self):
+        self.cache.put("a", "ber", RESULTS, True)
+        assert self.cache.get("a", "Berl") == RESULTS[:1]
+        assert self.cache.get("a", "bern swi") == RESULTS[1:2]
+
+    def test_get__no_candidates(self):
+        self.cache.put("a", "ber", RESULTS, True)
+        assert self.cache.get("a", "berk") is None
+
+    def test_get__truncated(self):
+        self.cache.put("a", "ber", RESULTS, False)
+        assert self.cache.get("a", "ber") == RESULTS
+        assert self.cache.get("a", "berl") is None
+
+    def test_put__longest_prefix(self):
+        self.cache.put("a", "ber", RESULTS, False)
+        self.cache.put("a", "berg", RESULTS[2:], True)
+        assert self.cache.get("a", "berge") == RESULTS[2:]
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2026 Rinigus
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import poor.test
+
+from poor.searchindex import get_trigrams, get_words
+
+
+class TestModule(poor.test.TestCase):
+
+    def test_deduplicate(self):
+        places = [dict(title="Helsinki Central Station", x=24.9414, y=60.1710),
+                  dict(title="Helsinki central station", x=24.9420, y=60.1712),
+                  dict(title="Helsinki Centrl Station", x=24.9410, y=60.1709),
+                  dict(title="Helsinki Cathedral", x=24.9414, y=60.1710),
+                  dict(title="Helsinki Central Station", x=24.9600, y=60.1710),
+                  dict(title="No coordinates")]
+        results = poor.ranking.deduplicate(places)
+        assert results == [places[0], places[3], places[4], places[5]]
+
+    def test_deduplicate__many(self):
+        places = [dict(title="Stop {:d}".format(i),
+                       x=24.9 + i * 0.001,
+                       y=60.1) for i in range(500)]
+        places.extend(dict(x, x=x["x"] + 0.0001) for x in list(places))
+        assert poor.ranking.deduplicate(places) == places[:500]
+
+    def test_rank(self):
+        places = [dict(title="Kamppi", x=24.9316, y=60.1690, provider="a"),
+                  dict(title="Kamppi Center", x=24.9330, y=60.1685, provider="a"),
+                  dict(title="Kamppi", x=24.9320, y=60.1690, provider="b")]
+        results = poor.ranking.rank(places, "kamppi center", 24.93, 60.17)
+        assert results == [places[1], places[0]]
+
+    def test_rank__proximity(self):
+        places = [dict(title="Paris", x=2.3522, y=48.8566),
+                  dict(title="Paris", x=-95.5555, y=33.6609)]
+        results = poor.ranking.rank(places, "paris", -96.8, 32.8)
+        assert results == [places[1], places[0]]
+
+    def test_score(self):
+        place = dict(title="Kamppi", x=24.9316, y=60.1690)
+        trigrams = get_trigrams(get_words("kamppi"))
+        score1 = poor.ranking.score(place, trigrams)
+        score2 = poor.ranking.score(place, trigrams, 2.35, 48.86)
+        score3 = poor.ranking.score(place, get_trigrams(get_words("museum")))
+        assert 0 < score3 < score2 < score1 <= 1
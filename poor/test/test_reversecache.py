@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2026 Rinigus
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import poor.test
+import time
+
+from poor.reversecache import ReverseCache
+
+RESULTS = [dict(title="A", x=24.9410, y=60.1700),
+           dict(title="B", x=24.9420, y=60.1700)]
+
+
+class TestReverseCache(poor.test.TestCase):
+
+    def setup_method(self, method):
+        self.cache = ReverseCache(ttl=60)
+        self.cache.put(24.9410, 60.1700, 100, 2, RESULTS)
+
+    def test_clear(self):
+        self.cache.clear()
+        assert self.cache.get(24.9410, 60.1700, 100, 1) is None
+
+    def test_get(self):
+        results = self.cache.get(24.9412, 60.1700, 100, 1)
+        assert [x["title"] for x in results] == ["A"]
+        assert 0 < results[0]["distance"] < 20
+
+    def test_get__closest_first(self):
+        results = self.cache.get(24.9419, 60.1700, 100, 2)
+        assert [x["title"] for x in results] == ["B", "A"]
+
+    def test_get__expired(self):
+        self.cache.ttl = 0.01
+        self.cache.put(25.0, 61.0, 100, 1, RESULTS)
+        time.sleep(0.02)
+        assert self.cache.get(25.0, 61.0, 100, 1) is None
+
+    def test_get__key(self):
+        assert self.cache.get(24.9410, 60.1700, 100, 1, key="x") is None
+
+    def test_get__limit(self):
+        assert self.cache.get(24.9410, 60.1700, 100, 3) is None
+
+    def test_get__moved(self):
+        # About 110 meters north, beyond hysteresis.
+        assert self.cache.get(24.9410, 60.1710, 100, 1) is None
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2026 Rinigus
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import poor.test
+import shutil
+import tempfile
+import time
+
+from poor.routecache import RouteCache
+
+
+class TestRouteCache(poor.test.TestCase):
+
+    def setup_method(self, method):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "routes.sqlite")
+        self.cache = RouteCache(self.path, 10000)
+
+    def teardown_method(self, method):
+        shutil.rmtree(self.directory)
+
+    def test_clear(self):
+        self.cache.put("a", dict(x=[1], y=[2]), 60)
+        self.cache.clear()
+        assert self.cache.get("a") is None
+
+    def test_get(self):
+        self.cache.put("a", dict(x=[1], y=[2]), 60)
+        assert self.cache.get("a") == dict(x=[1], y=[2])
+        assert self.cache.get("b") is None
+
+    def test_get__expired(self):
+        self.cache.put("a", dict(x=[1], y=[2]), 0.01)
+        time.sleep(0.02)
+        assert self.cache.get("a") is None
+
+    def test_get__persistent(self):
+        self.cache.put("a", dict(x=[1], y=[2]), 60)
+        cache = RouteCache(self.path, 10000)
+        assert cache.get("a") == dict(x=[1], y=[2])
+
+    def test_put__evict_lru(self):
+        for i in range(100):
+            self.cache.put(str(i), dict(x=["x" * 500]), 60)
+            assert self.cache.get("0")
+        assert self.cache.get("0")
+        assert self.cache.get("1") is None
+        assert self.cache.get("99")
+
+    def test_put_async(self):
+        self.cache.put_async("a", dict(x=[1], y=[2]), 60)
+        self.cache.flush()
+        assert self.cache.get("a") == dict(x=[1], y=[2])
@@ -15,7 +15,15 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import os
 import poor.test
+import shutil
+import tempfile
+import threading
+import time
+import unittest.mock
+
+from poor.routecache import RouteCache
 
 
 class TestRouter(poor.test.TestCase):
@@ -29,3 +37,90 @@ class TestRouter(poor.test.TestCase):
         a = poor.Router("mapquest_open")
         b = poor.Router("mapquest_open")
         assert a is b
+
+    def test_route__debounce(self):
+        router = poor.Router("gpx")
+        calls = []
+        def route(locations, params):
+            calls.append(locations)
+            return dict(x=[0, 1], y=[0, 1])
+        with unittest.mock.patch.object(router._provider, "route", route):
+            a = router.route([(24.9, 60.1), (24.8, 60.2)], dict(heading=90, notification="A"))
+            b = router.route([(24.9, 60.1), (24.8, 60.2)], dict(heading=91, notification="B"))
+            router.debounce_time = 0
+            c = router.route([(24.9, 60.1), (24.8, 60.2)], dict(heading=91, notification="B"))
+            router.debounce_time = poor.router.DEBOUNCE_TIME
+        assert len(calls) == 2
+        assert a == b == c
+        assert a is not b
+
+    def test_route__debounce_no_reroute(self):
+        router = poor.Router("gpx")
+        calls = []
+        def route(locations, params):
+            calls.append(locations)
+            return dict(x=[0, 1], y=[0, 1])
+        with unittest.mock.patch.object(router._provider, "route", route):
+            router.route([(24.9, 60.1), (24.8, 60.2)], {})
+            router.route([(24.9, 60.1), (24.8, 60.2)], {})
+        assert len(calls) == 2
+
+    def test_route__debounce_options(self):
+        router = poor.Router("gpx")
+        calls = []
+        def route(locations, params):
+            calls.append(locations)
+            return dict(x=[0, 1], y=[0, 1])
+        options = dict(heading=90)
+        with unittest.mock.patch.object(router._provider, "route", route):
+            with unittest.mock.patch.object(poor.ConfigurationStore, "get", return_value=dict(type="fastest")):
+                router.route([(24.9, 60.1), (24.8, 60.2)], options)
+            with unittest.mock.patch.object(poor.ConfigurationStore, "get", return_value=dict(type="shortest")):
+                router.route([(24.9, 60.1), (24.8, 60.2)], options)
+        assert len(calls) == 2
+
+    def test_route__inflight(self):
+        router = poor.Router("gpx")
+        calls = []
+        def route(locations, params):
+            calls.append(locations)
+            time.sleep(0.5)
+            return dict(x=[0, 1], y=[0, 1])
+        results = []
+        def find():
+            results.append(router.route([(24.7, 60.3), (24.6, 60.4)], {}))
+        with unittest.mock.patch.object(router._provider, "route", route):
+            threads = [threading.Thread(target=find) for i in range(3)]
+            for thread in threads: thread.start()
+            for thread in threads: thread.join()
+        assert len(calls) == 1
+        assert len(results) == 3
+        assert sum(isinstance(x, poor.cache.FrozenDict) for x in results) == 2
+
+    def test_route__not_frozen(self):
+        router = poor.Router("gpx")
+        def route(locations, params):
+            return dict(x=[0, 1], y=[0, 1])
+        with unittest.mock.patch.object(router._provider, "route", route):
+            result = router.route([(24.7, 60.3), (24.6, 60.4)], {})
+        assert not isinstance(result, poor.cache.FrozenDict)
+
+    def test_route__persistent(self):
+        router = poor.Router("osrm")
+        directory = tempfile.mkdtemp()
+        path = os.path.join(directory, "routes.sqlite")
+        calls = []
+        def route(locations, params):
+            calls.append(locations)
+            return dict(x=[0, 1], y=[0, 1])
+        with unittest.mock.patch.object(router._provider, "route", route), \
+             unittest.mock.patch("poor.router.cache", RouteCache(path, 10000)):
+            router.debounce_time = 0
+            a = router.route([(24.5, 60.5), (24.4, 60.6)], {})
+            poor.router.cache.flush()
+            poor.router.cache = RouteCache(path, 10000)
+            b = router.route([(24.5, 60.5), (24.4, 60.6)], {})
+            router.debounce_time = poor.router.DEBOUNCE_TIME
+        shutil.rmtree(directory)
+        assert len(calls) == 1
+        assert a == b
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2026 Rinigus
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import poor.test
+
+from poor.searchindex import format_result, SearchIndex
+
+
+class TestSearchIndex(poor.test.TestCase):
+
+    def setup_method(self, method):
+        self.index = SearchIndex()
+        self.index.set("history", [
+            dict(title="Helsinki Central Station", x=24.941, y=60.171),
+            dict(title="Central Park", x=-73.965, y=40.782),
+        ])
+        self.index.add("poi", dict(title="Kamppi", address="Helsinki", x=24.932, y=60.169))
+
+    def test_add__duplicate(self):
+        self.index.add("poi", dict(title="Kamppi", address="Helsinki", x=24.932, y=60.169))
+        assert len(self.index) == 3
+
+    def test_clear(self):
+        self.index.clear("history")
+        assert len(self.index) == 1
+        self.index.clear()
+        assert len(self.index) == 0
+
+    def test_remove(self):
+        self.index.remove("history", dict(title="central park", x=-73.96501, y=40.782))
+        assert len(self.index) == 2
+        assert not self.index.search("park")
+        self.index.remove("history", dict(title="Central Park", x=-73.965, y=40.782))
+        assert len(self.index) == 2
+
+    def test_search__distance(self):
+        results = self.index.search("central", x=-73.9, y=40.7)
+        assert [x["title"] for x in results] == ["Central Park", "Helsinki Central Station"]
+        results = self.index.search("central", x=24.9, y=60.1)
+        assert [x["title"] for x in results] == ["Helsinki Central Station", "Central Park"]
+
+    def test_search__fuzzy(self):
+        results = self.index.search("centrl stat")
+        assert [x["title"] for x in results] == ["Helsinki Central Station"]
+
+    def test_search__prefix(self):
+        results = self.index.search("kamp")
+        assert results[0]["title"] == "Kamppi"
+        assert results[0]["source"] == "poi"
+        assert not self.index.search("xyz")
+
+    def test_search__sources(self):
+        assert self.index.search("helsinki", sources=("history",))[0]["title"] == "Helsinki Central Station"
+        assert self.index.search("helsinki", sources=("poi",))[0]["title"] == "Kamppi"
+        assert not self.index.search("helsinki", sources=())
+
+    def test_set(self):
+        self.index.set("history", [dict(title="Tampere", x=23.76, y=61.50)])
+        assert len(self.index) == 2
+        assert not self.index.search("central")
+
+
+class TestModule(poor.test.TestCase):
+
+    def test_format_result(self):
+        result = format_result(dict(text="Kamppi", address="Helsinki", poiType="Mall", x=24.9, y=60.2))
+        assert result["title"] == "Kamppi"
+        assert result["description"] == "Helsinki"
+        assert result["label"] == "Kamppi, Helsinki"
+        assert result["poi_type"] == "Mall"
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (C) 2026 Rinigus
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+import json
+import poor.test
+
+from poor.test.standin import StandinServer
+from unittest import mock
+
+
+class TestStandinServer(poor.test.TestCase):
+
+    def setup_method(self, method):
+        self.server = StandinServer(points=100, maneuvers=5, results=10).start()
+
+    def teardown_method(self, method):
+        self.server.stop()
+
+    def patch(self, provider, name, host):
+        url = getattr(provider, name).replace(host, self.server.url)
+        return mock.patch.object(provider, name, url)
+
+    def test_failures__blank(self):
+        self.server.failures = dict(blank=1)
+        url = self.server.url + "/v1/poi_types"
+        assert poor.http.get(url, ttl=0) == b""
+
+    def test_failures__reset(self):
+        self.server.failures = dict(reset=1)
+        url = self.server.url + "/v1/poi_types"
+        try:
+            self.assert_raises(Exception, poor.http.get, url, ttl=0)
+        finally:
+            poor.http.breaker.reset()
+
+    def test_osmscout_geocode(self):
+        provider = poor.Geocoder("osmscout")._provider
+        with self.patch(provider, "URL", "http://localhost:8553"):
+            results = provider.geocode("cafe helsinki", params=dict(limit=5))
+        assert len(results) == 5
+        assert results[0]["title"]
+
+    def test_osmscout_nearby(self):
+        provider = poor.Guide("osmscout")._provider
+        with self.patch(provider, "URL_XY", "http://localhost:8553"):
+            x, y, results = provider.nearby("Cafe", "", (24.94, 60.17), 1000, {})
+        # Provider searches around a point snapped to a grid.
+        assert poor.util.calculate_distance(x, y, 24.94, 60.17) < 100
+        assert len(results) == 10
+        assert results[0]["distance"] > 0
+
+    def test_osmscout_poi_types(self):
+        url = self.server.url + "/v1/poi_types"
+        assert "amenity_cafe" in poor.http.get_json(url, ttl=0)
+
+    def test_osmscout_route(self):
+        provider = poor.Router("osmscout")._provider
+        with self.patch(provider, "URL", "http://localhost:8553"):
+            route = provider.route([(24.94, 60.17), (24.95, 60.18), (24.96, 60.19)], {})
+        assert len(route["x"]) == 200
+        assert len(route["maneuvers"]) == 12
+        assert route["location_indexes"] == [0, 99, 199]
+
+    def test_osmscout_trace_route(self):
+        provider = poor.Router("gpx_osmscout")._provider
+        shape = [dict(lat=60.17, lon=24.94), dict(lat=60.18, lon=24.95)]
+        input = json.dumps(dict(json=json.dumps(dict(shape=shape, costing="auto"))))
+        result = poor.http.post_json(self.server.url + "/v2/trace_route", input)
+        route = provider.parse_result_valhalla(poor.AttrDict(result), "car")
+        assert len(route["x"]) == 100
+        assert len(route["maneuvers"]) == 6
+
+    def test_osrm_route(self):
+        provider = poor.Router("osrm")._provider
+        with self.patch(provider, "URL", "http://router.project-osrm.org"):
+            route = provider.route([(24.94, 60.17), (24.95, 60.18)], {})
+        assert len(route["x"]) == 100
+        assert len(route["maneuvers"]) == 6
+        assert route["location_indexes"] == [0, 99]
+
+    def test_photon_geocode(self):
+        provider = poor.Geocoder("photon")._provider
+        with self.patch(provider, "URL", "https://photon.komoot.io"):
+            results = provider.geocode("cafe helsinki", params=dict(limit=3))
+        assert len(results) == 3
+        assert results[0]["title"]
+
+    def test_photon_reverse(self):
+        provider = poor.Geocoder("photon")._provider
+        with self.patch(provider, "URL_REVERSE", "https://photon.komoot.io"):
+            results = provider.reverse(24.94, 60.17, 1000, limit=2)
+        assert len(results) == 2
@@ -89,6 +89,37 @@ class TestModule(poor.test.TestCase):
         assert poor.util.format_distance_metric(123, 2) == "120 m"
         assert poor.util.format_distance_metric(1234, 1) == "1 km"
 
+    def test_get_provider_urls(self):
+        urls = poor.Geocoder("default").urls
+        assert "https://photon.komoot.io/api/?q={query}&limit={limit}&lang={lang}" in urls
+        assert poor.util.get_provider_urls(poor.util) == []
+
+    def test_normalize_query(self):
+        assert poor.util.normalize_query("  Main\tStreet ") == "main street"
+        assert poor.util.normalize_query("Ｃａｆé") == poor.util.normalize_query("cafe\u0301")
+
+    def test_quantize_bias(self):
+        a = poor.util.quantize_bias(24.9401, 60.1701, 14)
+        b = poor.util.quantize_bias(24.9408, 60.1708, 14)
+        c = poor.util.quantize_bias(24.9401, 60.1701, 18)
+        assert a == b
+        assert a != c
+        assert abs(a[0] - 24.9401) < 360 / 2**14
+
+    def test_quantize_bias__zoomed_out(self):
+        for x, y in ((24.94, 60.17), (-70.67, -33.45), (179.9, 89.9)):
+            for zoom in range(4):
+                qx, qy = poor.util.quantize_bias(x, y, zoom)
+                assert -180 <= qx <= 180
+                assert -90 <= qy <= 90
+                assert abs(qx - x) < 360 / 2**6
+                assert abs(qy - y) < 10
+
+    def test_quantize_near(self):
+        x, y, radius = poor.util.quantize_near(24.9401, 60.1701, 1000)
+        assert radius > 1000
+        assert poor.util.calculate_distance(x, y, 24.9401, 60.1701) <= radius - 1000
+
     def test_requirement_found(self):
         assert poor.util.requirement_found("sh")
         assert poor.util.requirement_found("/bin/sh")
@@ -34,6 +34,7 @@ import subprocess
 import sys
 import time
 import traceback
+import unicodedata
 import urllib.parse
 
 from poor.i18n import _
@@ -354,6 +355,16 @@ def get_provider_class(type):
         return poor.Router
     raise ValueError("Bad type: {}".format(repr(type)))
 
+def get_provider_urls(provider):
+    """Return URL templates defined as constants in `provider` module."""
+    urls = []
+    for name in dir(provider):
+        value = getattr(provider, name)
+        if "URL" not in name or not isinstance(value, str): continue
+        if not value.startswith(("http://", "https://")): continue
+        urls.append(value)
+    return urls
+
 def _get_providers(directory, default, active, profile):
     """Return a list of dictionaries of provider attributes."""
     def matches(pid, ref):
@@ -423,6 +434,13 @@ def makedirs(directory):
         raise # OSError
     return directory
 
+def normalize_query(query):
+    """Return `query` in canonical form for searches and cache keys."""
+    # Providers match case-insensitively, make queries differing only
+    # in case, whitespace or Unicode representation share cache keys.
+    query = unicodedata.normalize("NFKC", query)
+    return " ".join(query.lower().split())
+
 def short_osm(lat, lon, zoom=16):
     """Return a short link representing a location in OpenStreetmap.
 
@@ -484,6 +502,39 @@ def popen(*args):
     """Run command `args` without waiting for it to complete."""
     subprocess.Popen(args)
 
+def quantize_bias(x, y, zoom):
+    """Return proximity bias `x`, `y` snapped to a grid for map `zoom`."""
+    # Use the center of the Web Mercator map tile at zoom, a fraction of
+    # the visible map, so that panning a bit keeps the bias and thus cache
+    # keys the same. Below zoom 6 tiles are too large to center on,
+    # hundreds of kilometers is close enough for a bias when zoomed out.
+    zoom = min(max(int(zoom or 0), 6), 18)
+    n = 2**zoom
+    y = min(max(y, -85.0511), 85.0511)
+    i = math.floor((x + 180) / 360 * n)
+    j = math.floor((1 - math.asinh(math.tan(math.radians(y))) / math.pi) / 2 * n)
+    i = min(max(i, 0), n - 1)
+    j = min(max(j, 0), n - 1)
+    return (round((i + 0.5) / n * 360 - 180, 6),
+            round(math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * (j + 0.5) / n)))), 6))
+
+def quantize_near(x, y, radius):
+    """
+    Return `x`, `y` snapped to a grid and `radius` grown to cover.
+
+    The grid is a tenth of `radius` meters, the returned radius grown
+    so that a search around the returned point includes all of the area
+    `radius` meters around the original point.
+    """
+    step = radius / 10
+    x, y = quantize_point(x, y, step / 111320)
+    return x, y, radius + math.ceil(step / math.sqrt(2))
+
+def quantize_point(x, y, step):
+    """Return `x`, `y` snapped to the center of a `step` degree grid cell."""
+    return (round((math.floor(x / step) + 0.5) * step, 6),
+            round((math.floor(y / step) + 0.5) * step, 6))
+
 def read_gpx(path):
     """Read and join tracks from GPX file at `path`."""
     try:
@@ -229,6 +229,9 @@ Item {
                 // If the router returns multiple alternative routes,
                 // always route using the first one.
                 route = route[0];
+            // Superseded by a newer request, which reports
+            // its own result and resets routing when done.
+            if (route && route.cancelled) return;
             if (route && route.error && route.message) {
                 app.notification.flash(app.tr("Routing failed: %1").arg(route.message), notifyId);
                 if (options.voicePrompt) navigatorBase.prompt("std:routing failed");
@@ -21,6 +21,10 @@ Routing using GPX track
 
 import poor
 
+# Routes are read from a local file that can change,
+# don't keep them in the persistent route cache.
+CACHE_TTL = 0
+
 CONF_DEFAULTS = {
     "file": "",
     "type": "car",
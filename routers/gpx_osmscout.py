@@ -25,6 +25,10 @@ https://github.com/valhalla/valhalla-docs/blob/master/api-reference.md
 import json
 import poor
 
+# Routes are read from a local file that can change,
+# don't keep them in the persistent route cache.
+CACHE_TTL = 0
+
 CONF_DEFAULTS = {
     "file": "",
     "language": poor.util.get_default_language("en"),
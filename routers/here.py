@@ -29,7 +29,6 @@ https://developer.here.com
 # public enum ManeuverAction is helpful.
 
 
-import copy
 import poor
 import poor.flexpolyline
 from poor.i18n import __
@@ -80,7 +79,21 @@ URL = ("https://router.hereapi.com/v8/routes?apiKey=" + poor.key.get("HERE_APIKE
        "&destination={destination}"
        )
 
-cache = {}
+# Seconds to keep routes expected to change with traffic in caches.
+CACHE_TTL_TRAFFIC = 300
+
+cache = poor.cache.Cache("router.here", poor.cache.MAX_SIZE_ROUTER)
+
+def get_cache_ttl(params):
+    """Return seconds to keep routes in the persistent route cache."""
+    if is_traffic_dependent():
+        return CACHE_TTL_TRAFFIC
+    return poor.router.CACHE_TTL
+
+def is_traffic_dependent():
+    """Return ``True`` if routes are expected to change with traffic."""
+    return (poor.conf.routers.here.traffic and
+            poor.conf.routers.here.type in ("car", "bus", "taxi"))
 
 def prepare_endpoint(point):
     """Return `point` as a dictionary ready to be passed on to the router."""
@@ -139,13 +152,10 @@ def route(locations, params):
         avoid = "&avoid[features]=" + (",".join(avoid))
     else:
         avoid = ""
-    # skip cache if traffic update is expected
-    skip_cache = traffic and transportMode in (["car", "bus", "taxi"])
     url = URL.format(**locals()) + via + avoid
     if not traffic: url += "&departureTime=any"
-    if not skip_cache:
-        with poor.util.silent(KeyError):
-            return copy.deepcopy(cache[url])
+    with poor.util.silent(KeyError):
+        return cache[url]
     result = poor.http.get_json(url)
     result = poor.AttrDict(result)
     mode = MODE.get(transportMode,"car")
@@ -264,7 +274,8 @@ def parse_result(url, locations, result, mode, lang_translation, locations_proce
     if traffic > 0.1: route["traffic"]=traffic
     route["language"] = result.routes[0].sections[0].language.replace("-","_")
     if route and route["x"]:
-        cache[url] = copy.deepcopy(route)
+        ttl = CACHE_TTL_TRAFFIC if is_traffic_dependent() else cache.ttl
+        cache.set(url, route, ttl)
     return route
 
 def get_exit_number(maneuver, language):
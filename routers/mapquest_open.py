@@ -21,7 +21,6 @@ Routing using MapQuest Open.
 http://open.mapquestapi.com/directions/
 """
 
-import copy
 import json
 import poor
 
@@ -73,7 +72,7 @@ SUPPORTED_LOCALES = [
 URL = ("http://www.mapquestapi.com/directions/v2/{service}"
        "?key=" + poor.key.get("MAPQUEST_KEY") )
 
-cache = {}
+cache = poor.cache.Cache("router.mapquest_open", poor.cache.MAX_SIZE_ROUTER)
 
 def prepare_endpoint(point):
     """Return `point` as a string ready to be passed on to the router."""
@@ -109,7 +108,7 @@ def route(locations, params):
     input = dict(locations=loc, options=options)
     input = json.dumps(input)
     with poor.util.silent(KeyError):
-        return copy.deepcopy(cache[url + input])
+        return cache[url + input]
     result = poor.http.post_json(url, input)
     result = poor.AttrDict(result)
     x, y = poor.util.decode_epl(result.route.shape.shapePoints)
@@ -136,5 +135,5 @@ def route(locations, params):
                  maneuvers=maneuvers, mode=mode, optimized=optimized)
     route["language"] = locale
     if route and route["x"]:
-        cache[url + input] = copy.deepcopy(route)
+        cache[url + input] = route
     return route
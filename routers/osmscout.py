@@ -22,7 +22,6 @@ https://github.com/rinigus/osmscout-server
 https://github.com/valhalla/valhalla-docs/blob/master/api-reference.md
 """
 
-import copy
 import json
 import poor
 import urllib.parse
@@ -130,7 +129,7 @@ MODEOPTIONS = {
 
 URL = "http://localhost:8553/v2/route?json={input}"
 URL_OPT = "http://localhost:8553/v2/optimized_route?json={input}"
-cache = {}
+cache = poor.cache.Cache("router.osmscout", poor.cache.MAX_SIZE_ROUTER)
 
 def prepare_endpoint(point):
     """Return `point` as a dictionary ready to be passed on to the router."""
@@ -173,7 +172,7 @@ def route(locations, params):
     else:
         url = URL.format(**locals())
     with poor.util.silent(KeyError):
-        return copy.deepcopy(cache[url])
+        return cache[url]
     result = poor.http.get_json(url)
     result = poor.AttrDict(result)
     mode = MODE.get(ctype,"car")
@@ -196,7 +195,7 @@ def parse_result_libosmscout(url, locations, result, mode):
                  maneuvers=maneuvers, mode=mode, optimized=False)
     route["language"] = result.language
     if route and route["x"]:
-        cache[url] = copy.deepcopy(route)
+        cache[url] = route
     return route
 
 def parse_exit(maneuver, key):
@@ -241,5 +240,5 @@ def parse_result_valhalla(url, locations, optimized, result, mode):
                  maneuvers=Man, mode=mode, optimized=optimized)
     route["language"] = result.trip.language.replace('-','_')
     if route and route["x"]:
-        cache[url] = copy.deepcopy(route)
+        cache[url] = route
     return route
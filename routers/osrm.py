@@ -22,7 +22,6 @@ http://project-osrm.org/
 https://github.com/Project-OSRM/osrm-backend/blob/master/docs/http.md
 """
 
-import copy
 import glob
 import os
 import poor
@@ -60,7 +59,7 @@ NARRATIVE = {
 URL = "http://router.project-osrm.org/route/v1/car/{locstring}?steps=true&annotations=nodes&overview=full"
 URL_OPT = "http://router.project-osrm.org/trip/v1/car/{locstring}?steps=true&annotations=nodes&overview=full" + \
     "&source=first&destination=last&roundtrip=false"
-cache = {}
+cache = poor.cache.Cache("router.osrm", poor.cache.MAX_SIZE_ROUTER)
 
 def init_icons():
     """Initialize the global list of maneuver icons."""
@@ -144,7 +143,7 @@ def route(locations, params):
     else:
         url = URL.format(**locals())
     with poor.util.silent(KeyError):
-        return copy.deepcopy(cache[url])
+        return cache[url]
     routes = "trips" if optimized else "routes"
     result = poor.http.get_json(url)
     waypoints = result["waypoints"]
@@ -170,5 +169,5 @@ def route(locations, params):
                  maneuvers=maneuvers, mode="car", optimized=optimized)
     route["language"] = "en_US"
     if route and route["x"]:
-        cache[url] = copy.deepcopy(route)
+        cache[url] = route
     return route
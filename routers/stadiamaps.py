@@ -21,7 +21,6 @@ Routing using Valhalla at Stadia Maps.
 https://docs.stadiamaps.com/
 """
 
-import copy
 import json
 import poor
 import urllib.parse
@@ -110,7 +109,7 @@ MODEOPTIONS = {
 
 URL = "https://api.stadiamaps.com/route/v1?api_key=" + poor.key.get("STADIAMAPS_KEY")
 URL_OPT = "https://api.stadiamaps.com/optimized_route/v1?api_key=" + poor.key.get("STADIAMAPS_KEY")
-cache = {}
+cache = poor.cache.Cache("router.stadiamaps", poor.cache.MAX_SIZE_ROUTER)
 
 def prepare_endpoint(point):
     """Return `point` as a dictionary ready to be passed on to the router."""
@@ -153,7 +152,7 @@ def route(locations, params):
     else:
         url = URL.format(**locals())
     with poor.util.silent(KeyError):
-        return copy.deepcopy(cache[url])
+        return cache[url]
     result = poor.http.post_json(url, body=input, headers={"Content-Type": "application/json"})
     result = poor.AttrDict(result)
     mode = MODE.get(ctype,"car")
@@ -203,5 +202,5 @@ def parse_result_valhalla(url, locations, optimized, result, mode):
                  maneuvers=Man, mode=mode, optimized=optimized)
     route["language"] = result.trip.language.replace('-','_')
     if route and route["x"]:
-        cache[url] = copy.deepcopy(route)
+        cache[url] = route
     return route